@@ -0,0 +1,156 @@
+"""add_memories_fulltext_index
+
+Revision ID: 5b3f9c2d7e41
+Revises: e90b0b838a7b
+Create Date: 2026-10-16 12:40:07.518630
+
+Adds an indexed full-text search document for memories covering
+simple_content, full_content, keywords and tags:
+- PostgreSQL: generated tsvector column (search_vector) with a GIN index
+- SQLite: external-content FTS5 table (memories_fts) synced by triggers
+
+Replaces the double ILIKE '%query%' sequential scan in search_memories.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b3f9c2d7e41"
+down_revision: Union[str, Sequence[str], None] = "e90b0b838a7b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def column_exists(table_name: str, column_name: str) -> bool:
+    """Check if a column exists in a table."""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    columns = [col["name"] for col in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def upgrade_postgresql() -> None:
+    """Add generated tsvector column and GIN index."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION memory_text_array(text[]) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$ SELECT coalesce(translate(array_to_string($1, ' '), '/', ' '), '') $$
+        """
+    )
+    if not column_exists("memories", "search_vector"):
+        op.execute(
+            """
+            ALTER TABLE memories ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(
+                    to_tsvector('simple'::regconfig, coalesce(simple_content, '')),
+                    'A'
+                )
+                || setweight(
+                    to_tsvector(
+                        'simple'::regconfig,
+                        memory_text_array(keywords::text[])
+                        || ' ' || memory_text_array(tags::text[])
+                    ),
+                    'B'
+                )
+                || setweight(
+                    to_tsvector('simple'::regconfig, coalesce(full_content, '')),
+                    'C'
+                )
+            ) STORED
+            """
+        )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_memories_search_vector "
+        "ON memories USING gin (search_vector)"
+    )
+
+
+def upgrade_sqlite() -> None:
+    """Create FTS5 table, sync triggers, and index existing memories."""
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+            simple_content, full_content, keywords, tags,
+            content='memories', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_fts_ai AFTER INSERT ON memories BEGIN
+            INSERT INTO memories_fts(
+                rowid, simple_content, full_content, keywords, tags
+            )
+            VALUES (
+                new.id, new.simple_content, new.full_content,
+                new.keywords, new.tags
+            );
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_fts_ad AFTER DELETE ON memories BEGIN
+            INSERT INTO memories_fts(
+                memories_fts, rowid, simple_content, full_content, keywords, tags
+            )
+            VALUES (
+                'delete', old.id, old.simple_content, old.full_content,
+                old.keywords, old.tags
+            );
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS memories_fts_au
+        AFTER UPDATE OF simple_content, full_content, keywords, tags ON memories BEGIN
+            INSERT INTO memories_fts(
+                memories_fts, rowid, simple_content, full_content, keywords, tags
+            )
+            VALUES (
+                'delete', old.id, old.simple_content, old.full_content,
+                old.keywords, old.tags
+            );
+            INSERT INTO memories_fts(
+                rowid, simple_content, full_content, keywords, tags
+            )
+            VALUES (
+                new.id, new.simple_content, new.full_content,
+                new.keywords, new.tags
+            );
+        END
+        """
+    )
+    # Index memories that existed before the triggers
+    op.execute("INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    """Add full-text index for memories."""
+    if op.get_bind().dialect.name == "postgresql":
+        upgrade_postgresql()
+    else:
+        upgrade_sqlite()
+
+
+def downgrade() -> None:
+    """Remove full-text index for memories."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_memories_search_vector")
+        if column_exists("memories", "search_vector"):
+            op.drop_column("memories", "search_vector")
+        op.execute("DROP FUNCTION IF EXISTS memory_text_array(text[])")
+    else:
+        op.execute("DROP TRIGGER IF EXISTS memories_fts_ai")
+        op.execute("DROP TRIGGER IF EXISTS memories_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS memories_fts_au")
+        op.execute("DROP TABLE IF EXISTS memories_fts")
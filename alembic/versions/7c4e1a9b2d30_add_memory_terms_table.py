@@ -0,0 +1,100 @@
+"""add_memory_terms_table
+
+Revision ID: 7c4e1a9b2d30
+Revises: 5b3f9c2d7e41
+Create Date: 2026-10-16 15:02:44.091237
+
+Adds memory_terms(memory_id, kind, term): one row per normalized keyword
+and tag, indexed on (kind, term, memory_id) so search_memories can filter
+by tags/keywords with index lookups. Existing memories are backfilled from
+the keywords/tags columns (JSON text on SQLite, arrays on PostgreSQL).
+"""
+
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c4e1a9b2d30"
+down_revision: Union[str, Sequence[str], None] = "5b3f9c2d7e41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def parse_terms(value) -> list[str]:
+    """Decode a keywords/tags column value (JSON text or array)."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return []
+    if not isinstance(value, list):
+        return []
+    return [term for term in value if isinstance(term, str)]
+
+
+def normalize_term(term: str) -> str:
+    """Same normalization as models.memory.normalize_term."""
+    return " ".join(term.split()).lower()[:200]
+
+
+def backfill() -> None:
+    """Populate memory_terms from existing keywords and tags."""
+    conn = op.get_bind()
+    memory_terms = sa.table(
+        "memory_terms",
+        sa.column("memory_id", sa.Integer),
+        sa.column("kind", sa.String),
+        sa.column("term", sa.String),
+    )
+    rows = conn.execute(sa.text("SELECT id, keywords, tags FROM memories")).all()
+
+    batch: list[dict] = []
+    for memory_id, keywords, tags in rows:
+        for kind, values in (("keyword", keywords), ("tag", tags)):
+            terms = {normalize_term(term) for term in parse_terms(values)}
+            batch.extend(
+                {"memory_id": memory_id, "kind": kind, "term": term}
+                for term in terms
+                if term
+            )
+        if len(batch) >= BATCH_SIZE:
+            op.bulk_insert(memory_terms, batch)
+            batch = []
+    if batch:
+        op.bulk_insert(memory_terms, batch)
+
+
+def upgrade() -> None:
+    """Create memory_terms table and backfill it."""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if "memory_terms" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "memory_terms",
+        sa.Column("memory_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("term", sa.String(length=200), nullable=False),
+        sa.ForeignKeyConstraint(["memory_id"], ["memories.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("memory_id", "kind", "term"),
+    )
+    op.create_index(
+        "ix_memory_terms_kind_term", "memory_terms", ["kind", "term", "memory_id"]
+    )
+
+    backfill()
+
+
+def downgrade() -> None:
+    """Drop memory_terms table."""
+    op.drop_index("ix_memory_terms_kind_term", table_name="memory_terms")
+    op.drop_table("memory_terms")
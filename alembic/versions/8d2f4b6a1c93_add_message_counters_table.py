@@ -0,0 +1,56 @@
+"""add_message_counters_table
+
+Revision ID: 8d2f4b6a1c93
+Revises: 7c4e1a9b2d30
+Create Date: 2026-10-16 18:41:09.512830
+
+Adds message_counters(scope, \"key\", count): maintained message counts per
+user ("user", users.id), per chat ("chat", chat_id) and in total ("all", 0)
+so get_message_count is a primary key lookup. Backfilled from messages.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2f4b6a1c93"
+down_revision: Union[str, Sequence[str], None] = "7c4e1a9b2d30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create message_counters table and backfill it."""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if "message_counters" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "message_counters",
+        sa.Column("scope", sa.String(length=8), nullable=False),
+        sa.Column("key", sa.BigInteger(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("scope", "key"),
+    )
+
+    op.execute(
+        'INSERT INTO message_counters (scope, "key", count) '
+        "SELECT 'user', user_id, COUNT(*) FROM messages GROUP BY user_id"
+    )
+    op.execute(
+        'INSERT INTO message_counters (scope, "key", count) '
+        "SELECT 'chat', chat_id, COUNT(*) FROM messages GROUP BY chat_id"
+    )
+    op.execute(
+        'INSERT INTO message_counters (scope, "key", count) '
+        "SELECT 'all', 0, COUNT(*) FROM messages"
+    )
+
+
+def downgrade() -> None:
+    """Drop message_counters table."""
+    op.drop_table("message_counters")
@@ -0,0 +1,70 @@
+"""add_memory_embeddings_table
+
+Revision ID: e90b0b838a7b
+Revises: a1197e0dd7ca
+Create Date: 2026-10-16 10:12:41.318204
+
+Adds per-memory vector embeddings for semantic retrieval:
+- PostgreSQL: pgvector column with HNSW cosine index
+- SQLite: packed float32 BLOB (searched with an in-process NumPy index)
+
+Existing memories are embedded by scripts/backfill_memory_embeddings.py.
+"""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e90b0b838a7b"
+down_revision: Union[str, Sequence[str], None] = "a1197e0dd7ca"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "384"))
+
+
+def upgrade() -> None:
+    """Create memory_embeddings table."""
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if "memory_embeddings" in inspector.get_table_names():
+        return
+
+    is_postgres = conn.dialect.name == "postgresql"
+    if is_postgres:
+        from pgvector.sqlalchemy import Vector  # type: ignore[import-untyped]
+
+        op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        vector_type: sa.types.TypeEngine = Vector(EMBEDDING_DIM)
+    else:
+        vector_type = sa.LargeBinary()
+
+    op.create_table(
+        "memory_embeddings",
+        sa.Column("memory_id", sa.Integer(), nullable=False),
+        sa.Column("model", sa.String(length=200), nullable=False),
+        sa.Column("dim", sa.Integer(), nullable=False),
+        sa.Column("vector", vector_type, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["memory_id"], ["memories.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("memory_id"),
+    )
+
+    if is_postgres:
+        op.execute(
+            "CREATE INDEX ix_memory_embeddings_vector_hnsw "
+            "ON memory_embeddings USING hnsw (vector vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def downgrade() -> None:
+    """Drop memory_embeddings table."""
+    conn = op.get_bind()
+    if conn.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_memory_embeddings_vector_hnsw")
+    op.drop_table("memory_embeddings")
@@ -7,7 +7,14 @@ from dotenv import load_dotenv
 
 from handlers import waifu, help as help_handler
 from middlewares.admin_only import AdminOnlyMiddleware
+from services.access_tracker import access_tracker
+from services.category_registry import category_registry
+from services.chat_scheduler import chat_scheduler
+from services.message_counters import message_counters
+from services.message_writer import message_writer
 from services.migration_service import check_migrations
+from services.openai_client import close_openai_clients
+from services.user_resolver import user_resolver
 from database import engine
 
 # Load environment variables first
@@ -90,10 +97,32 @@ async def main():
     bot = Bot(token=token)
     dp = setup_dispatcher()
 
+    # Start write-behind flushing of memory access stats
+    await access_tracker.start()
+
+    # Start batched writes of user names from incoming updates
+    await user_resolver.start()
+
+    # Start periodic COUNT(*) check of maintained message counters
+    await message_counters.start()
+
+    # Preload category paths/tree (reloaded lazily afterwards)
+    await category_registry.preload()
+
     # Skip pending updates and start polling
     await bot.delete_webhook(drop_pending_updates=True)
     logging.info("Starting polling...")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        # Finish queued turns, then cancel whatever is left
+        await chat_scheduler.drain(timeout=chat_scheduler.DRAIN_TIMEOUT)
+        await chat_scheduler.stop()
+        await message_counters.stop()
+        await message_writer.stop()
+        await user_resolver.stop()
+        await access_tracker.stop()
+        await close_openai_clients()
 
 
 if __name__ == "__main__":
@@ -19,7 +19,14 @@ from handlers.call import call_handler
 from handlers.waifu import setup_bot_commands
 from middlewares.admin_only import AdminOnlyMiddleware
 from services.redis_service import redis_service
+from services.access_tracker import access_tracker
+from services.category_registry import category_registry
+from services.chat_scheduler import chat_scheduler
+from services.message_counters import message_counters
+from services.message_writer import message_writer
 from services.migration_service import check_migrations
+from services.openai_client import close_openai_clients
+from services.user_resolver import user_resolver
 from database import engine
 
 load_dotenv()
@@ -99,6 +106,18 @@ async def on_startup(bot: Bot, webhook_url: str, secret: str):
     # Connect to Redis
     await redis_service.connect()
 
+    # Start write-behind flushing of memory access stats
+    await access_tracker.start()
+
+    # Start batched writes of user names from incoming updates
+    await user_resolver.start()
+
+    # Start periodic COUNT(*) check of maintained message counters
+    await message_counters.start()
+
+    # Preload category paths/tree (reloaded lazily afterwards)
+    await category_registry.preload()
+
     # Skip Telegram setup if DISABLE_TG=true
     disable_tg = os.getenv("DISABLE_TG", "false").lower() == "true"
     if disable_tg:
@@ -119,9 +138,28 @@ async def on_startup(bot: Bot, webhook_url: str, secret: str):
 
 async def on_shutdown(bot: Bot):
     """Cleanup on shutdown."""
+    # Finish queued turns (up to CHAT_DRAIN_TIMEOUT), then stop per-chat workers
+    await chat_scheduler.drain(timeout=chat_scheduler.DRAIN_TIMEOUT)
+    await chat_scheduler.stop()
+
+    # Stop message counter reconcile job
+    await message_counters.stop()
+
+    # Write buffered chat messages
+    await message_writer.stop()
+
+    # Write pending user name changes
+    await user_resolver.stop()
+
+    # Flush pending memory access stats before the event loop goes away
+    await access_tracker.stop()
+
     # Disconnect from Redis
     await redis_service.disconnect()
 
+    # Close pooled OpenAI connections
+    await close_openai_clients()
+
     await bot.delete_webhook()
     logging.info("Webhook deleted")
 
@@ -7,17 +7,16 @@ without going through Telegram's webhook/polling system.
 Authentication: Uses same NUDGE_SECRET as /nudge endpoint
 """
 
+import logging
 import os
-import json
 from typing import Optional
 
 from aiohttp import web
 
-from database import AsyncSessionLocal
+from services.agent_loop import AgentLoop
+from services.context_assembler import context_assembler
 from services.llm_service import llm_service
-from services.lesson_service import LessonService
-from services.memory_service import MemoryService
-from services.message_service import MessageService
+from services.message_writer import message_writer
 from services.auth_service import AuthService
 
 
@@ -229,7 +228,10 @@ async def handle_command(command: str, user_id: int, is_admin: bool) -> str:
             )
             user_info = {"id": user_id, "username": "test_user"}
             chat_info = {"id": user_id, "type": "private"}
-            joke = await llm_service.get_response(prompt, user_info, chat_info)
+            # Concurrent /joke requests share one LLM call
+            joke = await llm_service.get_response(
+                prompt, user_info, chat_info, coalesce=True
+            )
             return f"😄 <b>Here's a joke for you!</b>\n\n{joke}"
         except Exception as e:
             return f"😅 Oops! I couldn't think of a joke right now. Error: {e}"
@@ -283,40 +285,24 @@ async def handle_message(message: str, user_id: int, is_admin: bool) -> str:
         str: Bot's response text
     """
     try:
-        # Fetch lessons, memories, and message history from database
-        async with AsyncSessionLocal() as session:
-            lesson_service = LessonService(session)
-            lessons = await lesson_service.get_all_lessons()
-
-            # Fetch memories for this user
-            memory_service = MemoryService(session)
-            memories = await memory_service.search_memories(
-                user_id=user_id,
-                query=message,
-                limit=10,
-            )
-
-            # Fetch recent message history for this user
-            message_service = MessageService(session)
-            message_history = await message_service.get_recent_messages(
-                user_id=user_id,
-                chat_id=user_id,  # In /call, chat_id = user_id for simplicity
-                limit=20,
-            )
-
-            # Store incoming user message to database
-            await message_service.store_message(
-                user_id=user_id,
-                chat_id=user_id,
-                message_text=message,
-                is_bot=False,
-            )
+        # Fetch lessons, memories and history concurrently, then store the
+        # message: /call messages have no Telegram message ID to leave out of
+        # the history by (in /call, chat_id = user_id for simplicity)
+        context = await context_assembler.assemble(user_id, user_id, message)
+        await message_writer.write(
+            user_id=user_id,
+            chat_id=user_id,
+            message_text=message,
+            is_bot=False,
+        )
+        lessons = context["lessons"]
+        memories = context["memories"]
+        message_history = context["message_history"]
 
         # Import tools for agentic behavior
         from tools.memory_tools import MEMORY_TOOLS
         from tools.web_search_tools import WEB_SEARCH_TOOLS
         from tools.lesson_tools import LESSON_TOOLS
-        from tools.tool_executor import ToolExecutor
 
         # Build tools list (admins get lesson tools, non-admins don't)
         all_tools = MEMORY_TOOLS + WEB_SEARCH_TOOLS
@@ -326,78 +312,28 @@ async def handle_message(message: str, user_id: int, is_admin: bool) -> str:
         # Use LLM with waifu personality + context + tools
         user_info = {"id": user_id, "username": "test_user", "telegram_id": user_id}
         chat_info = {"id": user_id, "type": "private", "chat_id": user_id}
-        llm_response = await llm_service.get_response(
+        messages = llm_service.build_messages(
             message,
             user_info,
             chat_info,
             lessons,
             memories=memories,
             message_history=message_history,
-            tools=all_tools,
         )
+        # Tool rounds run concurrently, one session per call
+        response = await AgentLoop(llm_service, user_id, tools=all_tools).run(messages)
 
-        # Check if LLM wants to use tools
-        if hasattr(llm_response, "tool_calls") and llm_response.tool_calls:
-            # Execute each tool call
-            async with AsyncSessionLocal() as tool_session:
-                tool_executor = ToolExecutor(tool_session)
-                tool_results = []
-
-                for tool_call in llm_response.tool_calls:
-                    # Parse tool arguments
-                    try:
-                        arguments = json.loads(tool_call.function.arguments)
-                    except json.JSONDecodeError:
-                        arguments = {}
-
-                    # Execute tool
-                    result = await tool_executor.execute(
-                        tool_name=tool_call.function.name,
-                        arguments=arguments,
-                        user_id=user_id,
-                    )
-
-                    tool_results.append(
-                        {
-                            "tool_call_id": tool_call.id,
-                            "result": result,
-                        }
-                    )
-
-            # Get final response from LLM after tool execution
-            response = await llm_service.get_response_after_tools(
-                user_message=message,
-                user_info=user_info,
-                chat_info=chat_info,
-                lessons=lessons,
-                memories=memories,
-                message_history=message_history,
-                tool_calls=[
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments,
-                        },
-                    }
-                    for tc in llm_response.tool_calls
-                ],
-                tool_results=tool_results,
-            )
-        else:
-            # No tools needed, just use the text response
-            response = llm_response
-
-        # Store bot's response to database
-        async with AsyncSessionLocal() as session:
-            message_service = MessageService(session)
-            await message_service.store_message(
+        # Store bot's response durably, so the next /call reads it as history
+        try:
+            await message_writer.write(
                 user_id=user_id,
                 chat_id=user_id,
                 message_text=response,
                 is_bot=True,
+                durable=True,
             )
+        except Exception as e:
+            logging.error(f"Failed to store /call reply for user {user_id}: {e}")
 
         return response
     except Exception as e:
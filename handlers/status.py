@@ -9,7 +9,15 @@ Provides /version and /health endpoints for:
 
 import html
 from aiohttp import web
+from services.chat_scheduler import chat_scheduler
+from services.llm_cache import llm_cache
+from services.message_counters import message_counters
+from services.message_writer import message_writer
+from services.metrics import latency_metrics, token_usage
+from services.request_executor import request_executor
+from services.single_flight import single_flight
 from services.status_service import StatusService
+from services.user_resolver import user_resolver
 
 # Initialize status service with database engine
 try:
@@ -85,6 +93,16 @@ async def api_version_handler(request: web.Request) -> web.Response:
         "commit": version_info["git_commit"][:7],
         "uptime": uptime_display,
         "redis": redis_status,
+        "cache": status["redis"].get("local_cache"),
+        "latency": latency_metrics.summary(),
+        "llm_cache": llm_cache.get_stats(),
+        "prompt_cache": token_usage.summary(),
+        "single_flight": single_flight.get_stats(),
+        "llm_requests": request_executor.get_stats(),
+        "chat_scheduler": chat_scheduler.get_stats(),
+        "message_writer": message_writer.get_stats(),
+        "message_counters": message_counters.get_stats(),
+        "user_resolver": user_resolver.get_stats(),
         "postgresql": db_status,
         "bot": "online",
         "image_tag": version_info["image_tag"],
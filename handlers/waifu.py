@@ -1,16 +1,19 @@
 import os
 import asyncio
-import json
+import logging
+import time
 from aiogram import Router, types, Bot
 from aiogram.filters import Command
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, BotCommand
 
-from database import AsyncSessionLocal
+from services.agent_loop import AgentLoop, Replacement
+from services.chat_scheduler import chat_scheduler
+from services.context_assembler import context_assembler
 from services.llm_service import get_llm_service
-from services.lesson_service import LessonService
 from services.status_service import StatusService
-from services.memory_service import MemoryService
-from services.message_service import MessageService
+from services.message_writer import message_writer
+from services.streaming_reply import StreamingReply
+from services.user_resolver import user_resolver
 
 router = Router()
 
@@ -22,6 +25,9 @@ ADMIN_IDS = set(
 # Site URL
 SITE_URL = "https://dcmaidbot.theedgestory.org/"
 
+# Stream replies with progressive message edits (false: one reply at the end)
+STREAM_REPLIES = os.getenv("STREAM_REPLIES", "true").lower() == "true"
+
 # Initialize status service for version info
 status_service = StatusService()
 
@@ -170,7 +176,7 @@ async def handle_callback_query(callback: types.CallbackQuery):
 
 @router.message()
 async def handle_message(message: types.Message):
-    """Handle regular messages with streaming LLM response and realistic delays."""
+    """Queue regular messages; bursts from one sender become one LLM turn."""
     if not message.text:
         return
 
@@ -180,16 +186,72 @@ async def handle_message(message: types.Message):
         # Ignore non-admins (99% of users)
         return
 
-    # Mimic human reading: tiny delay (0.3-0.8s)
-    msg_length = len(message.text)
-    read_time = min(0.3 + (msg_length / 200), 0.8)  # Max 0.8s
-    await asyncio.sleep(read_time)
+    # Names are written to the users table in batches
+    user_resolver.record_profile(
+        message.from_user.id,
+        message.from_user.username,
+        message.from_user.first_name,
+        message.from_user.last_name,
+    )
 
-    # Show typing indicator (marks message as "read")
-    await message.bot.send_chat_action(chat_id=message.chat.id, action="typing")
+    # Store the message first: it may still be merged into a burst or shed
+    try:
+        await message_writer.write(
+            user_id=message.from_user.id,
+            chat_id=message.chat.id,
+            message_text=message.text,
+            is_bot=False,
+            message_id=message.message_id,
+        )
+    except Exception as e:
+        logging.error(f"Failed to store message from chat {message.chat.id}: {e}")
+
+    # Per-chat worker: in-order replies, short bursts merged (see chat_scheduler)
+    accepted = chat_scheduler.submit(
+        message.chat.id,
+        (message, time.perf_counter()),
+        answer_messages,
+        merge_key=message.from_user.id,
+    )
+    if not accepted:
+        logging.warning(f"Dropped message from chat {message.chat.id} (overloaded)")
+
+
+async def answer_messages(batch: list[tuple[types.Message, float]]):
+    """Answer consecutive messages of one sender with streaming LLM response."""
+    message = batch[-1][0]
+    started_at = batch[0][1]
+    text = "\n".join(item.text for item, _ in batch)
+
+    # Load lessons, memories and history while the simulated reading/thinking
+    # delays run, instead of after them (the batch is already stored, so its
+    # own messages are left out of the history)
+    assembly = asyncio.create_task(
+        context_assembler.assemble(
+            message.from_user.id,
+            message.chat.id,
+            text,
+            exclude_message_ids=[item.message_id for item, _ in batch],
+        )
+    )
+
+    try:
+        # Mimic human reading: tiny delay (0.3-0.8s), minus time spent queued
+        msg_length = len(text)
+        read_time = min(0.3 + (msg_length / 200), 0.8)  # Max 0.8s
+        await asyncio.sleep(max(0.0, read_time - (time.perf_counter() - started_at)))
+
+        # Show typing indicator (marks message as "read")
+        await message.bot.send_chat_action(chat_id=message.chat.id, action="typing")
 
-    # Tiny think delay (0.2-0.5s) before starting to type
-    await asyncio.sleep(0.2 + (msg_length / 500))
+        # Tiny think delay (0.2-0.5s) before starting to type
+        await asyncio.sleep(min(0.2 + (msg_length / 500), 0.5))
+
+        context = await assembly
+    finally:
+        # Don't leave the reads running if the delays failed or were cancelled
+        if not assembly.done():
+            assembly.cancel()
 
     # Prepare context
     user_info = {
@@ -201,34 +263,9 @@ async def handle_message(message: types.Message):
         "chat_id": message.chat.id,
     }
 
-    # Get lessons, memories, and message history from database
-    async with AsyncSessionLocal() as session:
-        lesson_service = LessonService(session)
-        lessons = await lesson_service.get_all_lessons()
-
-        # Fetch memories for this user
-        memory_service = MemoryService(session)
-        memories = await memory_service.search_memories(
-            user_id=message.from_user.id,
-            query=message.text,
-            limit=10,
-        )
-
-        # Fetch recent message history for this user/chat
-        message_service = MessageService(session)
-        message_history = await message_service.get_recent_messages(
-            user_id=message.from_user.id,
-            chat_id=message.chat.id,
-            limit=20,
-        )
-
-        # Store incoming user message to database
-        await message_service.store_message(
-            user_id=message.from_user.id,
-            chat_id=message.chat.id,
-            message_text=message.text,
-            is_bot=False,
-        )
+    lessons = context["lessons"]
+    memories = context["memories"]
+    message_history = context["message_history"]
 
     # Get LLM response with tool support
     try:
@@ -238,7 +275,6 @@ async def handle_message(message: types.Message):
         from tools.memory_tools import MEMORY_TOOLS
         from tools.web_search_tools import WEB_SEARCH_TOOLS
         from tools.lesson_tools import LESSON_TOOLS
-        from tools.tool_executor import ToolExecutor
         from services.auth_service import AuthService
 
         # Check if user is admin for tool filtering
@@ -253,87 +289,45 @@ async def handle_message(message: types.Message):
         # Show typing indicator
         await message.bot.send_chat_action(chat_id=message.chat.id, action="typing")
 
-        # Get LLM response (may contain tool calls)
-        llm_response = await llm_service.get_response(
-            user_message=message.text,
-            user_info=user_info,
-            chat_info=chat_info,
-            lessons=lessons,
-            memories=memories,
-            message_history=message_history,
-            tools=all_tools,
+        # Build the prompt once; the agent loop appends tool rounds to it
+        messages = llm_service.build_messages(
+            text,
+            user_info,
+            chat_info,
+            lessons,
+            memories,
+            message_history,
         )
-
-        # Check if LLM wants to use tools
-        if hasattr(llm_response, "tool_calls") and llm_response.tool_calls:
-            # Execute each tool call
-            async with AsyncSessionLocal() as tool_session:
-                tool_executor = ToolExecutor(tool_session)
-                tool_results = []
-
-                for tool_call in llm_response.tool_calls:
-                    # Parse tool arguments
-                    try:
-                        arguments = json.loads(tool_call.function.arguments)
-                    except json.JSONDecodeError:
-                        arguments = {}
-
-                    # Execute tool
-                    result = await tool_executor.execute(
-                        tool_name=tool_call.function.name,
-                        arguments=arguments,
-                        user_id=message.from_user.id,
-                    )
-
-                    tool_results.append(
-                        {
-                            "tool_call_id": tool_call.id,
-                            "result": result,
-                        }
-                    )
-
-            # Get final response from LLM after tool execution
-            response_text = await llm_service.get_response_after_tools(
-                user_message=message.text,
-                user_info=user_info,
-                chat_info=chat_info,
-                lessons=lessons,
-                memories=memories,
-                message_history=message_history,
-                tool_calls=[
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments,
-                        },
-                    }
-                    for tc in llm_response.tool_calls
-                ],
-                tool_results=tool_results,
-            )
+        agent = AgentLoop(llm_service, message.from_user.id, tools=all_tools)
+
+        if STREAM_REPLIES:
+            # Stream into one progressively edited reply; text of tool rounds
+            # and failed answers is replaced (Replacement chunks)
+            reply = StreamingReply(message, started_at=started_at)
+            async for chunk in agent.stream(messages, started_at=started_at):
+                await reply.feed(chunk, replace=isinstance(chunk, Replacement))
+            response_text = await reply.finish()
         else:
-            # No tools needed, just use the text response
-            response_text = llm_response
+            response_text = await agent.run(messages, started_at=started_at)
 
-        # Send complete response
-        await message.reply(response_text, parse_mode="HTML")
+            # Send complete response
+            await message.reply(response_text, parse_mode="HTML")
 
-        # Store bot's response to database
-        async with AsyncSessionLocal() as session:
-            message_service = MessageService(session)
-            await message_service.store_message(
+        # Store bot's response durably: the chat's next queued turn reads it
+        # as history right after this one returns
+        try:
+            await message_writer.write(
                 user_id=message.from_user.id,
                 chat_id=message.chat.id,
                 message_text=response_text,
                 is_bot=True,
+                durable=True,
             )
+        except Exception as e:
+            logging.error(f"Failed to store reply in chat {message.chat.id}: {e}")
 
     except Exception as e:
         # Fallback to simple response if LLM fails
-        import logging
-
         logging.error(f"LLM error for user {message.from_user.id}: {e}", exc_info=True)
         await message.reply(
             f"<b>Myaw~ Something went wrong!</b> 😿\n\n<code>Error: {str(e)}</code>",
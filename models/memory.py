@@ -12,19 +12,24 @@ from typing import Any, Optional, cast
 import json
 import os
 from sqlalchemy import (
+    DDL,
     BigInteger,
     Boolean,
     Column,
+    Computed,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     Table,
     Text,
     UniqueConstraint,
+    event,
 )
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database import Base
@@ -33,6 +38,75 @@ from database import Base
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./dcmaidbot_test.db")
 IS_SQLITE = "sqlite" in DATABASE_URL.lower()
 
+# Embedding dimension for vector retrieval (all-MiniLM-L6-v2 produces 384)
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "384"))
+
+if not IS_SQLITE:
+    from pgvector.sqlalchemy import Vector  # type: ignore[import-untyped]
+
+
+# Full-text search over simple_content, full_content, keywords and tags.
+# PostgreSQL: generated tsvector column with a GIN index. The 'simple'
+# configuration (no stemming) is used because memories mix Russian and
+# English; prefix queries cover most inflection. array_to_string() is not
+# IMMUTABLE, so generated columns need the memory_text_array() wrapper. The
+# default parser reads hierarchical tags like "interest/food" as one file
+# token, so path separators are turned into spaces before tokenizing.
+MEMORY_TEXT_ARRAY_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION memory_text_array(text[]) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$ SELECT coalesce(translate(array_to_string($1, ' '), '/', ' '), '') $$
+"""
+MEMORY_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, coalesce(simple_content, '')), 'A')"
+    " || setweight(to_tsvector('simple'::regconfig, memory_text_array(keywords::text[])"
+    " || ' ' || memory_text_array(tags::text[])), 'B')"
+    " || setweight(to_tsvector('simple'::regconfig, coalesce(full_content, '')), 'C')"
+)
+
+# SQLite: external-content FTS5 table kept in sync by triggers. keywords and
+# tags are JSON text there; the unicode61 tokenizer strips the punctuation.
+MEMORIES_FTS_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+        simple_content, full_content, keywords, tags,
+        content='memories', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS memories_fts_ai AFTER INSERT ON memories BEGIN
+        INSERT INTO memories_fts(rowid, simple_content, full_content, keywords, tags)
+        VALUES (new.id, new.simple_content, new.full_content, new.keywords, new.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS memories_fts_ad AFTER DELETE ON memories BEGIN
+        INSERT INTO memories_fts(
+            memories_fts, rowid, simple_content, full_content, keywords, tags
+        )
+        VALUES (
+            'delete', old.id, old.simple_content, old.full_content,
+            old.keywords, old.tags
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS memories_fts_au
+    AFTER UPDATE OF simple_content, full_content, keywords, tags ON memories BEGIN
+        INSERT INTO memories_fts(
+            memories_fts, rowid, simple_content, full_content, keywords, tags
+        )
+        VALUES (
+            'delete', old.id, old.simple_content, old.full_content,
+            old.keywords, old.tags
+        );
+        INSERT INTO memories_fts(rowid, simple_content, full_content, keywords, tags)
+        VALUES (new.id, new.simple_content, new.full_content, new.keywords, new.tags);
+    END
+    """,
+]
+
 
 # Association table for Memory <-> Category many-to-many relationship
 memory_category_association = Table(
@@ -125,6 +199,18 @@ class Memory(Base):
     last_accessed: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     access_count: Mapped[int] = mapped_column(Integer, default=0)
 
+    # Full-text search document (PostgreSQL only; SQLite uses memories_fts)
+    if not IS_SQLITE:
+        search_vector: Mapped[Any] = mapped_column(
+            TSVECTOR,
+            Computed(MEMORY_SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+            deferred=True,
+        )
+        __table_args__ = (
+            Index("ix_memories_search_vector", "search_vector", postgresql_using="gin"),
+        )
+
     # Relationships
     categories: Mapped[list["Category"]] = relationship(
         secondary=memory_category_association, back_populates="memories"
@@ -320,3 +406,99 @@ class MemoryLink(Base):
             f"<MemoryLink(from={self.from_memory_id}, to={self.to_memory_id}, "
             f"type={self.link_type}, strength={self.strength})>"
         )
+
+
+class MemoryEmbedding(Base):
+    """Vector embedding of a memory's simple_content for semantic retrieval.
+
+    PostgreSQL stores the vector in a pgvector column (cosine HNSW index).
+    SQLite stores a packed little-endian float32 BLOB which is loaded into
+    an in-process NumPy matrix for top-k search (see services/vector_index.py).
+    """
+
+    __tablename__ = "memory_embeddings"
+
+    memory_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("memories.id", ondelete="CASCADE"), primary_key=True
+    )
+    model: Mapped[str] = mapped_column(
+        String(200), nullable=False
+    )  # Embedder name, e.g. "sentence-transformers/all-MiniLM-L6-v2"
+    dim: Mapped[int] = mapped_column(Integer, nullable=False)
+    vector: Mapped[Any] = mapped_column(
+        LargeBinary if IS_SQLITE else Vector(EMBEDDING_DIM), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    if not IS_SQLITE:
+        __table_args__ = (
+            Index(
+                "ix_memory_embeddings_vector_hnsw",
+                "vector",
+                postgresql_using="hnsw",
+                postgresql_with={"m": 16, "ef_construction": 64},
+                postgresql_ops={"vector": "vector_cosine_ops"},
+            ),
+        )
+
+    def __repr__(self) -> str:
+        return f"<MemoryEmbedding(memory_id={self.memory_id}, model={self.model})>"
+
+
+TERM_KINDS = ("keyword", "tag")
+
+
+def normalize_term(term: str) -> str:
+    """Normalize a keyword or tag for indexing and lookup."""
+    return " ".join(term.split()).lower()[:200]
+
+
+class MemoryTerm(Base):
+    """Normalized keyword/tag of a memory for indexed filtering.
+
+    Mirrors Memory.keywords and Memory.tags (one row per distinct normalized
+    term) so tag and keyword filters are index lookups instead of decoding
+    JSON (SQLite) or scanning arrays.
+    """
+
+    __tablename__ = "memory_terms"
+
+    memory_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("memories.id", ondelete="CASCADE"), primary_key=True
+    )
+    kind: Mapped[str] = mapped_column(
+        String(16), primary_key=True
+    )  # "keyword" or "tag"
+    term: Mapped[str] = mapped_column(String(200), primary_key=True)
+
+    __table_args__ = (Index("ix_memory_terms_kind_term", "kind", "term", "memory_id"),)
+
+    def __repr__(self) -> str:
+        return f"<MemoryTerm(memory_id={self.memory_id}, {self.kind}={self.term})>"
+
+
+# pgvector must be enabled before memory_embeddings is created via create_all
+event.listen(
+    MemoryEmbedding.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS vector").execute_if(dialect="postgresql"),
+)
+
+
+# Full-text index objects that live outside the ORM metadata
+event.listen(
+    Memory.__table__,
+    "before_create",
+    DDL(MEMORY_TEXT_ARRAY_FUNCTION_SQL).execute_if(dialect="postgresql"),
+)
+for _statement in MEMORIES_FTS_SQLITE_DDL:
+    event.listen(
+        Memory.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    Memory.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS memories_fts").execute_if(dialect="sqlite"),
+)
@@ -31,3 +31,22 @@ class Message(Base):
         return (
             f"<Message(id={self.id}, chat_id={self.chat_id}, user_id={self.user_id})>"
         )
+
+
+class MessageCounter(Base):
+    """Maintained message count per user, per chat and in total.
+
+    Incremented in the same transaction as the messages it counts, so
+    counts are primary key lookups instead of scanning messages; a periodic
+    reconcile job recomputes them with COUNT(*) and corrects any drift.
+    """
+
+    __tablename__ = "message_counters"
+
+    # "user" (key = users.id), "chat" (key = chat_id) or "all" (key = 0)
+    scope: Mapped[str] = mapped_column(String(8), primary_key=True)
+    key: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MessageCounter({self.scope}:{self.key}={self.count})>"
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Backfill vector embeddings for existing memories.
+
+Embeds every memory that has no embedding for the configured embedder
+(EMBEDDING_BACKEND / EMBEDDING_MODEL) in batches. Safe to re-run: memories
+that already have an up-to-date embedding are skipped.
+
+Usage:
+    EMBEDDING_BACKEND=sentence-transformers python scripts/backfill_memory_embeddings.py
+    python scripts/backfill_memory_embeddings.py --force --batch-size 128
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import and_, delete, select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from database import DATABASE_URL
+from models.memory import IS_SQLITE, Memory, MemoryEmbedding
+from services.embedding_service import get_embedder, pack_vector
+
+
+async def backfill_embeddings(batch_size: int, force: bool) -> None:
+    """Embed memories that are missing an embedding for the current model."""
+    embedder = get_embedder()
+    if embedder is None:
+        print("❌ EMBEDDING_BACKEND is not set")
+        print("   Use EMBEDDING_BACKEND=sentence-transformers (or hashing)")
+        return
+
+    database_url = DATABASE_URL
+    # Ensure async SQLite driver
+    if "sqlite:///" in database_url and "aiosqlite" not in database_url:
+        database_url = database_url.replace("sqlite:///", "sqlite+aiosqlite:///")
+
+    engine = create_async_engine(database_url, echo=False)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(f"🧠 Backfilling memory embeddings with {embedder.name} ({embedder.dim}d)")
+
+    async with async_session() as session:
+        if force:
+            await session.execute(delete(MemoryEmbedding))
+            await session.commit()
+            print("🗑️  Removed existing embeddings (--force)")
+
+        stmt = (
+            select(Memory.id, Memory.simple_content)
+            .outerjoin(
+                MemoryEmbedding,
+                and_(
+                    MemoryEmbedding.memory_id == Memory.id,
+                    MemoryEmbedding.model == embedder.name,
+                ),
+            )
+            .where(MemoryEmbedding.memory_id.is_(None))
+            .order_by(Memory.id)
+        )
+        rows = (await session.execute(stmt)).all()
+        print(f"📊 Memories to embed: {len(rows)}")
+
+        started = time.perf_counter()
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start : start + batch_size]
+            vectors = await embedder.aembed_batch([row[1] for row in batch])
+            for (memory_id, _), vector in zip(batch, vectors):
+                # merge() replaces a stale embedding from a previous model
+                await session.merge(
+                    MemoryEmbedding(
+                        memory_id=memory_id,
+                        model=embedder.name,
+                        dim=embedder.dim,
+                        vector=pack_vector(vector) if IS_SQLITE else vector,
+                    )
+                )
+            await session.commit()
+            print(f"  ✅ {min(start + batch_size, len(rows))}/{len(rows)}")
+
+        elapsed = time.perf_counter() - started
+        print("=" * 60)
+        print(f"✅ Backfill complete: {len(rows)} memories in {elapsed:.1f}s")
+        print("=" * 60)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument(
+        "--force", action="store_true", help="Re-embed all memories from scratch"
+    )
+    args = parser.parse_args()
+    asyncio.run(backfill_embeddings(args.batch_size, args.force))
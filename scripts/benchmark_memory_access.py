@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark get_memory throughput: commit-per-read vs write-behind tracker.
+
+Creates a temporary SQLite database with synthetic memories, then runs
+concurrent readers (one session each, like concurrent chat handlers)
+through two paths:
+
+- before: the original get_memory, which bumps access_count/last_accessed
+  and commits on every read
+- after: the current get_memory, a pure read with access stats recorded by
+  the write-behind AccessTracker (flush time is included)
+
+Redis is not connected, so every read hits the database in both paths.
+The "counted" column is the access_count increase per path: the original
+read-modify-write loses increments when readers overlap.
+
+Usage:
+    python scripts/benchmark_memory_access.py --memories 1000 --reads 5000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# The benchmark always runs against a throwaway SQLite database
+_TMP_DIR = tempfile.mkdtemp(prefix="dcmaidbot-bench-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP_DIR}/bench.db"
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import func, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.orm import selectinload, sessionmaker  # noqa: E402
+
+from database import Base  # noqa: E402
+from models.memory import Memory  # noqa: E402
+from services.access_tracker import access_tracker  # noqa: E402
+from services.memory_service import MemoryService  # noqa: E402
+
+
+async def get_memory_commit_per_read(session: AsyncSession, memory_id: int) -> None:
+    """Original get_memory: read, bump stats, commit."""
+    result = await session.execute(
+        select(Memory)
+        .where(Memory.id == memory_id)
+        .options(
+            selectinload(Memory.categories),
+            selectinload(Memory.outgoing_links),
+            selectinload(Memory.incoming_links),
+        )
+    )
+    memory = result.scalar_one_or_none()
+    if memory:
+        memory.last_accessed = datetime.utcnow()
+        memory.access_count += 1
+        await session.commit()
+
+
+async def run_readers(session_factory, ids: list[int], readers: int, after: bool):
+    """Split reads over concurrent readers; return elapsed seconds."""
+    chunks = [ids[i::readers] for i in range(readers)]
+
+    async def reader(chunk: list[int]) -> None:
+        async with session_factory() as session:
+            service = MemoryService(session)
+            for memory_id in chunk:
+                if after:
+                    await service.get_memory(memory_id)
+                else:
+                    await get_memory_commit_per_read(session, memory_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(reader(chunk) for chunk in chunks))
+    if after:
+        async with session_factory() as session:
+            await access_tracker.flush(session)
+    return time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Build corpus and compare both read paths."""
+    rng = random.Random(args.seed)
+    engine = create_async_engine(os.environ["DATABASE_URL"], echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        await session.execute(
+            insert(Memory),
+            [
+                {
+                    "id": mid,
+                    "simple_content": f"Memory {mid}",
+                    "full_content": f"Memory {mid}",
+                    "importance": rng.randint(0, 9999),
+                    "created_by": 1,
+                    "access_count": 0,
+                    "version": 1,
+                }
+                for mid in range(1, args.memories + 1)
+            ],
+        )
+        await session.commit()
+
+    ids = [rng.randint(1, args.memories) for _ in range(args.reads)]
+    # Keep the tracker from flushing mid-run; the final flush is timed
+    access_tracker.FLUSH_EVENTS = args.reads + 1
+
+    print(
+        f"📊 {args.reads} get_memory calls over {args.memories} memories, "
+        f"{args.readers} concurrent readers"
+    )
+    print(f"   {'path':<8} {'seconds':>9} {'reads/s':>10} {'counted':>9}")
+    counted_before = 0
+    for label, after in (("before", False), ("after", True)):
+        elapsed = await run_readers(session_factory, ids, args.readers, after)
+        async with session_factory() as session:
+            total = await session.scalar(select(func.sum(Memory.access_count)))
+        counted, counted_before = total - counted_before, total
+        print(
+            f"   {label:<8} {elapsed:>9.2f} {args.reads / elapsed:>10.0f} {counted:>9}"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--memories", type=int, default=1000)
+    parser.add_argument("--reads", type=int, default=5000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Benchmark the memory cache format: JSON dict vs binary codec.
+
+Builds synthetic memories of realistic size (~500-token simple_content,
+~4000-token full_content, mixed English/Russian Zipf-distributed words)
+and measures per memory:
+
+- encode: Memory -> cached value
+- decode: cached value -> Memory (what every get_memory cache hit pays)
+- summary: cached value -> projection without full_content
+- bytes: value size stored per key
+
+If REDIS_URL points at a reachable server, MEMORY USAGE per key is reported
+as well (keys are written under bench:memory:* and deleted afterwards).
+
+Usage:
+    python scripts/benchmark_memory_cache.py --memories 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.memory import Memory  # noqa: E402
+from services import memory_codec  # noqa: E402
+from services.memory_codec import (  # noqa: E402
+    decode_memory,
+    decode_summary,
+    encode_memory,
+)
+
+_SYLLABLES = ["ka", "to", "mi", "re", "sa", "lo", "на", "ко", "ми", "ра", "то", "ли"]
+
+
+def serialize_json(memory: Memory) -> str:
+    """Original cache format: every field as JSON, ISO timestamps."""
+    return json.dumps(
+        {
+            "id": memory.id,
+            "simple_content": memory.simple_content,
+            "full_content": memory.full_content,
+            "importance": memory.importance,
+            "emotion_valence": memory.emotion_valence,
+            "emotion_arousal": memory.emotion_arousal,
+            "emotion_dominance": memory.emotion_dominance,
+            "emotion_label": memory.emotion_label,
+            "keywords": memory.keywords,
+            "tags": memory.tags,
+            "context_temporal": memory.context_temporal,
+            "context_situational": memory.context_situational,
+            "version": memory.version,
+            "parent_id": memory.parent_id,
+            "evolution_triggers": memory.evolution_triggers,
+            "created_by": memory.created_by,
+            "created_at": memory.created_at.isoformat(),
+            "updated_at": None,
+            "last_accessed": memory.last_accessed.isoformat(),
+            "access_count": memory.access_count,
+        }
+    )
+
+
+def deserialize_json(value: str) -> Memory:
+    """Original cache hit path: json.loads + ISO parsing."""
+    data = json.loads(value)
+    for field in ("created_at", "last_accessed"):
+        data[field] = datetime.fromisoformat(data[field])
+    return Memory(**data)
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list[str]:
+    """Pseudo-words from mixed Latin/Cyrillic syllables."""
+    return [
+        "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 4)))
+        for _ in range(size)
+    ]
+
+
+def make_text(rng: random.Random, vocabulary: list[str], words: int) -> str:
+    """Zipf-distributed word stream with punctuation."""
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    chosen = rng.choices(vocabulary, weights=weights, k=words)
+    sentences = [
+        " ".join(chosen[i : i + 12]).capitalize() + "."
+        for i in range(0, len(chosen), 12)
+    ]
+    return " ".join(sentences)
+
+
+def make_memories(count: int, seed: int) -> list[Memory]:
+    """Realistic-size memories (tokens ~ 0.75 words)."""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng, 3000)
+    now = datetime(2026, 1, 1)
+    return [
+        Memory(
+            id=i,
+            simple_content=make_text(rng, vocabulary, 375),
+            full_content=make_text(rng, vocabulary, 3000),
+            importance=rng.randint(0, 9999),
+            emotion_valence=rng.uniform(-1, 1),
+            emotion_arousal=rng.uniform(-1, 1),
+            emotion_dominance=rng.uniform(-1, 1),
+            emotion_label="joy",
+            keywords=rng.sample(vocabulary, 5),
+            tags=rng.sample(vocabulary, 3),
+            context_temporal="yesterday evening",
+            context_situational="chat",
+            version=1,
+            parent_id=None,
+            evolution_triggers=None,
+            created_by=123456789,
+            created_at=now - timedelta(minutes=i),
+            last_accessed=now,
+            access_count=rng.randint(0, 50),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def time_per_item(func, items: list, repeat: int) -> float:
+    """Mean microseconds per call."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            func(item)
+    return (time.perf_counter() - started) / (repeat * len(items)) * 1e6
+
+
+async def redis_memory_usage(values: dict[str, list]) -> dict[str, float]:
+    """Mean MEMORY USAGE per key for each format, if Redis is reachable."""
+    import redis.asyncio as aioredis  # type: ignore[import-untyped]
+
+    client = aioredis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    usage = {}
+    try:
+        await client.ping()
+        for label, encoded in values.items():
+            total = 0
+            for i, value in enumerate(encoded):
+                key = f"bench:memory:{label}:{i}"
+                await client.set(key, value)
+                total += await client.memory_usage(key)
+                await client.delete(key)
+            usage[label] = total / len(encoded)
+    except Exception as e:
+        print(f"⚠️  Redis not available, skipping MEMORY USAGE: {e}")
+    finally:
+        await client.aclose()
+    return usage
+
+
+def run(args: argparse.Namespace) -> None:
+    """Compare both formats."""
+    memories = make_memories(args.memories, args.seed)
+    as_json = [serialize_json(m) for m in memories]
+    rows = [
+        (
+            "json",
+            time_per_item(serialize_json, memories, args.repeat),
+            time_per_item(deserialize_json, as_json, args.repeat),
+            time_per_item(deserialize_json, as_json, args.repeat),
+            sum(len(v.encode()) for v in as_json) / len(as_json),
+        )
+    ]
+    values = {"json": as_json}
+    compressions = ["none", "zlib"]
+    if memory_codec.zstandard is not None:
+        compressions.append("zstd")
+    for compression in compressions:
+        memory_codec.COMPRESSION = compression
+        as_binary = [encode_memory(m) for m in memories]
+        values[f"binary+{compression}"] = as_binary
+        rows.append(
+            (
+                f"binary+{compression}",
+                time_per_item(encode_memory, memories, args.repeat),
+                time_per_item(decode_memory, as_binary, args.repeat),
+                time_per_item(decode_summary, as_binary, args.repeat),
+                sum(len(v) for v in as_binary) / len(as_binary),
+            )
+        )
+
+    print(f"📊 {args.memories} memories, mean per memory")
+    print(
+        f"   {'format':<12} {'encode µs':>10} {'decode µs':>10} "
+        f"{'summary µs':>11} {'bytes':>8}"
+    )
+    for label, encode, decode, summary, size in rows:
+        print(
+            f"   {label:<12} {encode:>10.1f} {decode:>10.1f} "
+            f"{summary:>11.1f} {size:>8.0f}"
+        )
+
+    usage = asyncio.run(redis_memory_usage(values))
+    for label, size in usage.items():
+        print(f"   Redis MEMORY USAGE {label:<12} {size:>8.0f} bytes/key")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--memories", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    run(parser.parse_args())
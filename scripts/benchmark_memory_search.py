@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Benchmark memory retrieval: ILIKE substring vs full-text vs vector top-k.
+
+Builds a synthetic single-user corpus in a temporary SQLite database,
+then runs natural-language queries through each retrieval path and
+reports recall@k and latency (p50/p95).
+
+Each synthetic memory belongs to one topic; a result counts as relevant
+when it shares the query's topic. The ILIKE baseline reproduces the
+original search_memories query (whole message as one %pattern%).
+
+Usage:
+    python scripts/benchmark_memory_search.py --memories 100000 --queries 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# The benchmark always runs against a throwaway SQLite database
+_TMP_DIR = tempfile.mkdtemp(prefix="dcmaidbot-bench-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP_DIR}/bench.db"
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert, or_, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import Base  # noqa: E402
+from models.memory import Memory, MemoryEmbedding  # noqa: E402
+from services.embedding_service import (  # noqa: E402
+    HashingEmbedder,
+    SentenceTransformerEmbedder,
+    pack_vector,
+)
+from services.memory_service import MemoryService  # noqa: E402
+from services.vector_index import vector_index_registry  # noqa: E402
+
+USER_ID = 123456789
+
+TOPICS = {
+    "python": ["python", "asyncio", "fastapi", "pydantic", "typing", "pip"],
+    "cats": ["cat", "kitten", "whiskers", "purring", "litter", "catnip"],
+    "travel": ["trip", "flight", "passport", "hotel", "luggage", "airport"],
+    "music": ["guitar", "concert", "album", "melody", "drums", "playlist"],
+    "cooking": ["recipe", "oven", "pasta", "garlic", "dinner", "spices"],
+    "fitness": ["gym", "running", "workout", "marathon", "stretching", "squats"],
+    "work": ["deadline", "meeting", "manager", "project", "sprint", "standup"],
+    "family": ["mother", "brother", "sister", "birthday", "grandma", "cousin"],
+    "games": ["chess", "steam", "boss", "quest", "controller", "multiplayer"],
+    "health": ["doctor", "headache", "sleep", "vitamins", "allergy", "dentist"],
+    "garden": ["tomatoes", "seeds", "roses", "watering", "soil", "compost"],
+    "movies": ["cinema", "director", "trailer", "sequel", "popcorn", "actor"],
+}
+FILLER = ["really", "yesterday", "told", "about", "always", "think", "likes"]
+QUERY_TEMPLATES = [
+    "hey, do you remember what I said about my {a} and the {b}?",
+    "what do you know about {a}? I was thinking about {b} again",
+    "nya, tell me something about {a} {b} please",
+]
+
+
+def make_memory(rng: random.Random) -> tuple[str, str]:
+    """Generate (topic, content) for a synthetic memory."""
+    topic = rng.choice(list(TOPICS))
+    words = rng.sample(TOPICS[topic], 3) + rng.sample(FILLER, 2)
+    rng.shuffle(words)
+    return topic, f"User {' '.join(words)}."
+
+
+def make_query(rng: random.Random) -> tuple[str, str]:
+    """Generate (topic, message) for a natural-language query."""
+    topic = rng.choice(list(TOPICS))
+    a, b = rng.sample(TOPICS[topic], 2)
+    return topic, rng.choice(QUERY_TEMPLATES).format(a=a, b=b)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Build corpus and run both retrieval paths."""
+    rng = random.Random(args.seed)
+    embedder = (
+        SentenceTransformerEmbedder()
+        if args.backend == "sentence-transformers"
+        else HashingEmbedder()
+    )
+
+    engine = create_async_engine(os.environ["DATABASE_URL"], echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(f"🧪 Building {args.memories} memories ({embedder.name}, {embedder.dim}d)")
+    topics: dict[int, str] = {}
+    started = time.perf_counter()
+    async with session_factory() as session:
+        for start in range(0, args.memories, 5000):
+            batch = [make_memory(rng) for _ in range(min(5000, args.memories - start))]
+            ids = list(range(start + 1, start + len(batch) + 1))
+            await session.execute(
+                insert(Memory),
+                [
+                    {
+                        "id": mid,
+                        "simple_content": content,
+                        "full_content": content,
+                        "importance": rng.randint(0, 9999),
+                        "created_by": USER_ID,
+                        "access_count": 0,
+                        "version": 1,
+                    }
+                    for mid, (_, content) in zip(ids, batch)
+                ],
+            )
+            vectors = embedder.embed_batch([content for _, content in batch])
+            await session.execute(
+                insert(MemoryEmbedding),
+                [
+                    {
+                        "memory_id": mid,
+                        "model": embedder.name,
+                        "dim": embedder.dim,
+                        "vector": pack_vector(vector),
+                    }
+                    for mid, vector in zip(ids, vectors)
+                ],
+            )
+            topics.update({mid: topic for mid, (topic, _) in zip(ids, batch)})
+        await session.commit()
+    print(f"   built in {time.perf_counter() - started:.1f}s")
+
+    queries = [make_query(rng) for _ in range(args.queries)]
+    k = args.k
+
+    def recall(topic: str, ids: list[int]) -> float:
+        return sum(1 for mid in ids if topics[mid] == topic) / k
+
+    async with session_factory() as session:
+        service = MemoryService(session, embedder=embedder)
+
+        # Cold index load (first vector query for the user)
+        started = time.perf_counter()
+        await vector_index_registry.get(session, USER_ID, embedder.name, embedder.dim)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        results: dict[str, dict[str, list[float]]] = {
+            "ilike": {"latency": [], "recall": []},
+            "fulltext": {"latency": [], "recall": []},
+            "vector": {"latency": [], "recall": []},
+        }
+        for topic, message in queries:
+            started = time.perf_counter()
+            rows = await session.execute(
+                select(Memory.id)
+                .where(
+                    Memory.created_by == USER_ID,
+                    or_(
+                        Memory.simple_content.ilike(f"%{message}%"),
+                        Memory.full_content.ilike(f"%{message}%"),
+                    ),
+                )
+                .order_by(Memory.importance.desc(), Memory.created_at.desc())
+                .limit(k)
+            )
+            ilike_ids = [row[0] for row in rows]
+            results["ilike"]["latency"].append(time.perf_counter() - started)
+            results["ilike"]["recall"].append(recall(topic, ilike_ids))
+
+            for mode in ("fulltext", "vector"):
+                started = time.perf_counter()
+                memories = await service.search_memories(
+                    USER_ID, query=message, limit=k, mode=mode
+                )
+                results[mode]["latency"].append(time.perf_counter() - started)
+                results[mode]["recall"].append(recall(topic, [m.id for m in memories]))
+
+    await engine.dispose()
+
+    print()
+    print(f"📊 {args.memories} memories, {args.queries} queries, k={k}")
+    print(f"   vector index cold load: {load_ms:.1f} ms")
+    print(f"   {'mode':<9} {'recall@k':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for mode, data in results.items():
+        latencies = [v * 1000 for v in data["latency"]]
+        print(
+            f"   {mode:<9} {statistics.mean(data['recall']):>9.3f} "
+            f"{percentile(latencies, 50):>9.2f} {percentile(latencies, 95):>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--memories", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--backend",
+        choices=["hashing", "sentence-transformers"],
+        default="hashing",
+    )
+    asyncio.run(run(parser.parse_args()))
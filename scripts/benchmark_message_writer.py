@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Benchmark message storage throughput: store_message vs MessageWriter.
+
+Runs concurrent writers (like concurrent chat handlers storing incoming
+messages and replies) through two paths:
+
+- before: MessageService.store_message, one session and commit per message
+- after: the buffered MessageWriter, one multi-row INSERT per flush (the
+  final drain is included in the time); once fire-and-forget and once with
+  durable=True, where every writer waits for its row's commit
+
+Runs against a throwaway SQLite database by default. Pass a PostgreSQL URL
+(--database-url postgresql+asyncpg://...) to benchmark Postgres; the
+tables are created if missing and the rows written are deleted afterwards.
+
+Usage:
+    python scripts/benchmark_message_writer.py --messages 5000 --writers 16
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import Base  # noqa: E402
+from models.message import Message  # noqa: E402
+from models.user import User  # noqa: E402
+from services.message_service import MessageService  # noqa: E402
+from services.message_writer import MessageWriter  # noqa: E402
+from services.user_resolver import user_resolver  # noqa: E402
+
+# Telegram IDs used by the benchmark (cleaned up afterwards)
+USER_ID_BASE = 9_000_000_000
+
+
+async def run_writers(session_factory, args: argparse.Namespace, mode: str) -> float:
+    """Store args.messages messages over concurrent writers; return seconds."""
+    writer = MessageWriter(session_factory)
+    per_writer = args.messages // args.writers
+
+    async def chat(index: int) -> None:
+        user_id = USER_ID_BASE + index % args.users
+        for i in range(per_writer):
+            text = f"benchmark message {i}"
+            if mode == "before":
+                async with session_factory() as session:
+                    await MessageService(session).store_message(user_id, index, text)
+            else:
+                await writer.write(user_id, index, text, durable=mode == "durable")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(chat(index) for index in range(args.writers)))
+    await writer.stop()
+    return time.perf_counter() - started
+
+
+async def cleanup(session_factory) -> None:
+    """Delete benchmark messages and users."""
+    async with session_factory() as session:
+        users = select(User.id).where(User.telegram_id >= USER_ID_BASE)
+        await session.execute(delete(Message).where(Message.user_id.in_(users)))
+        await session.execute(delete(User).where(User.telegram_id >= USER_ID_BASE))
+        await session.commit()
+    # Deleted users must not stay cached
+    user_resolver.clear()
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Compare both write paths on the configured database."""
+    url = args.database_url
+    if url is None:
+        url = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='dcmaidbot-bench-')}/b.db"
+    engine = create_async_engine(url, echo=False, pool_size=args.writers)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await cleanup(session_factory)
+
+    total = args.messages // args.writers * args.writers
+    print(
+        f"📊 {total} messages from {args.writers} concurrent writers "
+        f"({engine.dialect.name}), flush every "
+        f"{MessageWriter.FLUSH_INTERVAL * 1000:.0f}ms or "
+        f"{MessageWriter.FLUSH_ROWS} rows"
+    )
+    print(f"   {'path':<8} {'seconds':>9} {'msgs/s':>10} {'stored':>8}")
+    try:
+        for mode in ("before", "after", "durable"):
+            elapsed = await run_writers(session_factory, args, mode)
+            async with session_factory() as session:
+                stored = await session.scalar(
+                    select(func.count())
+                    .select_from(Message)
+                    .join(User, User.id == Message.user_id)
+                    .where(User.telegram_id >= USER_ID_BASE)
+                )
+            await cleanup(session_factory)
+            print(f"   {mode:<8} {elapsed:>9.2f} {total / elapsed:>10.0f} {stored:>8}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="SQLAlchemy async URL (default: temporary SQLite database)",
+    )
+    parser.add_argument(
+        "--postgres",
+        action="store_true",
+        help="Use DATABASE_URL (e.g. postgresql+asyncpg://...)",
+    )
+    args = parser.parse_args()
+    if args.postgres:
+        args.database_url = os.environ["DATABASE_URL"]
+    asyncio.run(run(args))
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Benchmark per-call OpenAI clients vs the shared pooled client.
+
+Simulates tool-heavy turns: each turn makes one chat completion, then
+--tools concurrent completions (as tools like create_memory do through
+their own LLMService), then the final completion. Two strategies:
+
+- per-call: a new AsyncOpenAI for every call (what constructing
+  LLMService() in ToolExecutor/NudgeService used to do)
+- shared: services.openai_client.get_openai_client()
+
+By default a local fake /v1/chat/completions server is started with
+--server-latency of processing time per request; the number of TCP
+connections it accepted is reported next to per-call latency. Over TLS to
+api.openai.com every new connection additionally pays the TLS handshake,
+so the real gap is larger. Use --base-url (and OPENAI_API_KEY) to run
+against a real endpoint.
+
+Usage:
+    python scripts/benchmark_openai_client.py --turns 20 --tools 3
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openai import AsyncOpenAI  # noqa: E402
+
+from services.openai_client import (  # noqa: E402
+    close_openai_clients,
+    create_openai_client,
+    get_openai_client,
+)
+
+MODEL = "gpt-4o-mini"
+
+
+async def start_fake_server(latency: float) -> tuple[web.AppRunner, str, set]:
+    """Start a fake chat completions endpoint; returns (runner, url, peers)."""
+    peers: set = set()
+
+    async def completions(request: web.Request) -> web.Response:
+        peers.add(request.transport.get_extra_info("peername"))
+        await request.read()
+        await asyncio.sleep(latency)
+        return web.json_response(
+            {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": MODEL,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "ok"},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 10,
+                    "completion_tokens": 1,
+                    "total_tokens": 11,
+                },
+            }
+        )
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/v1", peers
+
+
+async def timed_call(client: AsyncOpenAI, samples: list[float]) -> None:
+    """One small completion, appending its latency in seconds."""
+    start = time.perf_counter()
+    await client.chat.completions.create(
+        model=MODEL,
+        messages=[{"role": "user", "content": "ping"}],
+        max_tokens=1,
+    )
+    samples.append(time.perf_counter() - start)
+
+
+async def run_strategy(
+    name: str, api_key: str, base_url: str, args: argparse.Namespace
+) -> list[float]:
+    """Run all turns with one client strategy; returns per-call latencies."""
+    samples: list[float] = []
+    created: list[AsyncOpenAI] = []
+
+    def client() -> AsyncOpenAI:
+        if name == "shared":
+            return get_openai_client(api_key, base_url)
+        instance = create_openai_client(api_key, base_url)
+        created.append(instance)
+        return instance
+
+    for _ in range(args.turns):
+        await timed_call(client(), samples)
+        await asyncio.gather(
+            *(timed_call(client(), samples) for _ in range(args.tools))
+        )
+        await timed_call(client(), samples)
+        await asyncio.sleep(args.pause)
+
+    for instance in created:
+        await instance.close()
+    await close_openai_clients()
+    return samples
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Compare both strategies."""
+    runner = None
+    peers: set = set()
+    base_url = args.base_url
+    api_key = os.getenv("OPENAI_API_KEY", "bench-key")
+    if base_url is None:
+        runner, base_url, peers = await start_fake_server(args.server_latency)
+
+    print(
+        f"📊 {args.turns} turns × ({args.tools} concurrent tool calls + 2), "
+        f"endpoint {base_url}"
+    )
+    print(
+        f"   {'client':<10} {'calls':>6} {'mean ms':>8} {'p95 ms':>8} "
+        f"{'connections':>12}"
+    )
+    try:
+        for name in ("per-call", "shared"):
+            peers.clear()
+            samples = await run_strategy(name, api_key, base_url, args)
+            connections = str(len(peers)) if runner is not None else "n/a"
+            print(
+                f"   {name:<10} {len(samples):>6} "
+                f"{statistics.mean(samples) * 1000:>8.2f} "
+                f"{percentile(samples, 0.95) * 1000:>8.2f} {connections:>12}"
+            )
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--tools", type=int, default=3)
+    parser.add_argument("--pause", type=float, default=0.05)
+    parser.add_argument("--server-latency", type=float, default=0.01)
+    parser.add_argument("--base-url", default=None)
+    asyncio.run(run(parser.parse_args()))
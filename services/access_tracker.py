@@ -0,0 +1,162 @@
+"""Write-behind tracker for memory access statistics.
+
+MemoryService.get_memory used to bump last_accessed/access_count and commit
+on every read, turning each read into a write transaction (on SQLite that
+serializes the whole bot). Reads now only record the access in memory;
+accumulated (memory_id, count, last_ts) entries are flushed as one batched
+UPDATE (executemany) every FLUSH_INTERVAL seconds, after FLUSH_EVENTS
+accesses, and on shutdown.
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import bindparam, case, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.memory import Memory
+
+_memories = Memory.__table__
+
+
+class AccessTracker:
+    """In-process accumulator of memory reads with periodic batched flush."""
+
+    FLUSH_INTERVAL = float(os.getenv("MEMORY_ACCESS_FLUSH_INTERVAL", "10"))
+    FLUSH_EVENTS = int(os.getenv("MEMORY_ACCESS_FLUSH_EVENTS", "500"))
+
+    # access_count += :count, last_accessed = max(last_accessed, :last_ts)
+    _UPDATE = (
+        update(_memories)
+        .where(_memories.c.id == bindparam("memory_id"))
+        .values(
+            access_count=_memories.c.access_count + bindparam("count"),
+            last_accessed=case(
+                (
+                    (_memories.c.last_accessed.is_(None))
+                    | (_memories.c.last_accessed < bindparam("last_ts")),
+                    bindparam("last_ts"),
+                ),
+                else_=_memories.c.last_accessed,
+            ),
+        )
+    )
+
+    def __init__(self):
+        """Initialize empty tracker."""
+        self._pending: dict[int, tuple[int, datetime]] = {}
+        self._events = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def record(self, memory_id: int, accessed_at: Optional[datetime] = None) -> None:
+        """
+        Record one read of a memory (no I/O).
+
+        Args:
+            memory_id: Memory ID
+            accessed_at: Access time (default: utcnow)
+        """
+        accessed_at = accessed_at or datetime.utcnow()
+        count, last_ts = self._pending.get(memory_id, (0, accessed_at))
+        self._pending[memory_id] = (count + 1, max(last_ts, accessed_at))
+        self._events += 1
+
+        if self._events >= self.FLUSH_EVENTS and self._flush_task is None:
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(
+                    self._flush_in_background()
+                )
+            except RuntimeError:
+                pass  # No running loop; the periodic or shutdown flush picks it up
+
+    def pending(self, memory_id: int) -> Optional[tuple[int, datetime]]:
+        """Get unflushed (count, last_ts) for a memory, if any."""
+        return self._pending.get(memory_id)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def flush(self, session: Optional[AsyncSession] = None) -> int:
+        """
+        Write accumulated access statistics in one batched UPDATE.
+
+        Args:
+            session: Session to use (default: a new AsyncSessionLocal session)
+
+        Returns:
+            Number of memory rows updated
+        """
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            self._events = 0
+
+            params = [
+                {"memory_id": memory_id, "count": count, "last_ts": last_ts}
+                for memory_id, (count, last_ts) in batch.items()
+            ]
+            try:
+                if session is not None:
+                    await session.execute(self._UPDATE, params)
+                    await session.commit()
+                else:
+                    from database import AsyncSessionLocal
+
+                    async with AsyncSessionLocal() as own_session:
+                        await own_session.execute(self._UPDATE, params)
+                        await own_session.commit()
+            except asyncio.CancelledError:
+                self._restore(batch)
+                raise
+            except Exception as e:
+                print(f"⚠️  Memory access flush failed: {e}")
+                self._restore(batch)
+                return 0
+
+            return len(params)
+
+    def _restore(self, batch: dict[int, tuple[int, datetime]]) -> None:
+        """Put an unwritten batch back so the next flush retries it."""
+        for memory_id, (count, last_ts) in batch.items():
+            pending_count, pending_ts = self._pending.get(memory_id, (0, last_ts))
+            self._pending[memory_id] = (pending_count + count, max(pending_ts, last_ts))
+
+    async def start(self) -> None:
+        """Start the periodic flush loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush loop and flush what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_task is not None:
+            await self._flush_task
+        await self.flush()
+
+    async def _run(self) -> None:
+        """Flush every FLUSH_INTERVAL seconds."""
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            await self.flush()
+
+    async def _flush_in_background(self) -> None:
+        """Flush triggered by FLUSH_EVENTS accesses."""
+        try:
+            await self.flush()
+        finally:
+            self._flush_task = None
+
+
+# Global access tracker
+access_tracker = AccessTracker()
@@ -0,0 +1,244 @@
+"""Multi-round tool calling within a latency and token budget.
+
+One user turn may need several tool rounds (search memories, then create
+one, ...). AgentLoop keeps the message list built once by
+LLMService.build_messages() and appends each round's tool calls and results
+to it, so the prompt is not rebuilt and its cached prefix stays intact.
+
+Budgets per turn:
+- AGENT_MAX_TOOL_ROUNDS: tool rounds before the model must answer
+- AGENT_TIME_BUDGET: seconds from message receipt; once less than
+  AGENT_ANSWER_RESERVE is left, no more tools are run and the model answers
+  with what it has (tool calls are limited to the time left as well)
+- AGENT_TOKEN_BUDGET: total tokens of all rounds; once spent, the next
+  request is the final answer
+
+A tool can end the turn early by returning {"final_answer": "..."}; that
+text is the reply and no further LLM round is made.
+
+Every round's text is streamed as it arrives, since a round may turn out to
+be the answer. Text of a round that ends in tool calls ("Let me check...")
+is not part of the reply: the stream then yields a Replacement chunk that
+discards it, so only the final round's text remains. Errors replace the
+partial answer with ERROR_ANSWER the same way.
+
+Per-round timings are recorded in latency_metrics as "agent.llm_round" and
+"agent.tool_round", whole turns as "agent.turn".
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from services.llm_service import LLMService
+from services.metrics import latency_metrics
+
+logger = logging.getLogger(__name__)
+
+# Key of a tool result that ends the turn with its value as the reply
+FINAL_ANSWER_KEY = "final_answer"
+
+FALLBACK_ANSWER = "Nya~ I couldn't generate a response! 💕"
+ERROR_ANSWER = "Myaw~ Something went wrong with my brain! 😿"
+
+ToolRunner = Callable[..., Awaitable[list[dict[str, Any]]]]
+
+
+class Replacement(str):
+    """Streamed chunk that replaces the text streamed so far."""
+
+
+def apply_chunk(text: str, chunk: str) -> str:
+    """Add a streamed chunk to the text, honouring Replacement chunks."""
+    return str(chunk) if isinstance(chunk, Replacement) else text + chunk
+
+
+class AgentLoop:
+    """Answer one turn, running tool rounds until the model is done."""
+
+    MAX_TOOL_ROUNDS = int(os.getenv("AGENT_MAX_TOOL_ROUNDS", "3"))
+    TIME_BUDGET = float(os.getenv("AGENT_TIME_BUDGET", "30"))
+    ANSWER_RESERVE = float(os.getenv("AGENT_ANSWER_RESERVE", "8"))
+    TOKEN_BUDGET = int(os.getenv("AGENT_TOKEN_BUDGET", "16000"))
+
+    def __init__(
+        self,
+        llm_service: LLMService,
+        user_id: int,
+        tools: Optional[list[dict[str, Any]]] = None,
+        execute: Optional[ToolRunner] = None,
+        model: Optional[str] = None,
+    ):
+        """
+        Initialize loop for one turn.
+
+        Args:
+            llm_service: LLM service whose client and models are used
+            user_id: Telegram user ID the tools run for
+            tools: OpenAI tool schemas (optional)
+            execute: Runs a round's tool calls, called as
+                execute(tool_calls, user_id, timeout=seconds)
+                (default: tools.tool_executor.execute_tool_calls)
+            model: Model name (default: llm_service.default_model)
+        """
+        if execute is None:
+            from tools.tool_executor import execute_tool_calls
+
+            execute = execute_tool_calls
+
+        self.llm_service = llm_service
+        self.user_id = user_id
+        self.tools = tools
+        self.execute = execute
+        self.model = model or llm_service.default_model
+
+        # Filled while the turn runs
+        self.rounds: list[dict[str, Any]] = []
+        self.tokens_used = 0
+        self.stop_reason: Optional[str] = None
+
+    async def stream(
+        self,
+        messages: list[dict[str, Any]],
+        started_at: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Run the turn, streaming the model's text.
+
+        Args:
+            messages: Chat messages from build_messages(); tool calls and
+                results are appended in place
+            started_at: time.perf_counter() when the message was received
+                (default: now); the time budget counts from here
+
+        Yields:
+            Text chunks as the model produces them; a Replacement chunk
+            replaces everything yielded before it (see apply_chunk())
+        """
+        started_at = started_at if started_at is not None else time.perf_counter()
+        deadline = started_at + self.TIME_BUDGET
+
+        try:
+            for round_index in range(self.MAX_TOOL_ROUNDS + 1):
+                remaining = deadline - time.perf_counter()
+                if not self.tools:
+                    final_reason = "answer"
+                elif round_index == self.MAX_TOOL_ROUNDS:
+                    final_reason = "max_rounds"
+                elif self.tokens_used >= self.TOKEN_BUDGET:
+                    final_reason = "token_budget"
+                elif remaining <= self.ANSWER_RESERVE:
+                    final_reason = "deadline"
+                else:
+                    final_reason = None
+
+                request_params: dict[str, Any] = {
+                    "model": self.model,
+                    "messages": messages,
+                    "temperature": 0.7,
+                    "max_tokens": 1000,
+                }
+                if self.tools:
+                    request_params["tools"] = self.tools
+                    if final_reason is not None:
+                        request_params["tool_choice"] = "none"
+
+                tool_calls: list[dict[str, Any]] = []
+                usage: dict[str, int] = {}
+                text = ""
+                round_started = time.perf_counter()
+                async for chunk in self.llm_service.stream_completion(
+                    request_params,
+                    tool_calls,
+                    usage,
+                    method="agent_round",
+                    deadline=max(remaining, self.ANSWER_RESERVE),
+                ):
+                    text += chunk
+                    yield chunk
+                llm_seconds = time.perf_counter() - round_started
+                latency_metrics.observe("agent.llm_round", llm_seconds)
+                self.tokens_used += usage.get("total_tokens", 0)
+                round_info = {
+                    "llm_ms": round(llm_seconds * 1000, 1),
+                    "tokens": usage.get("total_tokens", 0),
+                    "tool_calls": [call["function"]["name"] for call in tool_calls],
+                }
+                self.rounds.append(round_info)
+
+                if not tool_calls or final_reason is not None:
+                    self.stop_reason = final_reason or "answer"
+                    return
+
+                if text:
+                    # Pre-tool text is context for the model, not the reply
+                    yield Replacement("")
+                messages.append(
+                    {
+                        "role": "assistant",
+                        "content": text or None,
+                        "tool_calls": tool_calls,
+                    }
+                )
+                tools_started = time.perf_counter()
+                tool_budget = deadline - tools_started - self.ANSWER_RESERVE
+                tool_results = await self.execute(
+                    tool_calls, self.user_id, timeout=max(tool_budget, 1.0)
+                )
+                tool_seconds = time.perf_counter() - tools_started
+                latency_metrics.observe("agent.tool_round", tool_seconds)
+                round_info["tools_ms"] = round(tool_seconds * 1000, 1)
+
+                final_answers = []
+                for tool_result in tool_results:
+                    result = tool_result["result"]
+                    messages.append(
+                        {
+                            "role": "tool",
+                            "tool_call_id": tool_result["tool_call_id"],
+                            "content": json.dumps(result),
+                        }
+                    )
+                    if isinstance(result, dict) and isinstance(
+                        result.get(FINAL_ANSWER_KEY), str
+                    ):
+                        final_answers.append(result[FINAL_ANSWER_KEY])
+
+                if final_answers:
+                    self.stop_reason = "tool_final_answer"
+                    yield "\n\n".join(final_answers)
+                    return
+
+        except Exception as e:
+            logger.error(f"Agent loop error for user {self.user_id}: {e}")
+            self.stop_reason = "error"
+            yield Replacement(ERROR_ANSWER)
+
+        finally:
+            turn_seconds = time.perf_counter() - started_at
+            latency_metrics.observe("agent.turn", turn_seconds)
+            logger.info(
+                f"Agent turn for user {self.user_id}: {len(self.rounds)} rounds, "
+                f"{self.tokens_used} tokens, {turn_seconds:.2f}s, "
+                f"stop={self.stop_reason}"
+            )
+
+    async def run(
+        self,
+        messages: list[dict[str, Any]],
+        started_at: Optional[float] = None,
+    ) -> str:
+        """
+        Run the turn and return the whole answer.
+
+        Same arguments as stream().
+
+        Returns:
+            Reply text
+        """
+        text = ""
+        async for chunk in self.stream(messages, started_at):
+            text = apply_chunk(text, chunk)
+        return text.strip() or FALLBACK_ANSWER
@@ -0,0 +1,209 @@
+"""Process-wide registry of memory categories.
+
+The categories table is small and almost static (seeded by
+scripts/seed_categories.py), so it is loaded once into dictionaries:
+full_path -> id, domain -> ids and the parent/child tree with
+precomputed subtrees. Category names from tools and search filters resolve
+without queries.
+
+The registry is preloaded at startup and reloaded every REFRESH_INTERVAL
+seconds on next use (picks up re-seeding by another process). A commit that
+inserts, updates or deletes a Category in this process invalidates it, so
+the next use reloads.
+"""
+
+import asyncio
+import os
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.memory import Category
+
+
+class CategoryRegistry:
+    """In-memory index of the categories table."""
+
+    REFRESH_INTERVAL = float(os.getenv("CATEGORY_REFRESH_INTERVAL", "300"))
+
+    def __init__(self):
+        """Initialize empty registry."""
+        self._by_path: dict[str, int] = {}
+        self._by_domain: dict[str, list[int]] = {}
+        self._paths: dict[int, str] = {}
+        self._children: dict[int, list[int]] = {}
+        self._subtrees: dict[int, frozenset[int]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the registry holds a fresh copy of the table."""
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.REFRESH_INTERVAL
+        )
+
+    async def load(self, session: AsyncSession) -> None:
+        """
+        (Re)load all categories with a single query.
+
+        Args:
+            session: SQLAlchemy async session
+        """
+        result = await session.execute(
+            select(
+                Category.id,
+                Category.domain,
+                Category.full_path,
+                Category.parent_id,
+            )
+        )
+        self._build(result.all())
+
+    async def preload(self) -> None:
+        """Load at startup with a new AsyncSessionLocal session."""
+        from database import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as session:
+                await self.load(session)
+            print(f"✅ Loaded {len(self)} categories")
+        except Exception as e:
+            print(f"⚠️  Category preload failed: {e}")
+            print("   Categories will be loaded on first use")
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        """Load the registry if it is empty or older than REFRESH_INTERVAL."""
+        if self.loaded:
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self.load(session)
+
+    def invalidate(self) -> None:
+        """Force a reload on next use."""
+        self._loaded_at = None
+
+    def resolve(self, names: Iterable[str], expand: bool = False) -> list[int]:
+        """
+        Resolve category names to ids without queries.
+
+        Args:
+            names: Full paths ("social.person") or, with expand, domains
+                ("social"); bare names are ambiguous across domains
+            expand: Include every category below each match (subtree), and
+                accept domains as names of all their categories
+
+        Returns:
+            Category ids in first-seen order; unknown names are skipped
+        """
+        ids: dict[int, None] = {}
+        for name in names:
+            category_id = self._by_path.get(name)
+            if category_id is not None:
+                if expand:
+                    ids.update(dict.fromkeys(sorted(self._subtrees[category_id])))
+                else:
+                    ids[category_id] = None
+            elif expand and name in self._by_domain:
+                for domain_id in self._by_domain[name]:
+                    ids.update(dict.fromkeys(sorted(self._subtrees[domain_id])))
+        return list(ids)
+
+    def expand(self, category_ids: Iterable[int]) -> list[int]:
+        """
+        Expand category ids with all their descendants.
+
+        Args:
+            category_ids: Category ids
+
+        Returns:
+            Sorted ids of the categories and their subtrees
+        """
+        expanded: set[int] = set()
+        for category_id in category_ids:
+            expanded |= self._subtrees.get(category_id, frozenset((category_id,)))
+        return sorted(expanded)
+
+    def domain_ids(self, domain: str) -> list[int]:
+        """Ids of all categories in a domain."""
+        return list(self._by_domain.get(domain, []))
+
+    def children(self, category_id: int) -> list[int]:
+        """Ids of direct child categories."""
+        return list(self._children.get(category_id, []))
+
+    def path(self, category_id: int) -> Optional[str]:
+        """Full path of a category id."""
+        return self._paths.get(category_id)
+
+    def _build(self, rows: list[tuple]) -> None:
+        """Rebuild all indexes from (id, domain, full_path, parent_id)."""
+        by_path: dict[str, int] = {}
+        by_domain: dict[str, list[int]] = {}
+        parents: dict[int, Optional[int]] = {}
+        for category_id, domain, full_path, parent_id in sorted(rows):
+            by_path[full_path] = category_id
+            by_domain.setdefault(domain, []).append(category_id)
+            parents[category_id] = parent_id
+
+        # Parent from parent_id, else from the dotted path ("a.b.c" -> "a.b")
+        children: dict[int, list[int]] = {}
+        for full_path, category_id in by_path.items():
+            parent_id = parents[category_id]
+            if parent_id is None and "." in full_path:
+                parent_id = by_path.get(full_path.rsplit(".", 1)[0])
+            if parent_id is not None and parent_id != category_id:
+                children.setdefault(parent_id, []).append(category_id)
+
+        subtrees: dict[int, frozenset[int]] = {}
+        for category_id in parents:
+            seen = {category_id}
+            stack = [category_id]
+            while stack:
+                for child in children.get(stack.pop(), []):
+                    if child not in seen:
+                        seen.add(child)
+                        stack.append(child)
+            subtrees[category_id] = frozenset(seen)
+
+        self._by_path = by_path
+        self._by_domain = by_domain
+        self._paths = {category_id: path for path, category_id in by_path.items()}
+        self._children = children
+        self._subtrees = subtrees
+        self._loaded_at = time.monotonic()
+
+
+# Global category registry
+category_registry = CategoryRegistry()
+
+
+@event.listens_for(Session, "after_flush")
+def _note_category_changes(session: Session, flush_context) -> None:
+    """Mark sessions that wrote categories (see _invalidate_on_commit)."""
+    if any(
+        isinstance(obj, Category)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        session.info["categories_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    """Invalidate the registry once category changes are committed."""
+    if session.info.pop("categories_changed", False):
+        category_registry.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_category_changes(session: Session) -> None:
+    """Rolled back category changes need no reload."""
+    session.info.pop("categories_changed", None)
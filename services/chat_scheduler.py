@@ -0,0 +1,207 @@
+"""Per-chat ordered work queue with burst merging.
+
+Users often send several short messages in a row. Instead of one LLM turn
+per message (with interleaving replies), each chat gets a worker that
+handles its messages in arrival order and merges a burst into one turn:
+
+- CHAT_DEBOUNCE: after a message, wait this long for more before starting
+  the turn (the window slides with each message, up to CHAT_MAX_DEBOUNCE).
+  Default 0: a turn starts at once, and only messages that arrive while
+  the previous turn runs are merged, so idle chats get no added latency
+- CHAT_MAX_BATCH: messages merged into one turn at most; only consecutive
+  messages with the same merge key (sender) are merged
+- CHAT_QUEUE_SIZE: messages waiting per chat; when full, CHAT_SHED_POLICY
+  decides: drop_oldest (default) or drop_newest
+- CHAT_MAX_QUEUED: messages waiting across all chats; beyond that new
+  messages are rejected
+- CHAT_CONCURRENCY: turns processed at once across all chats
+- CHAT_DRAIN_TIMEOUT: seconds shutdown waits for queued turns (drain())
+  before cancelling the rest (stop())
+
+Messages arriving while a turn runs wait for it, so replies never
+interleave within a chat. Callers store messages before submitting them,
+so shed or merged messages are still in the history.
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[list[Any]], Awaitable[None]]
+
+
+class ChatScheduler:
+    """Run each chat's work in order, merging bursts into batches."""
+
+    DEBOUNCE = float(os.getenv("CHAT_DEBOUNCE", "0"))
+    MAX_DEBOUNCE = float(os.getenv("CHAT_MAX_DEBOUNCE", "4.0"))
+    MAX_BATCH = int(os.getenv("CHAT_MAX_BATCH", "5"))
+    QUEUE_SIZE = int(os.getenv("CHAT_QUEUE_SIZE", "10"))
+    MAX_QUEUED = int(os.getenv("CHAT_MAX_QUEUED", "500"))
+    CONCURRENCY = int(os.getenv("CHAT_CONCURRENCY", "16"))
+    SHED_POLICY = os.getenv("CHAT_SHED_POLICY", "drop_oldest")
+    DRAIN_TIMEOUT = float(os.getenv("CHAT_DRAIN_TIMEOUT", "20"))
+
+    def __init__(self):
+        """Initialize with no active chats."""
+        self._queues: dict[int, deque[tuple[Hashable, Any]]] = {}
+        self._arrivals: dict[int, asyncio.Event] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self._queued = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = {
+            "submitted": 0,
+            "turns": 0,
+            "merged": 0,
+            "shed": 0,
+            "rejected": 0,
+        }
+
+    def submit(
+        self,
+        chat_id: int,
+        item: Any,
+        handler: BatchHandler,
+        merge_key: Hashable = None,
+    ) -> bool:
+        """
+        Queue an item for its chat's worker.
+
+        Args:
+            chat_id: Chat the item belongs to
+            item: Work item (e.g. an incoming message)
+            handler: Called with a list of merged items, in order
+            merge_key: Only consecutive items with equal keys are merged
+                (e.g. the sender's user ID)
+
+        Returns:
+            False if the item was rejected because of backpressure
+        """
+        if self._queued >= self.MAX_QUEUED:
+            self._stats["rejected"] += 1
+            logger.warning(f"Chat scheduler full, rejected item for chat {chat_id}")
+            return False
+
+        queue = self._queues.setdefault(chat_id, deque())
+        if len(queue) >= self.QUEUE_SIZE:
+            if self.SHED_POLICY == "drop_newest":
+                self._stats["rejected"] += 1
+                return False
+            queue.popleft()
+            self._queued -= 1
+            self._stats["shed"] += 1
+            logger.warning(f"Chat {chat_id} queue full, dropped oldest item")
+
+        queue.append((merge_key, item))
+        self._queued += 1
+        self._stats["submitted"] += 1
+
+        arrival = self._arrivals.setdefault(chat_id, asyncio.Event())
+        arrival.set()
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._worker(chat_id, handler))
+        return True
+
+    async def _collect(self, chat_id: int) -> list[Any]:
+        """Wait out the debounce window and take the next batch."""
+        loop = asyncio.get_running_loop()
+        queue = self._queues[chat_id]
+        arrival = self._arrivals[chat_id]
+        window_end = loop.time() + self.MAX_DEBOUNCE
+
+        while len(queue) < self.MAX_BATCH:
+            arrival.clear()
+            timeout = min(self.DEBOUNCE, window_end - loop.time())
+            if timeout <= 0:
+                break
+            try:
+                await asyncio.wait_for(arrival.wait(), timeout)
+            except asyncio.TimeoutError:
+                break
+
+        merge_key = queue[0][0]
+        batch = []
+        while queue and len(batch) < self.MAX_BATCH and queue[0][0] == merge_key:
+            batch.append(queue.popleft()[1])
+        self._queued -= len(batch)
+        return batch
+
+    async def _worker(self, chat_id: int, handler: BatchHandler) -> None:
+        """Process a chat's queue until it is empty."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.CONCURRENCY)
+        queue = self._queues[chat_id]
+        try:
+            while queue:
+                batch = await self._collect(chat_id)
+                self._stats["turns"] += 1
+                self._stats["merged"] += len(batch) - 1
+                async with self._semaphore:
+                    try:
+                        await handler(batch)
+                    except Exception as e:
+                        logger.error(
+                            f"Chat {chat_id} handler error: {e}", exc_info=True
+                        )
+        finally:
+            # Drop what's left if the worker was cancelled
+            self._queued -= len(queue)
+            del self._queues[chat_id]
+            del self._arrivals[chat_id]
+            del self._workers[chat_id]
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all queued work is processed.
+
+        Args:
+            timeout: Give up after this many seconds (workers keep running)
+
+        Returns:
+            False if work was still pending when the timeout expired
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while self._workers:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                logger.warning(
+                    f"Chat scheduler drain timed out, {self._queued} items queued"
+                )
+                return False
+            await asyncio.wait(list(self._workers.values()), timeout=remaining)
+        return True
+
+    async def stop(self) -> None:
+        """Cancel all workers, dropping queued work (on shutdown)."""
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        # Workers cancelled before they started never ran their cleanup
+        self._queues.clear()
+        self._arrivals.clear()
+        self._workers.clear()
+        self._queued = 0
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Scheduler statistics.
+
+        Returns:
+            Active chats, queued items and counts of submitted items, turns,
+            merged, shed and rejected items
+        """
+        return {
+            "active_chats": len(self._workers),
+            "queued": self._queued,
+            **self._stats,
+        }
+
+
+# Global chat scheduler
+chat_scheduler = ChatScheduler()
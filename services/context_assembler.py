@@ -0,0 +1,125 @@
+"""Concurrent assembly of the per-message LLM context.
+
+handle_message needs lessons, relevant memories and recent history. These
+are independent, so each read stage runs in its own session (its own pooled
+connection) concurrently instead of one after another on a single session.
+Callers store incoming messages themselves as soon as they arrive (before
+they are queued, merged or shed) and pass their Telegram message IDs, so
+they don't leak into their own history. Everything else stored before the
+history read, including the reply to a previous turn, is part of it.
+
+A failing read stage degrades to an empty result instead of failing the
+reply. Per-stage timings are recorded in latency_metrics as
+"context.<stage>" and "context.total".
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Collection, Optional
+
+from services.lesson_service import LessonService
+from services.memory_ranker import estimate_vad
+from services.memory_service import MemoryService
+from services.message_service import MessageService
+from services.metrics import latency_metrics
+
+
+class ContextAssembler:
+    """Load lessons, memories and history concurrently."""
+
+    MEMORY_LIMIT = 10
+    HISTORY_LIMIT = 20
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        """
+        Initialize assembler.
+
+        Args:
+            session_factory: Async session factory (default: AsyncSessionLocal)
+        """
+        self.session_factory = session_factory
+
+    async def assemble(
+        self,
+        user_id: int,
+        chat_id: int,
+        text: str,
+        exclude_message_ids: Optional[Collection[int]] = None,
+    ) -> dict[str, Any]:
+        """
+        Build the context for one incoming message (or merged burst).
+
+        Args:
+            user_id: Telegram user ID
+            chat_id: Telegram chat ID
+            text: Message text (memory query)
+            exclude_message_ids: Telegram message IDs of the turn's own
+                (already stored) messages, left out of the history
+
+        Returns:
+            {"lessons", "memories", "message_history", "timings"} where
+            timings maps stage name to milliseconds
+        """
+        session_factory = self.session_factory
+        if session_factory is None:
+            from database import AsyncSessionLocal
+
+            session_factory = AsyncSessionLocal
+
+        # Memories close to the message's mood rank higher (MemoryRanker)
+        emotion = estimate_vad(text)
+        timings: dict[str, float] = {}
+
+        async def stage(name: str, work: Callable[[Any], Awaitable[Any]]) -> Any:
+            started = time.perf_counter()
+            try:
+                async with session_factory() as session:
+                    return await work(session)
+            finally:
+                seconds = time.perf_counter() - started
+                latency_metrics.observe(f"context.{name}", seconds)
+                timings[name] = round(seconds * 1000, 1)
+
+        started = time.perf_counter()
+        lessons, memories, history = await asyncio.gather(
+            stage("lessons", lambda s: LessonService(s).get_all_lessons()),
+            stage(
+                "memories",
+                lambda s: MemoryService(s).search_memories(
+                    user_id=user_id,
+                    query=text,
+                    limit=self.MEMORY_LIMIT,
+                    emotion=emotion,
+                ),
+            ),
+            stage(
+                "history",
+                lambda s: MessageService(s).get_recent_messages(
+                    user_id=user_id,
+                    chat_id=chat_id,
+                    limit=self.HISTORY_LIMIT,
+                    exclude_message_ids=exclude_message_ids,
+                ),
+            ),
+            return_exceptions=True,
+        )
+        seconds = time.perf_counter() - started
+        latency_metrics.observe("context.total", seconds)
+        timings["total"] = round(seconds * 1000, 1)
+
+        results = {"lessons": lessons, "memories": memories, "history": history}
+        for name, result in results.items():
+            if isinstance(result, BaseException):
+                print(f"⚠️  Context stage {name} failed: {result}")
+                results[name] = []
+
+        return {
+            "lessons": results["lessons"],
+            "memories": results["memories"],
+            "message_history": results["history"],
+            "timings": timings,
+        }
+
+
+# Global context assembler
+context_assembler = ContextAssembler()
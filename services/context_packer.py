@@ -0,0 +1,145 @@
+"""Token-budgeted packing of memories and message history into the prompt.
+
+Token counts come from a local estimator calibrated against OpenAI's
+o200k_base tokenizer (gpt-4o family): runs of Latin letters cost about one
+token per 5 characters, other scripts (Cyrillic, ...) about one per 3,
+digits one per 3 and every other symbol one. It needs no network or
+tokenizer files and slightly overestimates, so the real prompt stays within
+budget.
+
+The packer fills a per-model-tier budget in priority order:
+1. the most recent CONTEXT_RECENT_MESSAGES messages (newest first)
+2. memories in ranking order
+3. older messages (newest first)
+Items longer than CONTEXT_ITEM_MAX_TOKENS, or than the budget left, are
+truncated at a word boundary instead of dropped.
+"""
+
+import math
+import os
+import re
+
+_PIECE_RE = re.compile(r"[^\W\d_]+|\d+|\S")
+
+ELLIPSIS = "…"
+
+
+def _piece_tokens(piece: str) -> int:
+    """Estimated tokens of one letter run, digit run or symbol."""
+    if piece.isdigit():
+        return math.ceil(len(piece) / 3)
+    if piece.isalpha():
+        if piece.isascii():
+            return math.ceil(len(piece) / 5)
+        return math.ceil(len(piece) / 3)
+    return 1
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in text.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Estimated token count
+    """
+    return sum(_piece_tokens(piece) for piece in _PIECE_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to at most max_tokens (estimated), ending with an ellipsis.
+
+    Args:
+        text: Text to shorten
+        max_tokens: Token limit including the ellipsis
+
+    Returns:
+        The text itself if it fits, else its longest fitting prefix
+    """
+    if max_tokens <= 0:
+        return ""
+    total = 0
+    cut = 0
+    for match in _PIECE_RE.finditer(text):
+        total += _piece_tokens(match.group())
+        if total > max_tokens - 1:
+            break
+        cut = match.end()
+    else:
+        return text
+    return text[:cut].rstrip() + ELLIPSIS
+
+
+class ContextPacker:
+    """Fit memories and history into a token budget by priority."""
+
+    DEFAULT_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))
+    COMPLEX_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET_COMPLEX", "6000"))
+    ITEM_MAX_TOKENS = int(os.getenv("CONTEXT_ITEM_MAX_TOKENS", "400"))
+    RECENT_MESSAGES = int(os.getenv("CONTEXT_RECENT_MESSAGES", "4"))
+
+    # Don't add an item truncated to fewer tokens than this
+    MIN_ITEM_TOKENS = 16
+
+    def budget_for(self, complex_model: bool = False) -> int:
+        """Token budget of the per-turn context for a model tier."""
+        return self.COMPLEX_BUDGET if complex_model else self.DEFAULT_BUDGET
+
+    def pack(
+        self, memories: list[str], history: list[str], budget: int
+    ) -> tuple[list[str], list[str]]:
+        """
+        Select and truncate items to fit the budget.
+
+        Args:
+            memories: Rendered memories, best first
+            history: Rendered messages, oldest first
+            budget: Total tokens for all items
+
+        Returns:
+            (memories kept, best first; messages kept, oldest first)
+        """
+        remaining = budget
+
+        def take(text: str):
+            nonlocal remaining
+            limit = min(self.ITEM_MAX_TOKENS, remaining)
+            cost = count_tokens(text)
+            if cost > limit:
+                if limit < self.MIN_ITEM_TOKENS:
+                    return None
+                text = truncate_to_tokens(text, limit)
+                cost = count_tokens(text)
+            remaining -= cost
+            return text
+
+        kept_history: dict[int, str] = {}
+        split = max(0, len(history) - self.RECENT_MESSAGES)
+        for index in range(len(history) - 1, split - 1, -1):
+            text = take(history[index])
+            if text is None:
+                break
+            kept_history[index] = text
+
+        kept_memories = []
+        for memory in memories:
+            text = take(memory)
+            if text is None:
+                break
+            kept_memories.append(text)
+
+        if len(kept_history) == len(history) - split:
+            for index in range(split - 1, -1, -1):
+                text = take(history[index])
+                if text is None:
+                    break
+                kept_history[index] = text
+
+        return kept_memories, [kept_history[i] for i in sorted(kept_history)]
+
+
+# Global context packer
+context_packer = ContextPacker()
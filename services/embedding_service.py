@@ -0,0 +1,183 @@
+"""Text embedding backends for vector memory retrieval.
+
+Two interchangeable embedders are provided:
+- SentenceTransformerEmbedder: semantic embeddings via sentence-transformers
+- HashingEmbedder: deterministic feature-hashing embeddings (offline, tests)
+
+Both return L2-normalized float32 vectors, so cosine similarity is a plain
+dot product. The active backend is selected with EMBEDDING_BACKEND.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+import numpy as np
+
+from models.memory import EMBEDDING_DIM
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def pack_vector(vector: np.ndarray) -> bytes:
+    """Pack a vector into a little-endian float32 BLOB (SQLite storage)."""
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+
+def unpack_vector(blob: bytes) -> np.ndarray:
+    """Unpack a little-endian float32 BLOB into a vector."""
+    return np.frombuffer(blob, dtype="<f4").astype(np.float32)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place, leaving zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+class Embedder(ABC):
+    """Base class for text embedders."""
+
+    name: str = "base"
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        """
+        Initialize embedder.
+
+        Args:
+            dim: Output vector dimension
+        """
+        self.dim = dim
+
+    @abstractmethod
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed texts synchronously (CPU-bound).
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 matrix of shape (len(texts), dim) with L2-normalized rows
+        """
+
+    async def aembed_batch(self, texts: list[str]) -> np.ndarray:
+        """Embed texts in a worker thread so the event loop is not blocked."""
+        return await asyncio.to_thread(self.embed_batch, texts)
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed a single text."""
+        return (await self.aembed_batch([text]))[0]
+
+
+class HashingEmbedder(Embedder):
+    """Deterministic feature-hashing embedder.
+
+    Hashes lowercase word tokens and character trigrams into a signed
+    fixed-size vector. No model download and no network, which makes it
+    suitable for offline tests and benchmarks. Trigrams give some tolerance
+    to inflection ("programming" vs "programmer", Russian word endings).
+    """
+
+    name = "hashing-v1"
+
+    TRIGRAM_WEIGHT = 0.5
+
+    def _features(self, text: str) -> dict[int, float]:
+        """Map text to hashed feature weights."""
+        features: dict[int, float] = {}
+        for token in _TOKEN_RE.findall(text.lower()):
+            grams = [(token, 1.0)]
+            padded = f"#{token}#"
+            grams.extend(
+                (padded[i : i + 3], self.TRIGRAM_WEIGHT) for i in range(len(padded) - 2)
+            )
+            for gram, weight in grams:
+                digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                index = value % self.dim
+                sign = 1.0 if (value >> 63) & 1 else -1.0
+                features[index] = features.get(index, 0.0) + sign * weight
+        return features
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        """Embed texts with feature hashing."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for index, weight in self._features(text or "").items():
+                matrix[row, index] = weight
+        return _normalize(matrix)
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """Semantic embedder backed by sentence-transformers (lazy model load)."""
+
+    def __init__(self, model_name: Optional[str] = None, dim: int = EMBEDDING_DIM):
+        """
+        Initialize sentence-transformers embedder.
+
+        Args:
+            model_name: Hugging Face model name (default: EMBEDDING_MODEL env)
+            dim: Expected output dimension (must match the pgvector column)
+        """
+        super().__init__(dim)
+        self.model_name = model_name or os.getenv(
+            "EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
+        )
+        self.name = self.model_name
+        self._model: Any = None
+
+    def _load_model(self) -> Any:
+        """Load the model on first use."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            model = SentenceTransformer(self.model_name)
+            model_dim = model.get_sentence_embedding_dimension()
+            if model_dim != self.dim:
+                raise ValueError(
+                    f"Embedding model {self.model_name} produces {model_dim}-dim "
+                    f"vectors but EMBEDDING_DIM is {self.dim}"
+                )
+            self._model = model
+        return self._model
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        """Embed texts with the sentence-transformers model."""
+        model = self._load_model()
+        vectors = model.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+# Global embedder instance (lazy initialization)
+_embedder_instance: Optional[Embedder] = None
+
+
+def get_embedder() -> Optional[Embedder]:
+    """Get or create the configured embedder.
+
+    EMBEDDING_BACKEND selects the backend:
+    - "sentence-transformers": semantic embeddings (production)
+    - "hashing": deterministic hashing embeddings (offline/testing)
+    - unset/"none": vector retrieval disabled
+
+    Returns:
+        Embedder instance or None when vector retrieval is disabled
+    """
+    global _embedder_instance
+    backend = os.getenv("EMBEDDING_BACKEND", "").strip().lower()
+    if backend in ("", "none"):
+        return None
+    if _embedder_instance is None:
+        if backend == "hashing":
+            _embedder_instance = HashingEmbedder()
+        elif backend == "sentence-transformers":
+            _embedder_instance = SentenceTransformerEmbedder()
+        else:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+    return _embedder_instance
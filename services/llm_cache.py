@@ -0,0 +1,310 @@
+"""Content-addressed cache for deterministic LLM calls.
+
+Enrichment calls (VAD, Zettelkasten attributes, importance, relation
+strength/reason, compaction) run at low temperature on the same texts again
+and again, e.g. when memories are versioned or re-linked. Their results are
+cached under a SHA-256 of (model, messages, params), so a repeated call costs
+no tokens and no OpenAI round trip.
+
+Backends (LLM_CACHE_BACKEND):
+- redis: shared between replicas, read through RedisService's local tier
+  when enabled; entries expire after LLM_CACHE_TTL and a sorted-set index
+  evicts the oldest beyond LLM_CACHE_MAX_ENTRIES
+- sqlite: local file (LLM_CACHE_PATH) with the same TTL and size bound
+- none: disabled
+
+Only methods listed in LLM_CACHE_METHODS are cached.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from services.redis_service import redis_service
+
+DEFAULT_METHODS = (
+    "enrich_memory",
+    "calculate_importance",
+    "extract_vad_emotions",
+    "generate_zettelkasten_attributes",
+    "calculate_relation_strength",
+    "generate_relation_reason",
+    "compact_memory",
+)
+
+
+class RedisLLMCacheBackend:
+    """Entries as JSON keys with TTL plus a sorted-set index for eviction."""
+
+    PREFIX = "llm:cache:"
+    INDEX_KEY = "llm:cache:index"
+
+    def __init__(self, ttl: int, max_entries: int):
+        """
+        Initialize backend.
+
+        Args:
+            ttl: Entry lifetime in seconds
+            max_entries: Entries kept before the oldest are evicted
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    async def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Get an entry (local tier first, if enabled)."""
+        return await redis_service.get_json(self.PREFIX + key)
+
+    async def set(self, key: str, entry: dict[str, Any]) -> None:
+        """Store an entry and evict expired/oldest ones from the index."""
+        if not await redis_service.set_json(self.PREFIX + key, entry, self.ttl):
+            return
+        client = redis_service.redis
+        now = time.time()
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.zadd(self.INDEX_KEY, {key: now})
+            pipe.zremrangebyscore(self.INDEX_KEY, "-inf", now - self.ttl)
+            pipe.zcard(self.INDEX_KEY)
+            size = (await pipe.execute())[-1]
+            if size > self.max_entries:
+                evicted = await client.zpopmin(self.INDEX_KEY, size - self.max_entries)
+                if evicted:
+                    await client.delete(
+                        *(self.PREFIX + member for member, _ in evicted)
+                    )
+        except Exception as e:
+            print(f"⚠️  LLM cache eviction error: {e}")
+
+    async def clear(self) -> None:
+        """Drop all entries."""
+        client = redis_service.redis
+        if not client:
+            return
+        try:
+            members = await client.zrange(self.INDEX_KEY, 0, -1)
+            keys = [self.PREFIX + member for member in members]
+            await client.delete(self.INDEX_KEY, *keys)
+        except Exception as e:
+            print(f"⚠️  LLM cache clear error: {e}")
+
+
+class SQLiteLLMCacheBackend:
+    """Entries in a local SQLite file, evicted by age and count."""
+
+    def __init__(self, path: str, ttl: int, max_entries: int):
+        """
+        Initialize backend (the file is opened on first use).
+
+        Args:
+            path: SQLite database file
+            ttl: Entry lifetime in seconds
+            max_entries: Entries kept before the oldest are evicted
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_cache_created_at "
+                "ON llm_cache (created_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT value FROM llm_cache WHERE key = ? AND created_at > ?",
+                    (key, time.time() - self.ttl),
+                )
+                .fetchone()
+            )
+        return json.loads(row[0]) if row else None
+
+    def _set(self, key: str, entry: dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?)",
+                    (key, json.dumps(entry), now),
+                )
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl,)
+                )
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache "
+                    "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def _clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM llm_cache")
+
+    async def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Get an unexpired entry."""
+        try:
+            return await asyncio.to_thread(self._get, key)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"⚠️  LLM cache read error: {e}")
+            return None
+
+    async def set(self, key: str, entry: dict[str, Any]) -> None:
+        """Store an entry and evict expired/oldest ones."""
+        try:
+            await asyncio.to_thread(self._set, key, entry)
+        except sqlite3.Error as e:
+            print(f"⚠️  LLM cache write error: {e}")
+
+    async def clear(self) -> None:
+        """Drop all entries."""
+        await asyncio.to_thread(self._clear)
+
+
+class LLMCache:
+    """Per-method opt-in result cache with hit/miss statistics."""
+
+    BACKEND = os.getenv("LLM_CACHE_BACKEND", "redis")
+    TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        methods: Optional[list[str]] = None,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            backend: "redis", "sqlite" or "none" (default LLM_CACHE_BACKEND)
+            methods: Cached LLMService methods (default LLM_CACHE_METHODS,
+                else DEFAULT_METHODS)
+        """
+        backend = backend or self.BACKEND
+        if methods is None:
+            configured = os.getenv("LLM_CACHE_METHODS")
+            methods = (
+                [m.strip() for m in configured.split(",") if m.strip()]
+                if configured is not None
+                else list(DEFAULT_METHODS)
+            )
+        self.methods = frozenset(methods)
+        self.backend: Any = None
+        if backend == "redis":
+            self.backend = RedisLLMCacheBackend(self.TTL, self.MAX_ENTRIES)
+        elif backend == "sqlite":
+            self.backend = SQLiteLLMCacheBackend(self.PATH, self.TTL, self.MAX_ENTRIES)
+        self.backend_name = backend if self.backend is not None else "none"
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def enabled_for(self, method: str) -> bool:
+        """Whether results of an LLMService method are cached."""
+        return self.backend is not None and method in self.methods
+
+    @staticmethod
+    def key(model: str, messages: list[dict[str, Any]], params: dict) -> str:
+        """
+        Content address of a completion request.
+
+        Args:
+            model: Model name
+            messages: Chat messages
+            params: Remaining request parameters (temperature, max_tokens, ...)
+
+        Returns:
+            SHA-256 hex digest
+        """
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, method: str, key: str) -> Optional[str]:
+        """
+        Look up a cached completion.
+
+        Args:
+            method: LLMService method name (for statistics)
+            key: Content address from key()
+
+        Returns:
+            Cached completion text, or None on a miss
+        """
+        entry = await self.backend.get(key)
+        stats = self._stats.setdefault(
+            method, {"hits": 0, "misses": 0, "tokens_saved": 0}
+        )
+        if isinstance(entry, dict) and isinstance(entry.get("content"), str):
+            stats["hits"] += 1
+            stats["tokens_saved"] += int(entry.get("tokens") or 0)
+            return entry["content"]
+        stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, content: str, tokens: int = 0) -> None:
+        """
+        Store a completion.
+
+        Args:
+            key: Content address from key()
+            content: Completion text
+            tokens: Total tokens the call used (reported as saved on hits)
+        """
+        await self.backend.set(key, {"content": content, "tokens": tokens})
+
+    async def clear(self) -> None:
+        """Drop all entries and statistics."""
+        if self.backend is not None:
+            await self.backend.clear()
+        self._stats.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get cache configuration and per-method statistics.
+
+        Returns:
+            Backend, cached methods and hits/misses/hit_ratio/tokens_saved
+            per method
+        """
+        methods = {}
+        for method, stats in sorted(self._stats.items()):
+            total = stats["hits"] + stats["misses"]
+            methods[method] = {
+                **stats,
+                "hit_ratio": round(stats["hits"] / total, 3) if total else 0.0,
+            }
+        return {
+            "backend": self.backend_name,
+            "cached_methods": sorted(self.methods),
+            "methods": methods,
+        }
+
+
+# Global LLM result cache
+llm_cache = LLMCache()
@@ -0,0 +1,323 @@
+"""Compact binary cache format for Memory rows.
+
+Replaces the JSON dict cached under memory:{id}. Layout (little-endian):
+
+    header   version:u8 flags:u8 summary_end:u32
+    fixed    id, created_by, importance, version, access_count, parent_id,
+             created_at/updated_at/last_accessed (epoch microseconds),
+             emotion valence/arousal/dominance (NaN = None)
+    summary  simple_content, emotion_label, context_temporal,
+             context_situational, keywords, tags, evolution_triggers,
+             category ids
+    body     full_content (compressed when large)
+
+Strings are u32 length-prefixed UTF-8. The summary ends at summary_end, so a
+projection without full_content can be decoded from a prefix of the value
+(GETRANGE) and the body is never decompressed or decoded for it.
+
+Large bodies are compressed according to MEMORY_CACHE_COMPRESSION: "auto"
+(default) uses zstd when the optional ``zstandard`` package is installed and
+stores the body raw otherwise; "zstd", "zlib" and "none" force a codec
+(zlib trades decode time for ~3x smaller values). Values with an unknown
+version byte (e.g. JSON written by older releases) raise ValueError and are
+treated as misses.
+"""
+
+import math
+import os
+import struct
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from models.memory import Memory
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+FORMAT_VERSION = 2
+
+FLAG_ZLIB = 0x01
+FLAG_ZSTD = 0x02
+
+COMPRESSION = os.getenv("MEMORY_CACHE_COMPRESSION", "auto")
+# full_content shorter than this (bytes) is stored uncompressed
+COMPRESS_MIN = int(os.getenv("MEMORY_CACHE_COMPRESS_MIN", "1024"))
+
+_HEADER = struct.Struct("<BBI")
+_FIXED = struct.Struct("<qqiiiqqqqddd")
+_LEN = struct.Struct("<I")
+_COUNT = struct.Struct("<H")
+_INT = struct.Struct("<q")
+
+# Encodes None for nullable integers and strings
+_NULL_INT = -(2**63)
+_NULL_LEN = 0xFFFFFFFF
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Bytes needed to decode the summary of a typical memory in one GETRANGE
+SUMMARY_PREFIX_BYTES = 4096
+
+
+def _pack_time(value: Optional[datetime]) -> int:
+    """Naive UTC datetime to epoch microseconds."""
+    if value is None:
+        return _NULL_INT
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _unpack_time(value: int) -> Optional[datetime]:
+    """Epoch microseconds to naive UTC datetime."""
+    if value == _NULL_INT:
+        return None
+    return _EPOCH + value * _MICROSECOND
+
+
+def _pack_str(parts: list[bytes], value: Optional[str]) -> None:
+    """Append a length-prefixed UTF-8 string."""
+    if value is None:
+        parts.append(_LEN.pack(_NULL_LEN))
+        return
+    raw = value.encode("utf-8")
+    parts.append(_LEN.pack(len(raw)))
+    parts.append(raw)
+
+
+def _pack_int_list(parts: list[bytes], values: Optional[list[int]]) -> None:
+    """Append a counted list of integers (count 0xFFFF = None)."""
+    if values is None:
+        parts.append(_COUNT.pack(0xFFFF))
+        return
+    parts.append(_COUNT.pack(len(values)))
+    parts.extend(_INT.pack(value) for value in values)
+
+
+def _pack_str_list(parts: list[bytes], values: Optional[list[str]]) -> None:
+    """Append a counted list of strings (count 0xFFFF = None)."""
+    if values is None:
+        parts.append(_COUNT.pack(0xFFFF))
+        return
+    parts.append(_COUNT.pack(len(values)))
+    for value in values:
+        _pack_str(parts, value)
+
+
+class _Reader:
+    """Sequential reader over an encoded value."""
+
+    def __init__(self, data: bytes, offset: int):
+        self.data = data
+        self.offset = offset
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        try:
+            values = fmt.unpack_from(self.data, self.offset)
+        except struct.error as e:
+            raise ValueError("Truncated memory cache value") from e
+        self.offset += fmt.size
+        return values
+
+    def string(self) -> Optional[str]:
+        (length,) = self.unpack(_LEN)
+        if length == _NULL_LEN:
+            return None
+        end = self.offset + length
+        if end > len(self.data):
+            raise ValueError("Truncated memory cache value")
+        value = self.data[self.offset : end].decode("utf-8")
+        self.offset = end
+        return value
+
+    def string_list(self) -> Optional[list[str]]:
+        (count,) = self.unpack(_COUNT)
+        if count == 0xFFFF:
+            return None
+        return [self.string() for _ in range(count)]
+
+    def int_list(self) -> Optional[list[int]]:
+        (count,) = self.unpack(_COUNT)
+        if count == 0xFFFF:
+            return None
+        return [self.unpack(_INT)[0] for _ in range(count)]
+
+
+def encode_memory(memory: Memory) -> bytes:
+    """
+    Encode a Memory for the cache.
+
+    Args:
+        memory: Memory instance
+
+    Returns:
+        Encoded value
+    """
+    emotions = (
+        memory.emotion_valence,
+        memory.emotion_arousal,
+        memory.emotion_dominance,
+    )
+    parts = [
+        _FIXED.pack(
+            memory.id,
+            memory.created_by,
+            memory.importance or 0,
+            memory.version or 1,
+            memory.access_count or 0,
+            memory.parent_id if memory.parent_id is not None else _NULL_INT,
+            _pack_time(memory.created_at),
+            _pack_time(memory.updated_at),
+            _pack_time(memory.last_accessed),
+            *(math.nan if value is None else value for value in emotions),
+        )
+    ]
+    _pack_str(parts, memory.simple_content)
+    _pack_str(parts, memory.emotion_label)
+    _pack_str(parts, memory.context_temporal)
+    _pack_str(parts, memory.context_situational)
+    _pack_str_list(parts, memory.keywords)
+    _pack_str_list(parts, memory.tags)
+    _pack_int_list(parts, memory.evolution_triggers)
+    _pack_int_list(parts, [category.id for category in memory.categories])
+    summary = b"".join(parts)
+
+    flags = 0
+    body = (memory.full_content or "").encode("utf-8")
+    if len(body) >= COMPRESS_MIN:
+        compression = COMPRESSION
+        if compression == "auto":
+            compression = "zstd" if zstandard is not None else "none"
+        if compression == "zstd":
+            body = zstandard.ZstdCompressor(level=3).compress(body)
+            flags |= FLAG_ZSTD
+        elif compression == "zlib":
+            body = zlib.compress(body, 1)
+            flags |= FLAG_ZLIB
+
+    summary_end = _HEADER.size + len(summary)
+    return _HEADER.pack(FORMAT_VERSION, flags, summary_end) + summary + body
+
+
+def summary_length(prefix: bytes) -> int:
+    """
+    Bytes needed to decode the summary of an encoded value.
+
+    Args:
+        prefix: At least the first 6 bytes of the value
+
+    Returns:
+        Length of the header plus summary section
+    """
+    _, _, summary_end = _read_header(prefix)
+    return summary_end
+
+
+def _read_header(data: bytes) -> tuple[int, int, int]:
+    """Validate and unpack the header."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated memory cache value")
+    version, flags, summary_end = _HEADER.unpack_from(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported memory cache format: {version}")
+    return version, flags, summary_end
+
+
+def _decode_summary(data: bytes) -> tuple[dict[str, Any], int, int]:
+    """Decode header, fixed fields and summary strings."""
+    _, flags, summary_end = _read_header(data)
+    if len(data) < summary_end:
+        raise ValueError("Truncated memory cache value")
+    reader = _Reader(data, _HEADER.size)
+    (
+        memory_id,
+        created_by,
+        importance,
+        version,
+        access_count,
+        parent_id,
+        created_at,
+        updated_at,
+        last_accessed,
+        valence,
+        arousal,
+        dominance,
+    ) = reader.unpack(_FIXED)
+    fields = {
+        "id": memory_id,
+        "created_by": created_by,
+        "importance": importance,
+        "version": version,
+        "access_count": access_count,
+        "parent_id": None if parent_id == _NULL_INT else parent_id,
+        "created_at": _unpack_time(created_at),
+        "updated_at": _unpack_time(updated_at),
+        "last_accessed": _unpack_time(last_accessed),
+        "emotion_valence": None if math.isnan(valence) else valence,
+        "emotion_arousal": None if math.isnan(arousal) else arousal,
+        "emotion_dominance": None if math.isnan(dominance) else dominance,
+        "simple_content": reader.string(),
+        "emotion_label": reader.string(),
+        "context_temporal": reader.string(),
+        "context_situational": reader.string(),
+        "keywords": reader.string_list(),
+        "tags": reader.string_list(),
+        "evolution_triggers": reader.int_list(),
+        "category_ids": reader.int_list(),
+    }
+    return fields, flags, summary_end
+
+
+def decode_summary(data: bytes) -> dict[str, Any]:
+    """
+    Decode every field except full_content.
+
+    Only the header and summary section are read, so ``data`` may be a
+    prefix of the value of at least summary_length() bytes.
+
+    Args:
+        data: Encoded value (or a prefix of it)
+
+    Returns:
+        Field dict without full_content, with category_ids
+
+    Raises:
+        ValueError: If the value is truncated or in an unknown format
+    """
+    fields, _, _ = _decode_summary(data)
+    return fields
+
+
+def decode_memory(data: bytes) -> Memory:
+    """
+    Decode a cached value into a detached Memory instance.
+
+    Categories are not restored (only their ids are cached, see
+    decode_summary).
+
+    Args:
+        data: Encoded value
+
+    Returns:
+        Memory instance
+
+    Raises:
+        ValueError: If the value is truncated or in an unknown format
+    """
+    fields, flags, summary_end = _decode_summary(data)
+    del fields["category_ids"]
+    body = data[summary_end:]
+    try:
+        if flags & FLAG_ZSTD:
+            if zstandard is None:
+                raise ValueError("zstandard is not installed")
+            body = zstandard.ZstdDecompressor().decompress(body)
+        elif flags & FLAG_ZLIB:
+            body = zlib.decompress(body)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Corrupt memory cache value: {e}") from e
+    return Memory(full_content=body.decode("utf-8"), **fields)
@@ -0,0 +1,485 @@
+"""In-memory Zettelkasten link graph for multi-hop memory traversal.
+
+Each user's MemoryLink graph is loaded lazily with one query into compact
+CSR arrays (row pointers, neighbor indexes, strengths, link type codes) for
+both directions. New links go into small delta adjacency lists that
+traversal reads next to the CSR arrays; they are merged into the arrays only
+once the delta grows past a fraction of the graph, so create_memory_link
+neither forces a database reload nor a rebuild per link.
+
+Graphs are cached per process, so every link change bumps the owner's link
+generation in Redis (memory:links:gen:<user_id>). get() compares it with the
+generation the graph was loaded at and reloads on a mismatch, so changes
+made by other bot processes are picked up; a change by this process is
+applied in place when no other change happened in between. Without Redis,
+graphs are reloaded after MEMORY_GRAPH_TTL seconds.
+
+Traversal is pure in-process work:
+- k_hop(): breadth-first expansion up to k hops
+- personalized_pagerank(): strength-weighted spreading activation from seed
+  memories (random walk with restart), a few vectorized NumPy passes
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.memory import Memory, MemoryLink
+from services.redis_service import redis_service
+
+DIRECTIONS = ("outgoing", "incoming", "both")
+
+
+class UserLinkGraph:
+    """CSR adjacency of one user's memory links."""
+
+    # Delta links are merged into the CSR arrays once there are more than
+    # COMPACT_MIN of them and more than COMPACT_RATIO of all links
+    COMPACT_MIN = 256
+    COMPACT_RATIO = 0.125
+
+    def __init__(self):
+        """Initialize empty graph."""
+        self._node_ids: list[int] = []
+        self._index: dict[int, int] = {}
+        self._type_names: list[str] = []
+        self._type_codes: dict[str, int] = {}
+        self._edges: list[tuple[int, int, float, int]] = []  # All (src, dst, w, t)
+        self._delta: list[tuple[int, int, float, int]] = []
+        self._removed: set[int] = set()
+        # Set by the registry: link generation loaded, monotonic load time
+        self.generation = 0
+        self.loaded_at = time.monotonic()
+        self._build()
+
+    @classmethod
+    def from_links(cls, links: list[tuple[int, int, str, float]]) -> "UserLinkGraph":
+        """
+        Build a graph from (from_id, to_id, link_type, strength) rows.
+
+        Args:
+            links: Link rows
+
+        Returns:
+            UserLinkGraph
+        """
+        graph = cls()
+        for from_id, to_id, link_type, strength in links:
+            graph._edges.append(graph._encode(from_id, to_id, link_type, strength))
+        graph._build()
+        return graph
+
+    def __len__(self) -> int:
+        """Number of nodes (memories with at least one link)."""
+        return len(self._node_ids)
+
+    def __contains__(self, memory_id: int) -> bool:
+        return memory_id in self._index and memory_id not in self._removed
+
+    @property
+    def edge_count(self) -> int:
+        """Number of links."""
+        return len(self._edges)
+
+    def add_link(
+        self, from_id: int, to_id: int, link_type: str, strength: float
+    ) -> None:
+        """Add a link (O(1); traversal sees it through the delta lists)."""
+        edge = self._encode(from_id, to_id, link_type, strength)
+        src, dst, weight, type_code = edge
+        self._removed.discard(from_id)
+        self._removed.discard(to_id)
+        self._edges.append(edge)
+        self._delta.append(edge)
+        self._delta_adj["outgoing"].setdefault(src, []).append((dst, weight, type_code))
+        self._delta_adj["incoming"].setdefault(dst, []).append((src, weight, type_code))
+        self._delta_walks = {}
+        self._compact()
+
+    def remove_memory(self, memory_id: int) -> None:
+        """Hide a deleted memory from traversal."""
+        self._removed.add(memory_id)
+
+    def neighbors(
+        self, memory_id: int, direction: str = "both"
+    ) -> list[tuple[int, str, float]]:
+        """
+        Get direct neighbors of a memory.
+
+        Args:
+            memory_id: Memory ID
+            direction: "outgoing", "incoming" or "both"
+
+        Returns:
+            List of (memory_id, link_type, strength)
+        """
+        if memory_id not in self:
+            return []
+        result = []
+        for neighbor, strength, type_code in self._adjacent(
+            self._index[memory_id], direction
+        ):
+            neighbor_id = self._node_ids[neighbor]
+            if neighbor_id not in self._removed:
+                result.append((neighbor_id, self._type_names[type_code], strength))
+        return result
+
+    def k_hop(
+        self,
+        seeds: list[int],
+        k: int = 2,
+        direction: str = "both",
+        limit: Optional[int] = None,
+    ) -> list[tuple[int, int]]:
+        """
+        Breadth-first expansion from seed memories.
+
+        Args:
+            seeds: Seed memory IDs (excluded from the result)
+            k: Maximum number of hops
+            direction: "outgoing", "incoming" or "both"
+            limit: Maximum number of results
+
+        Returns:
+            List of (memory_id, hops) ordered by hop distance
+        """
+        frontier = [self._index[s] for s in seeds if s in self]
+        seen = set(frontier)
+        result: list[tuple[int, int]] = []
+        for hop in range(1, k + 1):
+            next_frontier = []
+            for node in frontier:
+                for neighbor, _, _ in self._adjacent(node, direction):
+                    if neighbor in seen:
+                        continue
+                    seen.add(neighbor)
+                    if self._node_ids[neighbor] in self._removed:
+                        continue
+                    next_frontier.append(neighbor)
+                    result.append((self._node_ids[neighbor], hop))
+                    if limit is not None and len(result) >= limit:
+                        return result
+            frontier = next_frontier
+        return result
+
+    def personalized_pagerank(
+        self,
+        seeds: list[int],
+        top_n: int = 10,
+        alpha: float = 0.25,
+        iterations: int = 10,
+        direction: str = "both",
+    ) -> list[tuple[int, float]]:
+        """
+        Strength-weighted spreading activation from seed memories.
+
+        Random walk with restart: at each step the walker follows a link with
+        probability proportional to its strength, or jumps back to a seed
+        with probability alpha. Each iteration is one vectorized pass over
+        the cached edge arrays.
+
+        Args:
+            seeds: Seed memory IDs (excluded from the result)
+            top_n: Number of results
+            alpha: Restart probability
+            iterations: Power iterations (activation spreads one hop each)
+            direction: "outgoing", "incoming" or "both"
+
+        Returns:
+            List of (memory_id, score) sorted by score descending
+        """
+        seed_nodes = [self._index[s] for s in seeds if s in self]
+        if not seed_nodes:
+            return []
+
+        src, dst, transition = self._walk(direction)
+        n = len(self._node_ids)
+        restart = np.zeros(n)
+        restart[seed_nodes] = 1.0 / len(seed_nodes)
+        removed = [self._index[m] for m in self._removed if m in self._index]
+
+        rank = restart.copy()
+        for _ in range(iterations):
+            spread = np.bincount(dst, weights=rank[src] * transition, minlength=n)
+            spread[removed] = 0.0
+            rank = alpha * restart + (1.0 - alpha) * spread
+
+        rank[seed_nodes] = 0.0
+        candidates = np.flatnonzero(rank > 0)
+        if len(candidates) > top_n:
+            top = np.argpartition(-rank[candidates], top_n - 1)[:top_n]
+            candidates = candidates[top]
+        candidates = candidates[np.argsort(-rank[candidates], kind="stable")]
+        return [(self._node_ids[i], float(rank[i])) for i in candidates]
+
+    def _encode(
+        self, from_id: int, to_id: int, link_type: str, strength: float
+    ) -> tuple[int, int, float, int]:
+        """Map ids and link type to compact codes."""
+        for memory_id in (from_id, to_id):
+            if memory_id not in self._index:
+                self._index[memory_id] = len(self._node_ids)
+                self._node_ids.append(memory_id)
+        type_code = self._type_codes.setdefault(link_type, len(self._type_names))
+        if type_code == len(self._type_names):
+            self._type_names.append(link_type)
+        return (
+            self._index[from_id],
+            self._index[to_id],
+            float(strength if strength is not None else 1.0),
+            type_code,
+        )
+
+    def _compact(self) -> None:
+        """Merge delta edges into the CSR arrays once the delta is large."""
+        if len(self._delta) > max(
+            self.COMPACT_MIN, self.COMPACT_RATIO * len(self._edges)
+        ):
+            self._build()
+
+    def _build(self) -> None:
+        """(Re)build outgoing and incoming CSR arrays from all edges."""
+        n = len(self._node_ids)
+        src, dst, weight, types = self._edge_arrays(self._edges)
+        self._out = self._to_csr(src, dst, weight, types, n)
+        self._in = self._to_csr(dst, src, weight, types, n)
+        self._base_n = n
+        self._base_edges = (src, dst, weight)
+        self._walks = self._walk_arrays(src, dst, weight, n)
+        self._delta = []
+        self._delta_adj: dict[str, dict[int, list[tuple[int, float, int]]]] = {
+            "outgoing": {},
+            "incoming": {},
+        }
+        self._delta_walks: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    @staticmethod
+    def _edge_arrays(
+        edges: list[tuple[int, int, float, int]],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Split (src, dst, w, t) tuples into typed arrays."""
+        if edges:
+            src, dst, weight, types = (np.array(c) for c in zip(*edges))
+        else:
+            src = dst = types = np.zeros(0, dtype=np.int64)
+            weight = np.zeros(0, dtype=np.float32)
+        return (
+            src.astype(np.int64),
+            dst.astype(np.int64),
+            weight.astype(np.float32),
+            types,
+        )
+
+    @staticmethod
+    def _walk_arrays(
+        src: np.ndarray, dst: np.ndarray, weight: np.ndarray, n: int
+    ) -> dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Walk arrays per direction: (src, dst, strength / total leaving src)."""
+        walks = {}
+        for direction, (rows, cols) in (
+            ("outgoing", (src, dst)),
+            ("incoming", (dst, src)),
+            ("both", (np.concatenate([src, dst]), np.concatenate([dst, src]))),
+        ):
+            strengths = np.resize(weight, len(rows)).astype(np.float64)
+            total = np.bincount(rows, weights=strengths, minlength=n)
+            total = np.where(total > 0, total, 1.0)
+            walks[direction] = (rows, cols, strengths / total[rows])
+        return walks
+
+    @staticmethod
+    def _to_csr(
+        rows: np.ndarray,
+        cols: np.ndarray,
+        weight: np.ndarray,
+        types: np.ndarray,
+        n: int,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Build (indptr, indices, strengths, types) sorted by row."""
+        order = np.argsort(rows, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return (
+            indptr,
+            cols[order].astype(np.int32),
+            weight[order],
+            np.asarray(types)[order].astype(np.int16),
+        )
+
+    def _walk(self, direction: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Cached (src, dst, transition probability) arrays for a direction."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}")
+        if not self._delta:
+            return self._walks[direction]
+        if not self._delta_walks:
+            # Base arrays plus delta edges; transitions renormalized, no sort
+            src, dst, weight, _ = self._edge_arrays(self._delta)
+            base_src, base_dst, base_weight = self._base_edges
+            self._delta_walks = self._walk_arrays(
+                np.concatenate([base_src, src]),
+                np.concatenate([base_dst, dst]),
+                np.concatenate([base_weight, weight]),
+                len(self._node_ids),
+            )
+        return self._delta_walks[direction]
+
+    def _adjacent(self, node: int, direction: str) -> Iterator[tuple[int, float, int]]:
+        """(neighbor, strength, type code) from the CSR arrays and the delta."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}")
+        names = ("outgoing", "incoming") if direction == "both" else (direction,)
+        for name in names:
+            if node < self._base_n:
+                indptr, indices, strengths, types = (
+                    self._out if name == "outgoing" else self._in
+                )
+                for pos in range(indptr[node], indptr[node + 1]):
+                    yield int(indices[pos]), float(strengths[pos]), int(types[pos])
+            yield from self._delta_adj[name].get(node, ())
+
+
+class MemoryGraphRegistry:
+    """Process-wide LRU of per-user link graphs, loaded lazily."""
+
+    # Reload age when Redis (and so the link generation) is unavailable
+    TTL = float(os.getenv("MEMORY_GRAPH_TTL", "300"))
+    GENERATION_PREFIX = "memory:links:gen"
+
+    def __init__(self, max_users: int = 64):
+        """
+        Initialize registry.
+
+        Args:
+            max_users: Maximum number of user graphs kept in memory
+        """
+        self.max_users = max_users
+        self._graphs: OrderedDict[int, UserLinkGraph] = OrderedDict()
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+    async def get(self, session: AsyncSession, user_id: int) -> UserLinkGraph:
+        """
+        Get a user's graph, (re)loading it if missing or stale.
+
+        Args:
+            session: SQLAlchemy async session
+            user_id: Telegram user ID (memory owner)
+
+        Returns:
+            UserLinkGraph for the user
+        """
+        generation = await self._get_generation(user_id)
+        graph = self._graphs.get(user_id)
+        if graph is not None and self._is_current(graph, generation):
+            self._graphs.move_to_end(user_id)
+            return graph
+
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            graph = self._graphs.get(user_id)
+            if graph is None or not self._is_current(graph, generation):
+                # Generation read before the query: a link committed meanwhile
+                # bumps it again and triggers another reload
+                graph = await self._load(session, user_id)
+                graph.generation = generation or 0
+                self._graphs[user_id] = graph
+                self._graphs.move_to_end(user_id)
+                while len(self._graphs) > self.max_users:
+                    evicted, _ = self._graphs.popitem(last=False)
+                    self._locks.pop(evicted, None)
+        return graph
+
+    def peek(self, user_id: int) -> Optional[UserLinkGraph]:
+        """Return a user's graph only if it is already loaded."""
+        return self._graphs.get(user_id)
+
+    async def add_link(
+        self,
+        user_id: int,
+        from_id: int,
+        to_id: int,
+        link_type: str,
+        strength: float,
+    ) -> None:
+        """Publish a committed link and apply it to the loaded graph."""
+        graph = await self._bump(user_id)
+        if graph is not None:
+            graph.add_link(from_id, to_id, link_type, strength)
+
+    async def remove_memory(self, user_id: int, memory_id: int) -> None:
+        """Publish a deleted memory and hide it in the loaded graph."""
+        graph = await self._bump(user_id)
+        if graph is not None:
+            graph.remove_memory(memory_id)
+
+    def discard(self, user_id: int) -> None:
+        """Drop a user's graph (forces reload on next use)."""
+        self._graphs.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Drop all loaded graphs."""
+        self._graphs.clear()
+        self._locks.clear()
+
+    def _is_current(self, graph: UserLinkGraph, generation: Optional[int]) -> bool:
+        """Whether a loaded graph reflects the latest link generation."""
+        if generation is None:
+            return time.monotonic() - graph.loaded_at < self.TTL
+        return graph.generation == generation
+
+    async def _get_generation(self, user_id: int) -> Optional[int]:
+        """Current link generation from Redis (None if unavailable)."""
+        if not redis_service.redis:
+            return None
+        value = await redis_service.get(f"{self.GENERATION_PREFIX}:{user_id}")
+        return int(value) if value is not None else 0
+
+    async def _bump(self, user_id: int) -> Optional[UserLinkGraph]:
+        """
+        Bump a user's link generation after a committed change.
+
+        Returns:
+            The loaded graph if the change can be applied to it in place, or
+            None (not loaded, or changed by another process: dropped)
+        """
+        generation = await redis_service.incr(f"{self.GENERATION_PREFIX}:{user_id}")
+        graph = self.peek(user_id)
+        if graph is None:
+            return None
+        if generation is not None:
+            if generation != graph.generation + 1:
+                self.discard(user_id)
+                return None
+            graph.generation = generation
+        return graph
+
+    async def _load(self, session: AsyncSession, user_id: int) -> UserLinkGraph:
+        """Load all links touching a user's memories with a single query."""
+        owned = select(Memory.id).where(Memory.created_by == user_id)
+        result = await session.execute(
+            select(
+                MemoryLink.from_memory_id,
+                MemoryLink.to_memory_id,
+                MemoryLink.link_type,
+                MemoryLink.strength,
+            ).where(
+                or_(
+                    MemoryLink.from_memory_id.in_(owned),
+                    MemoryLink.to_memory_id.in_(owned),
+                )
+            )
+        )
+        return UserLinkGraph.from_links([tuple(row) for row in result.all()])
+
+
+# Global memory graph registry
+memory_graph_registry = MemoryGraphRegistry()
@@ -0,0 +1,283 @@
+"""Hybrid re-ranking of memory search candidates.
+
+search_memories pulls a candidate set (default 200 rows of light columns)
+ordered by text relevance, then MemoryRanker scores it in one vectorized
+NumPy pass as a weighted geometric product of normalized factors:
+
+    score = text^wt * importance^wi * recency^wr * access^wa * emotion^we
+
+- text: relevance from BM25/ts_rank/cosine, normalized to the best candidate
+- importance: log-scaled importance (0-9999)
+- recency: exponential decay since last access (or creation), by half-life
+- access: log(1 + access_count), normalized to the most accessed candidate
+- emotion: VAD proximity to the current message's emotion (when known;
+  estimate_vad() gives a cheap lexicon estimate of it)
+
+Each factor is clipped to [FACTOR_FLOOR, 1] so one weak signal cannot zero
+out an otherwise strong memory. A weight of 0 disables a factor.
+"""
+
+import math
+import os
+import re
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+# VAD distance at which emotional affinity bottoms out (opposite valence)
+_VAD_DISTANCE_SCALE = 2.0
+_MAX_IMPORTANCE = 9999
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# (valence, arousal, dominance) of common emotion words and emoji, after the
+# NRC VAD lexicon. English/Russian stems match as word prefixes; stems of up
+# to 3 letters only match whole words ("sad", not "saddle")
+_VAD_LEXICON: dict[str, tuple[float, float, float]] = {
+    # Positive
+    "happ": (0.9, 0.3, 0.4),
+    "glad": (0.8, 0.1, 0.3),
+    "love": (0.9, 0.3, 0.3),
+    "great": (0.8, 0.4, 0.5),
+    "awesome": (0.9, 0.6, 0.5),
+    "thank": (0.7, 0.0, 0.2),
+    "excit": (0.7, 0.8, 0.4),
+    "yay": (0.8, 0.7, 0.3),
+    "calm": (0.5, -0.8, 0.2),
+    "relax": (0.6, -0.7, 0.2),
+    "рад": (0.8, 0.3, 0.3),
+    "рада": (0.8, 0.3, 0.3),
+    "рады": (0.8, 0.3, 0.3),
+    "счастл": (0.9, 0.4, 0.4),
+    "люблю": (0.9, 0.3, 0.3),
+    "спасиб": (0.7, 0.0, 0.2),
+    "отличн": (0.8, 0.4, 0.5),
+    "спокой": (0.5, -0.7, 0.2),
+    # Sad / tired
+    "sad": (-0.8, -0.3, -0.4),
+    "sadness": (-0.8, -0.3, -0.4),
+    "cry": (-0.7, 0.3, -0.5),
+    "crying": (-0.7, 0.3, -0.5),
+    "cried": (-0.7, 0.3, -0.5),
+    "lonel": (-0.8, -0.4, -0.6),
+    "tired": (-0.5, -0.6, -0.4),
+    "bored": (-0.5, -0.7, -0.3),
+    "depress": (-0.9, -0.3, -0.6),
+    "грус": (-0.8, -0.3, -0.4),
+    "печал": (-0.8, -0.3, -0.4),
+    "устал": (-0.5, -0.6, -0.4),
+    "скуч": (-0.5, -0.6, -0.3),
+    # Angry
+    "angry": (-0.8, 0.8, 0.3),
+    "hate": (-0.9, 0.6, 0.2),
+    "furious": (-0.9, 0.9, 0.4),
+    "annoy": (-0.6, 0.5, 0.1),
+    "злюсь": (-0.8, 0.8, 0.3),
+    "бесит": (-0.7, 0.7, 0.2),
+    "ненавиж": (-0.9, 0.6, 0.2),
+    # Afraid / anxious
+    "afraid": (-0.8, 0.7, -0.6),
+    "scared": (-0.8, 0.8, -0.6),
+    "fear": (-0.8, 0.7, -0.5),
+    "worr": (-0.6, 0.5, -0.4),
+    "anxi": (-0.6, 0.7, -0.4),
+    "stress": (-0.6, 0.7, -0.3),
+    "nervous": (-0.5, 0.7, -0.4),
+    "боюсь": (-0.8, 0.7, -0.6),
+    "страш": (-0.8, 0.7, -0.5),
+    "тревож": (-0.6, 0.6, -0.4),
+}
+_VAD_EMOJI: dict[str, tuple[float, float, float]] = {
+    "😊": (0.8, 0.3, 0.3),
+    "😄": (0.9, 0.6, 0.4),
+    "❤": (0.9, 0.4, 0.3),
+    "😢": (-0.8, 0.2, -0.5),
+    "😭": (-0.8, 0.6, -0.5),
+    "😡": (-0.8, 0.9, 0.3),
+    "😱": (-0.7, 0.9, -0.5),
+    "😴": (0.0, -0.8, -0.2),
+}
+
+
+def estimate_vad(text: str) -> Optional[dict[str, float]]:
+    """
+    Cheap VAD estimate of a message from emotion words and emoji.
+
+    Averages the lexicon entries found in the text (no negation handling);
+    meant for ranking, where calling the LLM per message would cost a round
+    trip before the memory search can start.
+
+    Args:
+        text: Message text
+
+    Returns:
+        {"valence", "arousal", "dominance"} or None if no emotion cue was found
+    """
+    hits = [vad for emoji, vad in _VAD_EMOJI.items() if emoji in text]
+    for word in _WORD_RE.findall(text.lower()):
+        for stem, vad in _VAD_LEXICON.items():
+            if word == stem or (len(stem) > 3 and word.startswith(stem)):
+                hits.append(vad)
+                break
+    if not hits:
+        return None
+    valence, arousal, dominance = np.mean(hits, axis=0)
+    return {
+        "valence": float(valence),
+        "arousal": float(arousal),
+        "dominance": float(dominance),
+    }
+
+
+class MemoryRanker:
+    """Vectorized scorer for memory candidates.
+
+    Candidate rows are tuples of:
+        (id, relevance, importance, created_at, last_accessed, access_count,
+         emotion_valence, emotion_arousal, emotion_dominance)
+    """
+
+    TEXT_WEIGHT = float(os.getenv("MEMORY_RANK_TEXT_WEIGHT", "1.0"))
+    IMPORTANCE_WEIGHT = float(os.getenv("MEMORY_RANK_IMPORTANCE_WEIGHT", "0.5"))
+    RECENCY_WEIGHT = float(os.getenv("MEMORY_RANK_RECENCY_WEIGHT", "0.3"))
+    ACCESS_WEIGHT = float(os.getenv("MEMORY_RANK_ACCESS_WEIGHT", "0.2"))
+    EMOTION_WEIGHT = float(os.getenv("MEMORY_RANK_EMOTION_WEIGHT", "0.3"))
+    HALF_LIFE_DAYS = float(os.getenv("MEMORY_RANK_HALF_LIFE_DAYS", "30"))
+
+    FACTOR_FLOOR = 0.05
+    NO_EMOTION_FACTOR = 0.5  # Memory without VAD when the message has one
+
+    def __init__(
+        self,
+        text_weight: Optional[float] = None,
+        importance_weight: Optional[float] = None,
+        recency_weight: Optional[float] = None,
+        access_weight: Optional[float] = None,
+        emotion_weight: Optional[float] = None,
+        half_life_days: Optional[float] = None,
+    ):
+        """
+        Initialize ranker (unset arguments fall back to MEMORY_RANK_* settings).
+
+        Args:
+            text_weight: Exponent for text relevance
+            importance_weight: Exponent for importance
+            recency_weight: Exponent for recency decay
+            access_weight: Exponent for access frequency
+            emotion_weight: Exponent for VAD proximity
+            half_life_days: Days after which recency factor halves
+        """
+
+        def pick(value: Optional[float], default: float) -> float:
+            return default if value is None else value
+
+        self.weights = np.array(
+            [
+                pick(text_weight, self.TEXT_WEIGHT),
+                pick(importance_weight, self.IMPORTANCE_WEIGHT),
+                pick(recency_weight, self.RECENCY_WEIGHT),
+                pick(access_weight, self.ACCESS_WEIGHT),
+                pick(emotion_weight, self.EMOTION_WEIGHT),
+            ],
+            dtype=np.float64,
+        )
+        self.half_life_days = pick(half_life_days, self.HALF_LIFE_DAYS)
+
+    def score(
+        self,
+        candidates: Sequence[Sequence[Any]],
+        emotion: Optional[dict[str, float]] = None,
+        now: Optional[datetime] = None,
+    ) -> np.ndarray:
+        """
+        Score candidate rows.
+
+        Args:
+            candidates: Candidate rows (see class docstring)
+            emotion: Current message VAD dict with valence/arousal/dominance
+            now: Reference time for recency (default: utcnow)
+
+        Returns:
+            float64 array of scores in (0, 1], aligned with candidates
+        """
+        n = len(candidates)
+        if n == 0:
+            return np.zeros(0)
+        now = now or datetime.utcnow()
+
+        columns = list(zip(*candidates))
+        relevance = np.array(
+            [0.0 if r is None else r for r in columns[1]], dtype=np.float64
+        )
+        importance = np.array([i or 0 for i in columns[2]], dtype=np.float64)
+        rows_seen = zip(columns[3], columns[4])
+        last_seen = [accessed or created or now for created, accessed in rows_seen]
+        age_days = np.array(
+            [(now - seen).total_seconds() / 86400.0 for seen in last_seen],
+            dtype=np.float64,
+        )
+        access = np.array([a or 0 for a in columns[5]], dtype=np.float64)
+        vad = np.array(
+            [
+                [np.nan if v is None else v for v in row]
+                for row in zip(columns[6], columns[7], columns[8])
+            ],
+            dtype=np.float64,
+        )
+
+        factors = np.empty((5, n), dtype=np.float64)
+
+        best = relevance.max()
+        factors[0] = relevance / best if best > 0 else 1.0
+
+        factors[1] = np.log1p(np.clip(importance, 0, _MAX_IMPORTANCE)) / math.log1p(
+            _MAX_IMPORTANCE
+        )
+
+        factors[2] = np.exp2(-np.maximum(age_days, 0.0) / self.half_life_days)
+
+        top_access = access.max()
+        factors[3] = np.log1p(access) / math.log1p(top_access) if top_access else 1.0
+
+        if emotion is None:
+            factors[4] = 1.0
+        else:
+            target = np.array(
+                [
+                    emotion.get("valence", 0.0),
+                    emotion.get("arousal", 0.0),
+                    emotion.get("dominance", 0.0),
+                ],
+                dtype=np.float64,
+            )
+            distance = np.linalg.norm(vad - target, axis=1)
+            factors[4] = np.where(
+                np.isnan(distance),
+                self.NO_EMOTION_FACTOR,
+                1.0 - distance / _VAD_DISTANCE_SCALE,
+            )
+
+        np.clip(factors, self.FACTOR_FLOOR, 1.0, out=factors)
+        return np.exp(self.weights @ np.log(factors))
+
+    def rank(
+        self,
+        candidates: Sequence[Sequence[Any]],
+        emotion: Optional[dict[str, float]] = None,
+        now: Optional[datetime] = None,
+    ) -> list[tuple[int, float]]:
+        """
+        Rank candidate rows by hybrid score.
+
+        Args:
+            candidates: Candidate rows (see class docstring)
+            emotion: Current message VAD dict with valence/arousal/dominance
+            now: Reference time for recency (default: utcnow)
+
+        Returns:
+            List of (memory_id, score), best first. Ties keep candidate order.
+        """
+        scores = self.score(candidates, emotion, now)
+        order = np.argsort(-scores, kind="stable")
+        return [(int(candidates[i][0]), float(scores[i])) for i in order]
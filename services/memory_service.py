@@ -9,15 +9,107 @@ Based on research:
 - Knowledge Graphs: Graph-based memory organization
 """
 
+import hashlib
+import json
+import os
+import re
 from datetime import datetime
 from typing import Optional, Any
 
-from sqlalchemy import select, and_, or_
+import numpy as np
+from sqlalchemy import (
+    and_,
+    case,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+)
+from sqlalchemy.sql import Select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-
-from models.memory import Memory, Category, MemoryLink
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models.memory import (
+    IS_SQLITE,
+    Category,
+    Memory,
+    MemoryEmbedding,
+    MemoryLink,
+    MemoryTerm,
+    memory_category_association,
+    normalize_term,
+)
+from services.access_tracker import access_tracker
+from services.category_registry import category_registry
+from services.embedding_service import Embedder, get_embedder, pack_vector
+from services.memory_codec import (
+    SUMMARY_PREFIX_BYTES,
+    decode_memory,
+    decode_summary,
+    encode_memory,
+    summary_length,
+)
+from services.memory_graph import memory_graph_registry
+from services.memory_ranker import MemoryRanker
 from services.redis_service import redis_service
+from services.vector_index import vector_index_registry
+
+_TERM_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Conversational filler that would otherwise match almost every memory
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be but by can did do does for from had has have hey hi
+    how i if in is it its me my no not of on or our so that the their them
+    then there they this to was we were what when where which who why will
+    with you your
+    а без бы в во вот вы да для до его ее её если же за и из или им их к как
+    ко ли мне мои мой моя мы на не нет ну о об он она они оно от по при с со так
+    там то тут ты у уже что чтобы это я
+    """.split()
+)
+
+# FTS5 external-content table (see models/memory.py)
+_memories_fts = table("memories_fts", column("rowid"))
+
+# Light columns MemoryRanker scores; relevance is added after the id
+_RANK_COLUMNS = (
+    Memory.id,
+    Memory.importance,
+    Memory.created_at,
+    Memory.last_accessed,
+    Memory.access_count,
+    Memory.emotion_valence,
+    Memory.emotion_arousal,
+    Memory.emotion_dominance,
+)
+
+
+def tokenize_query(query: str, max_terms: int = 16) -> list[str]:
+    """
+    Split a user message into distinct full-text search terms.
+
+    Args:
+        query: Raw user message
+        max_terms: Maximum number of terms to keep
+
+    Returns:
+        Lowercase terms in order of first appearance, without stopwords
+    """
+    terms: list[str] = []
+    for token in _TERM_RE.findall(query.lower()):
+        if len(token) < 2 or token in _STOPWORDS or token in terms:
+            continue
+        terms.append(token)
+        if len(terms) == max_terms:
+            break
+    return terms
 
 
 class MemoryService:
@@ -26,14 +118,39 @@ class MemoryService:
     CACHE_PREFIX = "memory"
     CACHE_TTL = 3600  # 1 hour
 
-    def __init__(self, session: AsyncSession):
+    # Retrieval mode for text queries: "fulltext" or "vector"
+    SEARCH_MODE = os.getenv("MEMORY_SEARCH_MODE", "fulltext")
+    # Relevance multiplier at maximum importance (1.0 = up to 2x boost)
+    FULLTEXT_IMPORTANCE_BOOST = float(
+        os.getenv("MEMORY_FULLTEXT_IMPORTANCE_BOOST", "1.0")
+    )
+    # bm25 column weights: simple_content, full_content, keywords, tags
+    FTS_COLUMN_WEIGHTS = (4.0, 1.0, 2.0, 2.0)
+    VECTOR_MIN_SCORE = float(os.getenv("MEMORY_VECTOR_MIN_SCORE", "0.2"))
+    VECTOR_OVERSAMPLE = 4  # Extra candidates when filters may drop vector hits
+    # Ranked search results (ids + scores), keyed by the user's generation
+    SEARCH_CACHE_TTL = int(os.getenv("MEMORY_SEARCH_CACHE_TTL", "120"))
+    # Candidate pool size re-ranked by MemoryRanker
+    RERANK_CANDIDATES = int(os.getenv("MEMORY_RERANK_CANDIDATES", "200"))
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        embedder: Optional[Embedder] = None,
+        ranker: Optional[MemoryRanker] = None,
+    ):
         """
         Initialize memory service.
 
         Args:
             session: SQLAlchemy async session
+            embedder: Text embedder for vector retrieval
+                (default: configured via EMBEDDING_BACKEND, may be None)
+            ranker: Hybrid re-ranker (default: MEMORY_RANK_* settings)
         """
         self.session = session
+        self.embedder = embedder if embedder is not None else get_embedder()
+        self.ranker = ranker or MemoryRanker()
 
     async def create_memory(
         self,
@@ -94,10 +211,19 @@ class MemoryService:
             categories_list = list(categories_result.scalars().all())
             memory.categories = categories_list
 
+        vector = await self._embed(simple_content)
+
         self.session.add(memory)
+        if vector is not None or keywords or tags:
+            await self.session.flush()
+        if vector is not None:
+            await self._store_embedding(memory.id, vector)
+        if keywords or tags:
+            await self._store_terms(memory.id, keywords=keywords, tags=tags)
         await self.session.commit()
         await self.session.refresh(memory, ["categories"])
 
+        self._index_embedding(created_by, memory.id, vector)
         await self._invalidate_cache(created_by)
 
         return memory
@@ -106,6 +232,9 @@ class MemoryService:
         """
         Get memory by ID with all relationships loaded.
 
+        Pure read: the access is recorded by the write-behind access tracker
+        and reflected on the returned object without dirtying the session.
+
         Args:
             memory_id: Memory ID
 
@@ -113,10 +242,82 @@ class MemoryService:
             Memory instance or None if not found
         """
         cache_key = f"{self.CACHE_PREFIX}:{memory_id}"
-        cached = await redis_service.get_json(cache_key)
+        cached = await redis_service.get_bytes(cache_key)
         if cached:
-            return self._deserialize_memory(cached)
+            try:
+                memory = decode_memory(cached)
+            except ValueError:
+                memory = None  # Older format or corrupt; reload below
+            if memory is not None:
+                self._record_access(memory)
+                return memory
+
+        memory = await self._load_memory(memory_id)
+        if memory:
+            await redis_service.set_bytes(
+                cache_key, encode_memory(memory), self.CACHE_TTL
+            )
+            self._record_access(memory)
+
+        return memory
+
+    async def get_memory_summary(self, memory_id: int) -> Optional[dict[str, Any]]:
+        """
+        Get every memory field except full_content.
+
+        On a cache hit only the leading summary bytes of the cached value are
+        fetched (GETRANGE) and full_content is never decompressed or decoded.
+
+        Args:
+            memory_id: Memory ID
+
+        Returns:
+            Field dict (without full_content) or None if not found
+        """
+        cache_key = f"{self.CACHE_PREFIX}:{memory_id}"
+        prefix = await redis_service.get_range(cache_key, 0, SUMMARY_PREFIX_BYTES - 1)
+        summary = None
+        if prefix:
+            try:
+                needed = summary_length(prefix)
+                if needed > len(prefix):
+                    prefix += (
+                        await redis_service.get_range(
+                            cache_key, len(prefix), needed - 1
+                        )
+                        or b""
+                    )
+                summary = decode_summary(prefix)
+            except ValueError:
+                summary = None  # Older format or corrupt; reload below
+
+        if summary is None:
+            memory = await self._load_memory(memory_id)
+            if not memory:
+                return None
+            value = encode_memory(memory)
+            await redis_service.set_bytes(cache_key, value, self.CACHE_TTL)
+            summary = decode_summary(value)
+
+        now = datetime.utcnow()
+        access_tracker.record(memory_id, now)
+        summary["access_count"] += 1
+        summary["last_accessed"] = now
+        return summary
+
+    async def _load_memory(self, memory_id: int) -> Optional[Memory]:
+        """
+        Load a session-attached memory from the database (never the cache).
+
+        Used by mutations and link traversal, which need live rows with
+        relationships rather than a detached cached copy.
+
+        Args:
+            memory_id: Memory ID
 
+        Returns:
+            Memory instance or None if not found
+        """
         result = await self.session.execute(
             select(Memory)
             .where(Memory.id == memory_id)
@@ -126,18 +327,14 @@ class MemoryService:
                 selectinload(Memory.incoming_links),
             )
         )
-        memory = result.scalar_one_or_none()
-
-        if memory:
-            memory.last_accessed = datetime.utcnow()
-            memory.access_count += 1
-            await self.session.commit()
-
-            await redis_service.set_json(
-                cache_key, self._serialize_memory(memory), self.CACHE_TTL
-            )
+        return result.scalar_one_or_none()
 
-        return memory
+    def _record_access(self, memory: Memory) -> None:
+        """Record a read with the access tracker and mirror it on the object."""
+        now = datetime.utcnow()
+        access_tracker.record(memory.id, now)
+        set_committed_value(memory, "access_count", (memory.access_count or 0) + 1)
+        set_committed_value(memory, "last_accessed", now)
 
     async def search_memories(
         self,
@@ -150,31 +347,122 @@ class MemoryService:
         tags: Optional[list[str]] = None,
         limit: int = 20,
         offset: int = 0,
+        mode: Optional[str] = None,
+        emotion: Optional[dict[str, float]] = None,
+        keywords: Optional[list[str]] = None,
+        term_match: str = "any",
     ) -> list[Memory]:
         """
         Search memories with filters and pagination.
 
+        Candidates are pre-selected by text relevance (or importance when
+        there is no query), then re-ranked by MemoryRanker. Ranked ids are
+        cached in Redis under the user's generation, which every mutation
+        bumps, so cached results never outlive an edit or delete.
+
         Args:
             user_id: Telegram user ID
-            query: Text search query (searches in simple_content and keywords)
-            category_ids: Filter by category IDs
+            query: Text search query, tokenized into terms and matched against
+                simple_content, full_content, keywords and tags
+            category_ids: Filter by category IDs, including their subcategories
             min_importance: Minimum importance score
             max_importance: Maximum importance score
             emotion_labels: Filter by emotion labels
-            tags: Filter by tags
+            tags: Filter by tags (case-insensitive)
             limit: Maximum number of results
             offset: Result offset for pagination
+            mode: Query retrieval mode, "fulltext" or "vector"
+                (default: MEMORY_SEARCH_MODE). Full-text mode matches with
+                BM25/ts_rank; vector mode matches by cosine similarity and
+                requires a configured embedder.
+            emotion: VAD emotion of the current message
+                (valence/arousal/dominance) for emotional affinity ranking
+            keywords: Filter by keywords (case-insensitive)
+            term_match: "any" (memory has at least one of the given tags /
+                keywords) or "all" (memory has every one of them)
+
+        Returns:
+            List of Memory instances, best first
+        """
+        if category_ids:
+            await category_registry.ensure_loaded(self.session)
+            category_ids = category_registry.expand(category_ids)
+
+        params = {
+            "query": query,
+            "category_ids": category_ids or None,
+            "min_importance": min_importance,
+            "max_importance": max_importance,
+            "emotion_labels": sorted(emotion_labels) if emotion_labels else None,
+            "tags": sorted(tags) if tags else None,
+            "keywords": sorted(keywords) if keywords else None,
+            "term_match": term_match,
+            "mode": mode or self.SEARCH_MODE,
+            "emotion": emotion,
+            "pool": max(self.RERANK_CANDIDATES, limit + offset),
+        }
+        digest = hashlib.blake2b(
+            json.dumps(params, sort_keys=True, default=str).encode("utf-8"),
+            digest_size=12,
+        ).hexdigest()
+        generation = await self._get_generation(user_id)
+        cache_key = f"{self.CACHE_PREFIX}:search:{user_id}:{generation}:{digest}"
+
+        cached = await redis_service.get_json(cache_key)
+        if cached is not None:
+            ranked = [(int(mid), float(score)) for mid, score in cached]
+        else:
+            ranked = await self._search_ranked(user_id, **params)
+            await redis_service.set_json(cache_key, ranked, self.SEARCH_CACHE_TTL)
+
+        # Rows are always loaded from the database, so edits show up and
+        # memories deleted by another process are skipped
+        return await self._load_ranked([mid for mid, _ in ranked[offset:][:limit]])
+
+    async def _search_ranked(
+        self,
+        user_id: int,
+        query: Optional[str] = None,
+        category_ids: Optional[list[int]] = None,
+        min_importance: Optional[int] = None,
+        max_importance: Optional[int] = None,
+        emotion_labels: Optional[list[str]] = None,
+        tags: Optional[list[str]] = None,
+        keywords: Optional[list[str]] = None,
+        term_match: str = "any",
+        mode: Optional[str] = None,
+        emotion: Optional[dict[str, float]] = None,
+        pool: Optional[int] = None,
+    ) -> list[tuple[int, float]]:
+        """
+        Select and re-rank search candidates.
+
+        Args:
+            user_id: Telegram user ID
+            query: Text search query
+            category_ids: Filter by category IDs (already subtree-expanded)
+            min_importance: Minimum importance score
+            max_importance: Maximum importance score
+            emotion_labels: Filter by emotion labels
+            tags: Filter by tags
+            keywords: Filter by keywords
+            term_match: "any" or "all" of the given tags/keywords
+            mode: Query retrieval mode, "fulltext" or "vector"
+            emotion: VAD emotion of the current message
+            pool: Candidate pool size (default: RERANK_CANDIDATES)
 
         Returns:
-            List of Memory instances
+            List of (memory_id, score), best first
         """
         filters = [Memory.created_by == user_id]
 
-        if query:
+        if category_ids:
+            association = memory_category_association.c
             filters.append(
-                or_(
-                    Memory.simple_content.ilike(f"%{query}%"),
-                    Memory.full_content.ilike(f"%{query}%"),
+                Memory.id.in_(
+                    select(association.memory_id).where(
+                        association.category_id.in_(category_ids)
+                    )
                 )
             )
 
@@ -187,17 +475,233 @@ class MemoryService:
         if emotion_labels:
             filters.append(Memory.emotion_label.in_(emotion_labels))
 
-        stmt = (
+        for kind, terms in (("tag", tags), ("keyword", keywords)):
+            if terms:
+                filters.append(
+                    Memory.id.in_(self._term_filter(kind, terms, term_match))
+                )
+
+        pool = pool or self.RERANK_CANDIDATES
+        mode = mode or self.SEARCH_MODE
+        if query and mode == "vector" and self.embedder is not None:
+            candidates = await self._vector_candidates(user_id, query, filters, pool)
+        elif query:
+            candidates = await self._fulltext_candidates(query, filters, pool)
+        else:
+            result = await self.session.execute(
+                select(literal(1.0), *_RANK_COLUMNS)
+                .where(and_(*filters))
+                .order_by(Memory.importance.desc(), Memory.created_at.desc())
+                .limit(pool)
+            )
+            candidates = [(row[1], row[0], *row[2:]) for row in result.all()]
+
+        return self.ranker.rank(candidates, emotion=emotion)
+
+    @staticmethod
+    def _term_filter(kind: str, terms: list[str], match: str) -> Select:
+        """
+        Select ids of memories having any/all of the given terms.
+
+        Args:
+            kind: "tag" or "keyword"
+            terms: Terms to match (normalized here)
+            match: "any" or "all"
+
+        Returns:
+            Subquery of memory ids (served by ix_memory_terms_kind_term)
+        """
+        if match not in ("any", "all"):
+            raise ValueError(f"Unknown term match: {match}")
+        normalized = {normalize_term(term) for term in terms}
+        query = select(MemoryTerm.memory_id).where(
+            MemoryTerm.kind == kind, MemoryTerm.term.in_(normalized)
+        )
+        if match == "all":
+            query = query.group_by(MemoryTerm.memory_id).having(
+                func.count() == len(normalized)
+            )
+        return query
+
+    async def _store_terms(
+        self,
+        memory_id: int,
+        keywords: Optional[list[str]] = None,
+        tags: Optional[list[str]] = None,
+    ) -> None:
+        """
+        Replace a memory's indexed terms (flushed with the session).
+
+        Args:
+            memory_id: Memory ID
+            keywords: New keywords (None leaves keywords untouched)
+            tags: New tags (None leaves tags untouched)
+        """
+        rows = []
+        for kind, values in (("keyword", keywords), ("tag", tags)):
+            if values is None:
+                continue
+            await self.session.execute(
+                delete(MemoryTerm).where(
+                    MemoryTerm.memory_id == memory_id, MemoryTerm.kind == kind
+                )
+            )
+            terms = {normalize_term(value) for value in values}
+            rows.extend(
+                {"memory_id": memory_id, "kind": kind, "term": term}
+                for term in terms
+                if term
+            )
+        if rows:
+            await self.session.execute(insert(MemoryTerm), rows)
+
+    async def _load_ranked(self, memory_ids: list[int]) -> list[Memory]:
+        """Load full memories (with categories) in the given order."""
+        if not memory_ids:
+            return []
+        result = await self.session.execute(
             select(Memory)
-            .where(and_(*filters))
+            .where(Memory.id.in_(memory_ids))
             .options(selectinload(Memory.categories))
-            .order_by(Memory.importance.desc(), Memory.created_at.desc())
-            .limit(limit)
-            .offset(offset)
         )
+        by_id = {memory.id: memory for memory in result.scalars().all()}
+        return [by_id[mid] for mid in memory_ids if mid in by_id]
 
-        result = await self.session.execute(stmt)
-        return list(result.scalars().all())
+    async def _fulltext_candidates(
+        self,
+        query: str,
+        filters: list,
+        pool: int,
+    ) -> list[tuple]:
+        """
+        Select candidates matching any query term, most relevant first.
+
+        SQLite uses the FTS5 index with bm25(); PostgreSQL uses the generated
+        tsvector column with ts_rank(). Terms are prefix-matched, so "kitten"
+        also finds "kittens" and Russian word forms sharing a stem. The pool
+        is pre-ordered by relevance blended with importance.
+
+        Args:
+            query: Raw user message
+            filters: Non-text filters (owner, importance, emotion)
+            pool: Maximum number of candidates
+
+        Returns:
+            Candidate rows for MemoryRanker
+        """
+        terms = tokenize_query(query)
+        if not terms:
+            return []
+
+        if IS_SQLITE:
+            fts = literal_column("memories_fts")
+            match = " OR ".join(f'"{term}"*' for term in terms)
+            # bm25() is lower-is-better, so negate it into a relevance score
+            relevance = -func.bm25(fts, *self.FTS_COLUMN_WEIGHTS)
+            stmt = (
+                select(Memory.id, relevance, *_RANK_COLUMNS[1:])
+                .join(_memories_fts, _memories_fts.c.rowid == Memory.id)
+                .where(fts.op("MATCH")(match))
+            )
+        else:
+            tsquery = func.to_tsquery(
+                "simple", " | ".join(f"{term}:*" for term in terms)
+            )
+            relevance = func.ts_rank(Memory.search_vector, tsquery)
+            stmt = select(Memory.id, relevance, *_RANK_COLUMNS[1:]).where(
+                Memory.search_vector.op("@@")(tsquery)
+            )
+
+        importance = case((Memory.importance > 9999, 9999), else_=Memory.importance)
+        score = relevance * (1.0 + self.FULLTEXT_IMPORTANCE_BOOST * importance / 9999.0)
+
+        result = await self.session.execute(
+            stmt.where(and_(*filters))
+            .order_by(score.desc(), Memory.created_at.desc())
+            .limit(pool)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def _vector_candidates(
+        self,
+        user_id: int,
+        query: str,
+        filters: list,
+        pool: int,
+    ) -> list[tuple]:
+        """
+        Select candidates by cosine similarity to the query embedding.
+
+        SQLite uses the in-process NumPy index; PostgreSQL uses pgvector.
+
+        Args:
+            user_id: Telegram user ID
+            query: Text query to embed
+            filters: Non-text filters (owner, importance, emotion)
+            pool: Maximum number of candidates
+
+        Returns:
+            Candidate rows for MemoryRanker, most similar first
+        """
+        assert self.embedder is not None
+        query_vector = await self.embedder.embed(query)
+
+        if not IS_SQLITE:
+            distance = MemoryEmbedding.vector.cosine_distance(query_vector)
+            result = await self.session.execute(
+                select(Memory.id, 1.0 - distance, *_RANK_COLUMNS[1:])
+                .join(MemoryEmbedding, MemoryEmbedding.memory_id == Memory.id)
+                .where(
+                    and_(*filters),
+                    MemoryEmbedding.model == self.embedder.name,
+                    distance <= 1.0 - self.VECTOR_MIN_SCORE,
+                )
+                .order_by(distance)
+                .limit(pool)
+            )
+            return [tuple(row) for row in result.all()]
+
+        index = await vector_index_registry.get(
+            self.session, user_id, self.embedder.name, self.embedder.dim
+        )
+        k = pool if len(filters) == 1 else pool * self.VECTOR_OVERSAMPLE
+        hits = index.top_k(query_vector, k, self.VECTOR_MIN_SCORE)
+        if not hits:
+            return []
+
+        scores = dict(hits)
+        result = await self.session.execute(
+            select(*_RANK_COLUMNS).where(Memory.id.in_(scores), *filters)
+        )
+        rows = {row[0]: row for row in result.all()}
+        return [(mid, score, *rows[mid][1:]) for mid, score in hits if mid in rows][
+            :pool
+        ]
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed text with the configured embedder (None when disabled)."""
+        if self.embedder is None:
+            return None
+        return await self.embedder.embed(text)
+
+    async def _store_embedding(self, memory_id: int, vector: np.ndarray) -> None:
+        """Insert or replace a memory's embedding row (caller commits)."""
+        assert self.embedder is not None
+        await self.session.merge(
+            MemoryEmbedding(
+                memory_id=memory_id,
+                model=self.embedder.name,
+                dim=self.embedder.dim,
+                vector=pack_vector(vector) if IS_SQLITE else vector,
+            )
+        )
+
+    def _index_embedding(
+        self, user_id: int, memory_id: int, vector: Optional[np.ndarray]
+    ) -> None:
+        """Apply a committed embedding to the in-process index if loaded."""
+        if IS_SQLITE and vector is not None and self.embedder is not None:
+            vector_index_registry.upsert(user_id, self.embedder.name, memory_id, vector)
 
     async def update_memory(
         self,
@@ -214,7 +718,7 @@ class MemoryService:
         Returns:
             Updated Memory instance or None if not found
         """
-        memory = await self.get_memory(memory_id)
+        memory = await self._load_memory(memory_id)
         if not memory:
             return None
 
@@ -222,11 +726,28 @@ class MemoryService:
             if hasattr(memory, key):
                 setattr(memory, key, value)
 
+        vector = None
+        if "simple_content" in updates:
+            vector = await self._embed(memory.simple_content)
+            if vector is not None:
+                await self._store_embedding(memory.id, vector)
+
+        if "keywords" in updates or "tags" in updates:
+            await self._store_terms(
+                memory.id,
+                **{
+                    kind: updates[kind] or []
+                    for kind in ("keywords", "tags")
+                    if kind in updates
+                },
+            )
+
         memory.updated_at = datetime.utcnow()
         await self.session.commit()
         await self.session.refresh(memory)
 
-        await self._invalidate_cache(memory.created_by)
+        self._index_embedding(memory.created_by, memory.id, vector)
+        await self._invalidate_cache(memory.created_by, memory.id)
 
         return memory
 
@@ -240,15 +761,24 @@ class MemoryService:
         Returns:
             True if deleted, False if not found
         """
-        memory = await self.get_memory(memory_id)
+        memory = await self._load_memory(memory_id)
         if not memory:
             return False
 
         user_id = memory.created_by
+        await self.session.execute(
+            delete(MemoryEmbedding).where(MemoryEmbedding.memory_id == memory_id)
+        )
+        await self.session.execute(
+            delete(MemoryTerm).where(MemoryTerm.memory_id == memory_id)
+        )
         await self.session.delete(memory)
         await self.session.commit()
 
-        await self._invalidate_cache(user_id)
+        vector_index_registry.remove(user_id, memory_id)
+        await memory_graph_registry.remove_memory(user_id, memory_id)
+
+        await self._invalidate_cache(user_id, memory_id)
 
         return True
 
@@ -291,6 +821,12 @@ class MemoryService:
         await self.session.commit()
         await self.session.refresh(link)
 
+        owners = await self._memory_owners({from_memory_id, to_memory_id})
+        for user_id in set(owners.values()):
+            await memory_graph_registry.add_link(
+                user_id, from_memory_id, to_memory_id, link_type, strength
+            )
+
         return link
 
     async def get_linked_memories(
@@ -308,19 +844,24 @@ class MemoryService:
         Returns:
             List of linked Memory instances
         """
-        memory = await self.get_memory(memory_id)
-        if not memory:
-            return []
-
+        # Read from the database: one indexed query per direction
         linked_ids = set()
 
         if direction in ("outgoing", "both"):
-            for link in memory.outgoing_links:
-                linked_ids.add(link.to_memory_id)
+            result = await self.session.execute(
+                select(MemoryLink.to_memory_id).where(
+                    MemoryLink.from_memory_id == memory_id
+                )
+            )
+            linked_ids.update(result.scalars().all())
 
         if direction in ("incoming", "both"):
-            for link in memory.incoming_links:
-                linked_ids.add(link.from_memory_id)
+            result = await self.session.execute(
+                select(MemoryLink.from_memory_id).where(
+                    MemoryLink.to_memory_id == memory_id
+                )
+            )
+            linked_ids.update(result.scalars().all())
 
         if not linked_ids:
             return []
@@ -330,6 +871,50 @@ class MemoryService:
         )
         return list(result.scalars().all())
 
+    async def get_related_memories(
+        self,
+        user_id: int,
+        memory_ids: list[int],
+        limit: int = 10,
+        hops: Optional[int] = None,
+        direction: str = "both",
+    ) -> list[Memory]:
+        """
+        Get memories associated with seed memories through the link graph.
+
+        Traversal runs on the in-memory graph; only the resulting memories
+        are loaded from the database.
+
+        Args:
+            user_id: Telegram user ID (memory owner)
+            memory_ids: Seed memory IDs (excluded from the result)
+            limit: Maximum number of memories
+            hops: Breadth-first expansion up to this many hops; by default
+                memories are ranked by strength-weighted personalized PageRank
+            direction: Link direction ("outgoing", "incoming", "both")
+
+        Returns:
+            List of the user's related Memory instances, most related first
+        """
+        graph = await memory_graph_registry.get(self.session, user_id)
+        if hops is None:
+            related = graph.personalized_pagerank(
+                memory_ids, top_n=limit, direction=direction
+            )
+        else:
+            related = graph.k_hop(memory_ids, k=hops, direction=direction, limit=limit)
+
+        # Links may point at other users' memories: never return those
+        memories = await self._load_ranked([memory_id for memory_id, _ in related])
+        return [memory for memory in memories if memory.created_by == user_id]
+
+    async def _memory_owners(self, memory_ids: set[int]) -> dict[int, int]:
+        """Map memory IDs to their owners (created_by)."""
+        result = await self.session.execute(
+            select(Memory.id, Memory.created_by).where(Memory.id.in_(memory_ids))
+        )
+        return {memory_id: user_id for memory_id, user_id in result.all()}
+
     async def get_category(self, full_path: str) -> Optional[Category]:
         """
         Get category by full path.
@@ -360,17 +945,30 @@ class MemoryService:
         )
         return list(result.scalars().all())
 
-    async def _invalidate_cache(self, user_id: int) -> None:
+    def _generation_key(self, user_id: int) -> str:
+        """Redis key of a user's memory generation counter."""
+        return f"{self.CACHE_PREFIX}:gen:{user_id}"
+
+    async def _get_generation(self, user_id: int) -> int:
+        """Get a user's memory generation (0 if never bumped)."""
+        value = await redis_service.get(self._generation_key(user_id))
+        return int(value) if value else 0
+
+    async def _invalidate_cache(self, user_id: int, *memory_ids: int) -> None:
         """
         Invalidate user's memory caches.
 
-        Note: Currently invalidates individual memory cache.
-        Future: Implement pattern-based deletion when needed.
+        Bumps the user's generation counter (atomic INCR), which orphans every
+        cached search result keyed by the previous generation, and drops the
+        per-memory entries of changed memories.
 
         Args:
             user_id: Telegram user ID
+            *memory_ids: IDs of updated or deleted memories
         """
-        pass
+        await redis_service.incr(self._generation_key(user_id))
+        for memory_id in memory_ids:
+            await redis_service.delete(f"{self.CACHE_PREFIX}:{memory_id}")
 
     async def create_memory_version(
         self,
@@ -398,7 +996,7 @@ class MemoryService:
         if llm_service is None:
             llm_service = get_llm_service()
 
-        original = await self.get_memory(memory_id)
+        original = await self._load_memory(memory_id)
         if not original:
             raise ValueError(f"Memory {memory_id} not found")
 
@@ -435,10 +1033,20 @@ class MemoryService:
         categories_list = list(categories_result.scalars().all())
         new_version.categories = categories_list
 
+        vector = await self._embed(simple_content)
+
         self.session.add(new_version)
+        await self.session.flush()
+        await self._store_terms(
+            new_version.id, keywords=original.keywords, tags=original.tags
+        )
+        if vector is not None:
+            await self._store_embedding(new_version.id, vector)
         await self.session.commit()
         await self.session.refresh(new_version, ["categories"])
 
+        self._index_embedding(created_by, new_version.id, vector)
+
         for link in original.outgoing_links:
             await self.create_memory_link(
                 from_memory_id=new_version.id,
@@ -462,7 +1070,7 @@ class MemoryService:
         Returns:
             List of all versions, sorted by version number
         """
-        memory = await self.get_memory(memory_id)
+        memory = await self._load_memory(memory_id)
         if not memory:
             return []
 
@@ -535,80 +1143,5 @@ class MemoryService:
             auto_generated=True,
         )
 
-    def _serialize_memory(self, memory: Memory) -> dict:
-        """
-        Serialize Memory instance to JSON-compatible dict.
-
-        Args:
-            memory: Memory instance
-
-        Returns:
-            Dictionary representation
-        """
-        return {
-            "id": memory.id,
-            "simple_content": memory.simple_content,
-            "full_content": memory.full_content,
-            "importance": memory.importance,
-            "emotion_valence": memory.emotion_valence,
-            "emotion_arousal": memory.emotion_arousal,
-            "emotion_dominance": memory.emotion_dominance,
-            "emotion_label": memory.emotion_label,
-            "keywords": memory.keywords,
-            "tags": memory.tags,
-            "context_temporal": memory.context_temporal,
-            "context_situational": memory.context_situational,
-            "version": memory.version,
-            "parent_id": memory.parent_id,
-            "evolution_triggers": memory.evolution_triggers,
-            "created_by": memory.created_by,
-            "created_at": memory.created_at.isoformat() if memory.created_at else None,
-            "updated_at": memory.updated_at.isoformat() if memory.updated_at else None,
-            "last_accessed": memory.last_accessed.isoformat()
-            if memory.last_accessed
-            else None,
-            "access_count": memory.access_count,
-        }
-
-    def _deserialize_memory(self, data: dict) -> Memory:
-        """
-        Deserialize JSON dict to Memory instance (cached data only).
-
-        Args:
-            data: Dictionary representation
-
-        Returns:
-            Memory instance
-        """
-        memory = Memory(
-            id=data["id"],
-            simple_content=data["simple_content"],
-            full_content=data["full_content"],
-            importance=data["importance"],
-            emotion_valence=data.get("emotion_valence"),
-            emotion_arousal=data.get("emotion_arousal"),
-            emotion_dominance=data.get("emotion_dominance"),
-            emotion_label=data.get("emotion_label"),
-            keywords=data.get("keywords"),
-            tags=data.get("tags"),
-            context_temporal=data.get("context_temporal"),
-            context_situational=data.get("context_situational"),
-            version=data["version"],
-            parent_id=data.get("parent_id"),
-            evolution_triggers=data.get("evolution_triggers"),
-            created_by=data["created_by"],
-            created_at=datetime.fromisoformat(data["created_at"])
-            if data.get("created_at")
-            else None,
-            updated_at=datetime.fromisoformat(data["updated_at"])
-            if data.get("updated_at")
-            else None,
-            last_accessed=datetime.fromisoformat(data["last_accessed"])
-            if data.get("last_accessed")
-            else None,
-            access_count=data["access_count"],
-        )
-        return memory
-
 
 memory_service_factory = MemoryService
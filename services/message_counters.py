@@ -0,0 +1,235 @@
+"""Maintained message counts.
+
+Counting messages used to load every matching row. message_counters holds
+one row per user ("user", users.id), per chat ("chat", chat_id) and the
+total ("all", 0). Writers call increment() in the transaction that inserts
+the messages, so a count is a primary key lookup.
+
+Counters can drift (rows inserted or deleted by other code, a manual fix in
+the database), so reconcile() recomputes them with COUNT(*) ... GROUP BY and
+corrects the rows that differ. It runs every MESSAGE_COUNTER_RECONCILE_INTERVAL
+seconds once started. It locks message_counters first, so writers committing
+meanwhile wait and apply their increments on top of the recomputed values.
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.message import Message, MessageCounter
+
+_counters = MessageCounter.__table__
+
+# Scope keys: total messages use key 0
+ALL_KEY = 0
+
+
+def _upsert(dialect: str) -> Any:
+    """INSERT ... ON CONFLICT (scope, key) DO UPDATE count += excluded, if supported."""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(_counters)
+    return stmt.on_conflict_do_update(
+        index_elements=["scope", "key"],
+        set_={"count": _counters.c.count + stmt.excluded.count},
+    )
+
+
+class MessageCounters:
+    """Increment, read and reconcile per-user/per-chat message counts."""
+
+    RECONCILE_INTERVAL = float(os.getenv("MESSAGE_COUNTER_RECONCILE_INTERVAL", "3600"))
+
+    def __init__(self):
+        """Initialize without a reconcile loop."""
+        self._task: Optional[asyncio.Task] = None
+        self._stats: dict[str, Any] = {
+            "reconciles": 0,
+            "corrected": 0,
+            "last_reconcile_ms": None,
+        }
+
+    async def increment(
+        self, session: AsyncSession, messages: Iterable[tuple[int, int]]
+    ) -> None:
+        """
+        Count new messages (caller commits together with the messages).
+
+        Args:
+            session: Session of the transaction that inserts the messages
+            messages: (users.id, chat_id) of each inserted message
+        """
+        deltas: Counter[tuple[str, int]] = Counter()
+        for user_id, chat_id in messages:
+            deltas["user", user_id] += 1
+            deltas["chat", chat_id] += 1
+            deltas["all", ALL_KEY] += 1
+        if not deltas:
+            return
+
+        rows = [
+            {"scope": scope, "key": key, "count": count}
+            for (scope, key), count in sorted(deltas.items())
+        ]
+        stmt = _upsert(session.get_bind().dialect.name)
+        if stmt is not None:
+            await session.execute(stmt, rows)
+            return
+
+        for row in rows:
+            result = await session.execute(
+                update(_counters)
+                .where(_counters.c.scope == row["scope"], _counters.c.key == row["key"])
+                .values(count=_counters.c.count + row["count"])
+            )
+            if result.rowcount == 0:
+                await session.execute(_counters.insert(), row)
+
+    async def get(self, session: AsyncSession, scope: str, key: int = ALL_KEY) -> int:
+        """
+        Read a maintained count.
+
+        Args:
+            session: SQLAlchemy async session
+            scope: "user", "chat" or "all"
+            key: users.id, chat_id, or 0 for "all"
+
+        Returns:
+            Number of messages (0 if there is no counter row)
+        """
+        count = await session.scalar(
+            select(MessageCounter.count).where(
+                MessageCounter.scope == scope, MessageCounter.key == key
+            )
+        )
+        return count or 0
+
+    async def reconcile(self, session: Optional[AsyncSession] = None) -> int:
+        """
+        Recompute all counters with COUNT(*) and fix the ones that drifted.
+
+        Args:
+            session: Session to use (default: a new AsyncSessionLocal session)
+
+        Returns:
+            Number of counter rows corrected
+        """
+        if session is None:
+            from database import AsyncSessionLocal
+
+            async with AsyncSessionLocal() as own_session:
+                return await self.reconcile(own_session)
+
+        started = time.perf_counter()
+        await self._lock(session)
+
+        actual: dict[tuple[str, int], int] = {}
+        for scope, column in (("user", Message.user_id), ("chat", Message.chat_id)):
+            result = await session.execute(
+                select(column, func.count()).group_by(column)
+            )
+            actual.update({(scope, key): count for key, count in result.all()})
+        actual["all", ALL_KEY] = await session.scalar(
+            select(func.count()).select_from(Message)
+        )
+
+        result = await session.execute(
+            select(MessageCounter.scope, MessageCounter.key, MessageCounter.count)
+        )
+        stored = {(scope, key): count for scope, key, count in result.all()}
+
+        stale = [key for key in stored if key not in actual]
+        changed = [
+            {"scope": scope, "key": key, "count": count}
+            for (scope, key), count in actual.items()
+            if stored.get((scope, key), 0) != count
+        ]
+        for scope, key in stale:
+            await session.execute(
+                delete(_counters).where(
+                    _counters.c.scope == scope, _counters.c.key == key
+                )
+            )
+        for row in changed:
+            if (row["scope"], row["key"]) in stored:
+                await session.execute(
+                    update(_counters)
+                    .where(
+                        _counters.c.scope == row["scope"],
+                        _counters.c.key == row["key"],
+                    )
+                    .values(count=row["count"])
+                )
+            else:
+                await session.execute(_counters.insert(), row)
+        await session.commit()
+
+        corrected = len(stale) + len(changed)
+        if corrected:
+            print(f"⚠️  Message counters drifted, corrected {corrected} rows")
+        self._stats["reconciles"] += 1
+        self._stats["corrected"] += corrected
+        self._stats["last_reconcile_ms"] = round(
+            (time.perf_counter() - started) * 1000, 1
+        )
+        return corrected
+
+    async def _lock(self, session: AsyncSession) -> None:
+        """Block counter writers until the reconcile transaction ends."""
+        if session.get_bind().dialect.name == "postgresql":
+            await session.execute(
+                text("LOCK TABLE message_counters IN SHARE ROW EXCLUSIVE MODE")
+            )
+        else:
+            # Start the write transaction now (SQLite: one writer at a time)
+            await session.execute(
+                update(_counters)
+                .where(_counters.c.key != _counters.c.key)
+                .values(count=_counters.c.count)
+            )
+
+    async def start(self) -> None:
+        """Start the periodic reconcile loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic reconcile loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Reconcile every RECONCILE_INTERVAL seconds."""
+        while True:
+            await asyncio.sleep(self.RECONCILE_INTERVAL)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                print(f"⚠️  Message counter reconcile failed: {e}")
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Reconcile job statistics.
+
+        Returns:
+            Number of reconciles, corrected rows and last duration
+        """
+        return dict(self._stats)
+
+
+# Global message counters
+message_counters = MessageCounters()
@@ -5,13 +5,14 @@ Stores all bot and user messages to database for conversation context.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Collection, Optional
 
-from sqlalchemy import select, desc
+from sqlalchemy import desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.message import Message
-from models.user import User
+from services.message_counters import message_counters
+from services.user_resolver import user_resolver
 
 
 class MessageService:
@@ -43,22 +44,9 @@ class MessageService:
         Returns:
             Created Message object
         """
-        # Map telegram_id to internal database user_id
-        stmt = select(User.id).where(User.telegram_id == user_id)
-        result = await self.session.execute(stmt)
-        db_user_id = result.scalar_one_or_none()
-
-        if db_user_id is None:
-            # Create user if doesn't exist
-            user = User(
-                telegram_id=user_id,
-                is_friend=False,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-            )
-            self.session.add(user)
-            await self.session.flush()  # Get the id without committing
-            db_user_id = user.id
+        # Map telegram_id to internal database user_id (cached; the user is
+        # created if it doesn't exist)
+        db_user_id = await user_resolver.resolve(self.session, user_id)
 
         message = Message(
             user_id=db_user_id,
@@ -69,7 +57,9 @@ class MessageService:
             timestamp=datetime.utcnow(),
         )
         self.session.add(message)
+        await message_counters.increment(self.session, [(db_user_id, chat_id)])
         await self.session.commit()
+        await user_resolver.remember({user_id: db_user_id})
         await self.session.refresh(message)
         return message
 
@@ -78,6 +68,7 @@ class MessageService:
         user_id: int,
         chat_id: int,
         limit: int = 20,
+        exclude_message_ids: Optional[Collection[int]] = None,
     ) -> list[Message]:
         """Get recent messages for a user/chat.
 
@@ -85,16 +76,16 @@ class MessageService:
             user_id: Telegram user ID
             chat_id: Telegram chat ID
             limit: Maximum number of messages to retrieve (default: 20)
+            exclude_message_ids: Telegram message IDs to leave out (optional;
+                keeps messages stored on arrival out of their own history)
 
         Returns:
             List of Message objects, ordered by most recent first
         """
-        stmt = (
-            select(Message)
-            .where(Message.chat_id == chat_id)
-            .order_by(desc(Message.timestamp))
-            .limit(limit)
-        )
+        stmt = select(Message).where(Message.chat_id == chat_id)
+        if exclude_message_ids:
+            stmt = stmt.where(Message.message_id.notin_(exclude_message_ids))
+        stmt = stmt.order_by(desc(Message.timestamp)).limit(limit)
 
         result = await self.session.execute(stmt)
         messages = result.scalars().all()
@@ -109,20 +100,25 @@ class MessageService:
     ) -> int:
         """Get message count for user/chat.
 
+        Single filters and the total are read from the maintained
+        message_counters (one row lookup); filtering by both user and chat
+        falls back to COUNT(*).
+
         Args:
-            user_id: Optional Telegram user ID to filter
+            user_id: Optional internal user ID (users.id) to filter
             chat_id: Optional Telegram chat ID to filter
 
         Returns:
             Count of messages matching filters
         """
-        stmt = select(Message)
-
+        if user_id is not None and chat_id is not None:
+            return await self.session.scalar(
+                select(func.count())
+                .select_from(Message)
+                .where(Message.user_id == user_id, Message.chat_id == chat_id)
+            )
         if user_id is not None:
-            stmt = stmt.where(Message.user_id == user_id)
+            return await message_counters.get(self.session, "user", user_id)
         if chat_id is not None:
-            stmt = stmt.where(Message.chat_id == chat_id)
-
-        result = await self.session.execute(stmt)
-        messages = result.scalars().all()
-        return len(messages)
+            return await message_counters.get(self.session, "chat", chat_id)
+        return await message_counters.get(self.session, "all")
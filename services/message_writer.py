@@ -0,0 +1,227 @@
+"""Buffered batch writer for chat messages.
+
+MessageService.store_message looks up the user, maybe inserts it, then
+commits and refreshes: a write transaction per message, two per chat turn.
+MessageWriter buffers rows in memory and writes them with one multi-row
+INSERT in one transaction, MESSAGE_FLUSH_INTERVAL_MS after the first
+buffered row or as soon as MESSAGE_FLUSH_ROWS rows are waiting. Telegram
+IDs are mapped to user rows for the whole batch at once by user_resolver
+(missing users are created), and message_counters are bumped in the same
+transaction.
+
+write(durable=True) (default MESSAGE_DURABLE_WRITES) waits until the row is
+committed and raises if the flush failed. Durable writes don't wait for the
+interval: a flush starts right away and rows arriving meanwhile go into the
+next one (group commit). Otherwise a failed flush is retried with the next
+one. More than MESSAGE_BUFFER_MAX waiting rows make
+writers wait for a flush (backpressure). stop() drains the buffer on
+shutdown.
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from sqlalchemy import insert
+
+from models.message import Message
+from services.message_counters import message_counters
+from services.user_resolver import user_resolver
+
+
+class MessageWriter:
+    """Write-behind buffer of Message rows with batched flushes."""
+
+    FLUSH_INTERVAL = float(os.getenv("MESSAGE_FLUSH_INTERVAL_MS", "50")) / 1000
+    FLUSH_ROWS = int(os.getenv("MESSAGE_FLUSH_ROWS", "100"))
+    BUFFER_MAX = int(os.getenv("MESSAGE_BUFFER_MAX", "5000"))
+    DURABLE = os.getenv("MESSAGE_DURABLE_WRITES", "false").lower() == "true"
+
+    # Flushes a row may fail before it is dropped
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None):
+        """
+        Initialize empty writer.
+
+        Args:
+            session_factory: Async session factory (default: AsyncSessionLocal)
+        """
+        self.session_factory = session_factory
+        self._buffer: list[list[Any]] = []  # [row, future, attempts]
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stats = {"written": 0, "flushes": 0, "failed_flushes": 0, "dropped": 0}
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def write(
+        self,
+        user_id: int,
+        chat_id: int,
+        message_text: str,
+        is_bot: bool = False,
+        durable: Optional[bool] = None,
+        message_id: int = 0,
+    ) -> None:
+        """
+        Buffer a message for the next flush.
+
+        Args:
+            user_id: Telegram user ID (mapped to the internal user on flush)
+            chat_id: Telegram chat ID
+            message_text: Message text content
+            is_bot: Whether this is a bot message (default: False)
+            durable: Wait until the row is committed (default:
+                MESSAGE_DURABLE_WRITES)
+            message_id: Telegram message ID (default: 0, no Telegram message)
+
+        Raises:
+            Exception: In durable mode, if the flush failed
+        """
+        if len(self._buffer) >= self.BUFFER_MAX:
+            await self.flush()
+
+        durable = self.DURABLE if durable is None else durable
+        loop = asyncio.get_running_loop()
+        future = loop.create_future() if durable else None
+        row = {
+            "telegram_id": user_id,
+            "chat_id": chat_id,
+            "message_id": message_id,
+            "text": message_text,
+            "message_type": "bot" if is_bot else "text",
+            "timestamp": datetime.utcnow(),
+        }
+        self._buffer.append([row, future, 0])
+
+        if durable or len(self._buffer) >= self.FLUSH_ROWS:
+            if self._flush_task is None:
+                self._flush_task = loop.create_task(self._flush_in_background())
+        elif self._timer is None:
+            self._timer = loop.create_task(self._flush_after_interval())
+
+        if future is not None:
+            await future
+
+    async def flush(self) -> int:
+        """
+        Write all buffered rows in one transaction.
+
+        Returns:
+            Number of messages written
+        """
+        async with self._lock:
+            if not self._buffer:
+                return 0
+            batch, self._buffer = self._buffer, []
+
+            try:
+                await self._write([row for row, _, _ in batch])
+            except asyncio.CancelledError:
+                self._buffer[:0] = batch
+                raise
+            except Exception as e:
+                print(f"⚠️  Message flush failed ({len(batch)} rows): {e}")
+                self._stats["failed_flushes"] += 1
+                retry = []
+                for row, future, attempts in batch:
+                    if future is not None:
+                        if not future.done():
+                            future.set_exception(e)
+                    elif attempts + 1 < self.MAX_ATTEMPTS:
+                        retry.append([row, None, attempts + 1])
+                    else:
+                        self._stats["dropped"] += 1
+                self._buffer[:0] = retry
+                return 0
+
+            self._stats["flushes"] += 1
+            self._stats["written"] += len(batch)
+            for _, future, _ in batch:
+                if future is not None and not future.done():
+                    future.set_result(None)
+            return len(batch)
+
+    async def _write(self, rows: list[dict[str, Any]]) -> None:
+        """Insert rows with their users resolved, in one transaction."""
+        session_factory = self.session_factory
+        if session_factory is None:
+            from database import AsyncSessionLocal
+
+            session_factory = AsyncSessionLocal
+
+        async with session_factory() as session:
+            user_ids = await user_resolver.resolve_many(
+                session, {row["telegram_id"] for row in rows}
+            )
+            values = [
+                {
+                    **{k: v for k, v in row.items() if k != "telegram_id"},
+                    "user_id": user_ids[row["telegram_id"]],
+                }
+                for row in rows
+            ]
+            await session.execute(insert(Message), values)
+            await message_counters.increment(
+                session, [(value["user_id"], value["chat_id"]) for value in values]
+            )
+            await session.commit()
+
+        # Only cache users whose rows are committed
+        await user_resolver.remember(user_ids)
+
+    async def _flush_after_interval(self) -> None:
+        """Flush FLUSH_INTERVAL after the first buffered row."""
+        await asyncio.sleep(self.FLUSH_INTERVAL)
+        try:
+            await self.flush()
+        finally:
+            self._timer = None
+        if self._buffer and self._flush_task is None:
+            # Rows written during the flush (or put back for a retry)
+            self._timer = asyncio.get_running_loop().create_task(
+                self._flush_after_interval()
+            )
+
+    async def _flush_in_background(self) -> None:
+        """Flush triggered by FLUSH_ROWS waiting rows or durable writes."""
+        try:
+            await self.flush()
+            # Durable writes that arrived during the flush
+            while any(future is not None for _, future, _ in self._buffer):
+                await self.flush()
+        finally:
+            self._flush_task = None
+
+    async def stop(self) -> None:
+        """Flush everything that is buffered (on shutdown)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+            self._timer = None
+        if self._flush_task is not None:
+            await self._flush_task
+        while self._buffer:
+            if not await self.flush():
+                break
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Writer statistics.
+
+        Returns:
+            Buffered rows and counts of written rows, flushes, failed flushes
+            and dropped rows
+        """
+        return {"buffered": len(self._buffer), **self._stats}
+
+
+# Global message writer
+message_writer = MessageWriter()
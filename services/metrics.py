@@ -0,0 +1,167 @@
+"""In-process latency and token metrics.
+
+Named timers keep a sliding window of recent durations and report count,
+mean and percentiles in milliseconds (exposed in /api/version as
+"latency"). Used to watch user-facing paths such as tool execution and LLM
+calls without an external metrics stack.
+
+TokenUsage sums OpenAI usage per model, including prompt tokens served from
+the provider's prompt cache ("prompt_cache" in /api/version).
+"""
+
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+
+class LatencyMetrics:
+    """Sliding-window latency recorder keyed by operation name."""
+
+    WINDOW = int(os.getenv("METRICS_WINDOW", "512"))
+
+    def __init__(self):
+        """Initialize empty recorder."""
+        self._samples: dict[str, deque[float]] = {}
+        self._counts: dict[str, int] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Record one duration.
+
+        Args:
+            name: Operation name (e.g. "tool.create_memory")
+            seconds: Duration in seconds
+        """
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.WINDOW)
+        samples.append(seconds)
+        self._counts[name] = self._counts.get(name, 0) + 1
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the enclosed block (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """
+        Percentile of an operation's recent durations.
+
+        Args:
+            name: Operation name
+            q: Quantile between 0 and 1 (e.g. 0.95)
+
+        Returns:
+            Duration in seconds, or None without samples
+        """
+        samples = self._samples.get(name)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def window_size(self, name: str) -> int:
+        """Number of samples currently in an operation's window."""
+        return len(self._samples.get(name, ()))
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """
+        Per-operation statistics over the window.
+
+        Returns:
+            {name: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}
+        """
+        result = {}
+        for name, samples in sorted(self._samples.items()):
+            ordered = sorted(samples)
+            n = len(ordered)
+            result[name] = {
+                "count": self._counts[name],
+                "mean_ms": round(sum(ordered) / n * 1000, 1),
+                "p50_ms": round(ordered[(n - 1) // 2] * 1000, 1),
+                "p95_ms": round(ordered[min(n - 1, int(n * 0.95))] * 1000, 1),
+                "p99_ms": round(ordered[min(n - 1, int(n * 0.99))] * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return result
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        self._samples.clear()
+        self._counts.clear()
+
+
+class TokenUsage:
+    """Per-model totals of prompt, cached prompt and completion tokens."""
+
+    def __init__(self):
+        """Initialize empty totals."""
+        self._totals: dict[str, dict[str, int]] = {}
+
+    def record(self, model: str, usage: Any) -> None:
+        """
+        Add one response's usage.
+
+        Args:
+            model: Model name
+            usage: OpenAI CompletionUsage (ignored if missing)
+        """
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        if not isinstance(prompt_tokens, int):
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+
+        totals = self._totals.setdefault(
+            model,
+            {
+                "requests": 0,
+                "prompt_tokens": 0,
+                "cached_tokens": 0,
+                "completion_tokens": 0,
+            },
+        )
+        totals["requests"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        if isinstance(cached_tokens, int):
+            totals["cached_tokens"] += cached_tokens
+        if isinstance(completion_tokens, int):
+            totals["completion_tokens"] += completion_tokens
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """
+        Per-model totals.
+
+        Returns:
+            {model: {requests, prompt_tokens, cached_tokens,
+            completion_tokens, cached_ratio}}
+        """
+        return {
+            model: {
+                **totals,
+                "cached_ratio": round(
+                    totals["cached_tokens"] / totals["prompt_tokens"], 3
+                )
+                if totals["prompt_tokens"]
+                else 0.0,
+            }
+            for model, totals in sorted(self._totals.items())
+        }
+
+    def reset(self) -> None:
+        """Drop all totals."""
+        self._totals.clear()
+
+
+# Global latency metrics
+latency_metrics = LatencyMetrics()
+
+# Global OpenAI token usage
+token_usage = TokenUsage()
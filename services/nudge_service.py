@@ -13,7 +13,7 @@ from aiogram import Bot
 from aiogram.enums import ParseMode
 from aiogram.exceptions import TelegramBadRequest
 
-from services.llm_service import LLMService
+from services.llm_service import get_llm_service
 
 
 class NudgeService:
@@ -47,7 +47,7 @@ class NudgeService:
             raise ValueError("BOT_TOKEN not configured in environment")
 
         self.bot = Bot(token=self.bot_token)
-        self.llm_service = LLMService()
+        self.llm_service = get_llm_service()
 
     def _get_admin_ids(self) -> list[int]:
         """Get admin IDs from ADMIN_IDS environment variable."""
@@ -209,6 +209,7 @@ class NudgeService:
                     memories=[],
                     message_history=[],
                     tools=None,  # Don't provide tools for this
+                    coalesce=True,  # Retried nudges share the in-flight call
                 )
 
                 # Handle tool calls (shouldn't happen with tools=None)
@@ -0,0 +1,114 @@
+"""Process-wide pooled OpenAI client.
+
+Every AsyncOpenAI instance owns its own HTTP connection pool, so creating
+one per service (or per tool call) pays TCP/TLS setup on each request.
+get_openai_client() returns one shared client per (api key, base URL) with
+an explicitly configured pool:
+
+- OPENAI_MAX_CONNECTIONS / OPENAI_MAX_KEEPALIVE: pool limits
+- OPENAI_KEEPALIVE_EXPIRY: seconds an idle connection is kept (the SDK
+  default of 5s drops connections between most chat turns)
+- OPENAI_HTTP2: auto (when the h2 package is installed), true or false
+- OPENAI_TIMEOUT / OPENAI_CONNECT_TIMEOUT
+- OPENAI_MAX_RETRIES: SDK-level retries, off by default since
+  services.request_executor retries within each method's deadline
+"""
+
+import importlib.util
+import os
+from typing import Optional
+
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - openai depends on httpx
+    httpx = None  # type: ignore[assignment]
+
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "120"))
+HTTP2 = os.getenv("OPENAI_HTTP2", "auto").lower()
+TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "0"))
+
+_clients: dict[tuple[str, Optional[str]], AsyncOpenAI] = {}
+
+
+def http2_enabled() -> bool:
+    """Whether to negotiate HTTP/2 (needs the h2 package)."""
+    if HTTP2 == "auto":
+        return importlib.util.find_spec("h2") is not None
+    return HTTP2 == "true"
+
+
+def create_openai_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """
+    Create an AsyncOpenAI client with the configured connection pool.
+
+    Args:
+        api_key: OpenAI API key
+        base_url: OpenAI-compatible endpoint (optional)
+
+    Returns:
+        New client
+    """
+    client_kwargs = {"api_key": api_key, "max_retries": MAX_RETRIES}
+    if base_url:
+        client_kwargs["base_url"] = base_url
+
+    if httpx is not None:
+        timeout = httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT)
+        client_kwargs["timeout"] = timeout
+        client_kwargs["http_client"] = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=timeout,
+            http2=http2_enabled(),
+        )
+    else:
+        client_kwargs["timeout"] = TIMEOUT
+
+    return AsyncOpenAI(**client_kwargs)
+
+
+def get_openai_client(
+    api_key: Optional[str] = None, base_url: Optional[str] = None
+) -> AsyncOpenAI:
+    """
+    Get the shared client for an API key and base URL.
+
+    Args:
+        api_key: OpenAI API key (default: OPENAI_API_KEY)
+        base_url: OpenAI-compatible endpoint (default: OPENAI_BASE_URL)
+
+    Returns:
+        Shared client
+
+    Raises:
+        ValueError: If no API key is configured
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+    base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+
+    client = _clients.get((api_key, base_url))
+    if client is None:
+        client = _clients[(api_key, base_url)] = create_openai_client(api_key, base_url)
+    return client
+
+
+async def close_openai_clients() -> None:
+    """Close all shared clients (on shutdown)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        try:
+            await client.close()
+        except Exception as e:
+            print(f"⚠️  OpenAI client close error: {e}")
@@ -1,37 +1,265 @@
-"""Redis connection service for caching."""
+"""Redis connection service for caching.
 
+get_json() is optionally fronted by an in-process LRU/TTL tier (LocalCache,
+opt-in with REDIS_LOCAL_CACHE_SIZE)
+holding parsed values, which saves the network round-trip and json.loads
+for hot keys such as lessons and memory:{id}. Writes and deletes drop the
+key locally and publish it on a pub/sub channel so every other bot process
+drops its local copy too; the local TTL bounds staleness if a message is
+lost. Local entries never outlive the key's own Redis expiry (its PTTL is
+read with the GET in one round-trip). Keys under REDIS_IMMUTABLE_PREFIXES
+(default memory:search:, whose keys embed a generation, and the
+content-addressed llm:cache:; neither ever changes value) are not
+invalidated on writes. Values returned from the local tier
+are shared: treat them as read-only.
+
+Binary values (get_bytes/set_bytes/get_range) go through a second client
+without response decoding, since the main client decodes replies as UTF-8.
+"""
+
+import asyncio
 import json
 import os
+import time
+import uuid
+from collections import OrderedDict
 from typing import Any, Optional
 
 import redis.asyncio as aioredis  # type: ignore[import-untyped]
 
 
+class LocalCache:
+    """Bounded in-process LRU cache with per-entry TTL and hit counters."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        """
+        Initialize local cache.
+
+        Args:
+            max_entries: Maximum number of entries (least recently used evicted)
+            ttl: Entry time-to-live in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        # Bumped on every invalidation; lets a reader detect that the key may
+        # have changed while its Redis GET was in flight
+        self.epoch = 0
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    @staticmethod
+    def prefix(key: str) -> str:
+        """Key family for metrics ("memory:42" -> "memory")."""
+        parts = key.split(":")
+        if len(parts) > 1 and not parts[1].isdigit():
+            return f"{parts[0]}:{parts[1]}"
+        return parts[0]
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """
+        Look up a key.
+
+        Returns:
+            (found, value) tuple
+        """
+        counters = self.stats.setdefault(self.prefix(key), {"hits": 0, "misses": 0})
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                counters["hits"] += 1
+                return True, entry[1]
+            del self._entries[key]
+        counters["misses"] += 1
+        return False, None
+
+    def peek(self, key: str) -> tuple[bool, Any]:
+        """
+        Look up a key without counting it or refreshing its LRU position.
+
+        Returns:
+            (found, value) tuple
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds the key has left in Redis (caps the local TTL)
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Drop a key."""
+        self.epoch += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all keys."""
+        self.epoch += 1
+        self._entries.clear()
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """Hit/miss counters and hit ratio per key prefix."""
+        return {
+            prefix: {
+                **counters,
+                "hit_ratio": round(
+                    counters["hits"] / max(1, counters["hits"] + counters["misses"]),
+                    3,
+                ),
+            }
+            for prefix, counters in sorted(self.stats.items())
+        }
+
+
 class RedisService:
     """Redis connection and caching service."""
 
+    INVALIDATION_CHANNEL = "cache:invalidate"
+    # Keys whose value never changes once written (e.g. generation-keyed)
+    IMMUTABLE_PREFIXES = tuple(
+        prefix
+        for prefix in os.getenv(
+            "REDIS_IMMUTABLE_PREFIXES", "memory:search:,llm:cache:"
+        ).split(",")
+        if prefix
+    )
+
     def __init__(self):
         """Initialize Redis connection."""
         self.redis: Optional[aioredis.Redis] = None  # type: ignore[type-arg]
+        self.binary: Optional[aioredis.Redis] = None  # type: ignore[type-arg]
         self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+        # Local tier, off unless REDIS_LOCAL_CACHE_SIZE > 0 (values may lag
+        # other replicas' writes until invalidated or REDIS_LOCAL_CACHE_TTL)
+        local_size = int(os.getenv("REDIS_LOCAL_CACHE_SIZE", "0"))
+        local_ttl = float(os.getenv("REDIS_LOCAL_CACHE_TTL", "30"))
+        self.local: Optional[LocalCache] = (
+            LocalCache(local_size, local_ttl) if local_size > 0 else None
+        )
+        self.instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+
     async def connect(self) -> None:
         """Connect to Redis."""
         try:
             self.redis = await aioredis.from_url(self.redis_url, decode_responses=True)
             # Test connection
             await self.redis.ping()
+            self.binary = aioredis.from_url(self.redis_url)
             print(f"✅ Connected to Redis at {self.redis_url}")
         except Exception as e:
             print(f"⚠️  Redis connection failed: {e}")
             print("   Bot will work without Redis cache")
             self.redis = None
+            self.binary = None
+            return
+
+        if self.local is not None:
+            self._listener = asyncio.create_task(self._listen_invalidations())
 
     async def disconnect(self) -> None:
         """Disconnect from Redis."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self.local is not None:
+            self.local.clear()
+        if self.binary:
+            await self.binary.close()
         if self.redis:
             await self.redis.close()
 
+    async def _listen_invalidations(self) -> None:
+        """Drop local keys invalidated by other processes."""
+        assert self.redis is not None
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    self.handle_invalidation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Without invalidations the local tier could serve stale data
+            print(f"⚠️  Redis invalidation listener failed: {e}")
+            print("   Local cache tier disabled")
+            self.local = None
+        finally:
+            await pubsub.aclose()
+
+    def handle_invalidation(self, data: str) -> None:
+        """
+        Apply an invalidation message ("<instance_id>:<key>").
+
+        Messages published by this process are ignored (already applied).
+        """
+        sender, _, key = data.partition(":")
+        if self.local is not None and sender != self.instance_id:
+            self.local.delete(key)
+
+    def is_immutable(self, key: str) -> bool:
+        """Whether a key's value never changes (writes need no invalidation)."""
+        return key.startswith(self.IMMUTABLE_PREFIXES)
+
+    async def _invalidate(self, key: str) -> None:
+        """Drop a key from the local tier here and in every other process."""
+        if self.local is None or not self.redis:
+            return
+        self.local.delete(key)
+        if self.is_immutable(key):
+            # Other processes' copies can only expire, never go stale
+            return
+        try:
+            await self.redis.publish(
+                self.INVALIDATION_CHANNEL, f"{self.instance_id}:{key}"
+            )
+        except Exception as e:
+            print(f"Redis PUBLISH error: {e}")
+
+    def get_cache_stats(self) -> Optional[dict[str, Any]]:
+        """
+        Get local tier metrics.
+
+        Returns:
+            Size, limits and per-prefix hit/miss counters, or None if disabled
+        """
+        if self.local is None:
+            return None
+        return {
+            "entries": len(self.local),
+            "max_entries": self.local.max_entries,
+            "ttl_seconds": self.local.ttl,
+            "prefixes": self.local.get_stats(),
+        }
+
     async def get(self, key: str) -> Optional[Any]:
         """Get value from Redis."""
         if not self.redis:
@@ -48,6 +276,8 @@ class RedisService:
             return False
         try:
             await self.redis.set(key, value, ex=expire)
+            if not self.is_immutable(key):
+                await self._invalidate(key)
             return True
         except Exception as e:
             print(f"Redis SET error: {e}")
@@ -63,21 +293,109 @@ class RedisService:
             return False
         try:
             await self.redis.delete(key)
+            await self._invalidate(key)
             return True
         except Exception as e:
             print(f"Redis DELETE error: {e}")
             return False
 
+    async def incr(self, key: str) -> Optional[int]:
+        """Atomically increment an integer counter, returning the new value."""
+        if not self.redis:
+            return None
+        try:
+            return int(await self.redis.incr(key))
+        except Exception as e:
+            print(f"Redis INCR error: {e}")
+            return None
+
     async def get_json(self, key: str) -> Optional[Any]:
-        """Get JSON value from Redis."""
-        value = await self.get(key)
+        """Get JSON value, from the local tier when possible."""
+        return await self._get_cached(key, self.redis, json.loads)
+
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """Get binary value, from the local tier when possible."""
+        return await self._get_cached(key, self.binary, bytes)
+
+    async def _get_cached(self, key: str, client: Any, parse: Any) -> Optional[Any]:
+        """
+        Read through the local tier.
+
+        Args:
+            key: Redis key
+            client: Client to GET from on a local miss
+            parse: Converts the raw reply into the cached value
+
+        Returns:
+            Parsed value or None if missing or unparsable
+        """
+        if not client:
+            return None
+        local = self.local
+        if local is not None:
+            found, cached = local.get(key)
+            if found:
+                return cached
+            epoch = local.epoch
+
+        try:
+            if local is None:
+                value = await client.get(key)
+            else:
+                # Remaining TTL in the same round-trip (ms; -1 none, -2 missing)
+                pipe = client.pipeline(transaction=False)
+                pipe.get(key)
+                pipe.pttl(key)
+                value, pttl = await pipe.execute()
+        except Exception as e:
+            print(f"Redis GET error: {e}")
+            return None
         if value:
             try:
-                return json.loads(value)
-            except json.JSONDecodeError:
+                parsed = parse(value)
+            except ValueError:
                 return None
+            # Skip if the key may have been invalidated during the GET
+            if local is not None and local.epoch == epoch:
+                local.set(key, parsed, ttl=pttl / 1000 if pttl >= 0 else None)
+            return parsed
         return None
 
+    async def get_range(self, key: str, start: int, end: int) -> Optional[bytes]:
+        """
+        Get bytes start..end (inclusive) of a binary value (GETRANGE).
+
+        Returns:
+            The slice (empty if the key is missing) or None if unavailable
+        """
+        if not self.binary:
+            return None
+        if self.local is not None:
+            # Partial reads don't count towards the key family's hit ratio
+            found, cached = self.local.peek(key)
+            if found:
+                return cached[start : end + 1]
+        try:
+            return await self.binary.getrange(key, start, end)
+        except Exception as e:
+            print(f"Redis GETRANGE error: {e}")
+            return None
+
+    async def set_bytes(
+        self, key: str, value: bytes, expire: Optional[int] = None
+    ) -> bool:
+        """Set binary value in Redis with optional expiration."""
+        if not self.binary:
+            return False
+        try:
+            await self.binary.set(key, value, ex=expire)
+            if not self.is_immutable(key):
+                await self._invalidate(key)
+            return True
+        except Exception as e:
+            print(f"Redis SET error: {e}")
+            return False
+
     async def set_json(
         self, key: str, value: Any, expire: Optional[int] = None
     ) -> bool:
@@ -0,0 +1,235 @@
+"""Deadlines, retries and hedging for LLM API requests.
+
+Every LLMService request goes through request_executor.run():
+
+- Deadline: each method has a total time budget (LLM_DEADLINE, overridden
+  per method with LLM_DEADLINES="get_response=25,enrich_memory=15"); every
+  attempt gets the time left as its timeout
+- Retries: timeouts, connection errors, rate limits and 5xx responses are
+  retried up to LLM_RETRIES times with full-jitter exponential backoff
+  (LLM_BACKOFF_BASE, capped at LLM_BACKOFF_MAX), as long as the deadline
+  allows. The SDK's own retries are off (OPENAI_MAX_RETRIES=0) so they
+  don't multiply
+- Hedging (methods in LLM_HEDGE_METHODS): if a request is still running
+  after the method's p95 latency (at least LLM_HEDGE_MIN_DELAY, once
+  LLM_HEDGE_MIN_SAMPLES were seen), a second identical request is sent and
+  the first to succeed wins. Only for non-streaming calls
+
+Latency per method is recorded in latency_metrics as "llm.request.<method>";
+get_stats() reports p50/p95/p99 next to retry, hedge and deadline counts.
+"""
+
+import asyncio
+import logging
+import os
+import random
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import openai
+
+from services.metrics import latency_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+    asyncio.TimeoutError,
+)
+
+METRIC_PREFIX = "llm.request."
+
+
+def _parse_deadlines(value: str) -> dict[str, float]:
+    """Parse "method=seconds,..." into a dict (invalid entries ignored)."""
+    deadlines = {}
+    for item in value.split(","):
+        method, _, seconds = item.partition("=")
+        try:
+            deadlines[method.strip()] = float(seconds)
+        except ValueError:
+            continue
+    return deadlines
+
+
+class RequestExecutor:
+    """Run LLM requests within a deadline, with retries and hedging."""
+
+    DEADLINE = float(os.getenv("LLM_DEADLINE", "30"))
+    RETRIES = int(os.getenv("LLM_RETRIES", "2"))
+    BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+    BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "4"))
+    HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))
+    HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+    def __init__(
+        self,
+        deadlines: Optional[dict[str, float]] = None,
+        hedge_methods: Optional[list[str]] = None,
+    ):
+        """
+        Initialize executor.
+
+        Args:
+            deadlines: Seconds per method (default: LLM_DEADLINES)
+            hedge_methods: Methods that may be hedged (default:
+                LLM_HEDGE_METHODS, comma-separated)
+        """
+        if deadlines is None:
+            deadlines = _parse_deadlines(os.getenv("LLM_DEADLINES", ""))
+        if hedge_methods is None:
+            configured = os.getenv("LLM_HEDGE_METHODS", "")
+            hedge_methods = [m.strip() for m in configured.split(",") if m.strip()]
+        self.deadlines = deadlines
+        self.hedge_methods = frozenset(hedge_methods)
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def deadline_for(self, method: str) -> float:
+        """Total seconds a method's request may take, retries included."""
+        return self.deadlines.get(method, self.DEADLINE)
+
+    def hedge_delay(self, method: str) -> Optional[float]:
+        """Seconds before a hedged request is sent (None: don't hedge)."""
+        name = METRIC_PREFIX + method
+        if method not in self.hedge_methods:
+            return None
+        if latency_metrics.window_size(name) < self.HEDGE_MIN_SAMPLES:
+            return None
+        return max(latency_metrics.percentile(name, 0.95), self.HEDGE_MIN_DELAY)
+
+    async def run(
+        self,
+        method: str,
+        call: Callable[[float], Awaitable[T]],
+        deadline: Optional[float] = None,
+        hedge: bool = True,
+    ) -> T:
+        """
+        Run a request with the method's deadline, retries and hedging.
+
+        Args:
+            method: LLMService method name (policy and statistics)
+            call: Makes one attempt; receives its timeout in seconds
+            deadline: Seconds for this request (default: deadline_for())
+            hedge: Allow hedging (False for streams)
+
+        Returns:
+            The first successful attempt's result
+
+        Raises:
+            asyncio.TimeoutError: If the deadline passed
+            Exception: The last error if it isn't retryable or retries ran out
+        """
+        stats = self._stats.setdefault(
+            method,
+            {
+                "requests": 0,
+                "retries": 0,
+                "hedged": 0,
+                "hedge_wins": 0,
+                "deadline_exceeded": 0,
+                "errors": 0,
+            },
+        )
+        stats["requests"] += 1
+        loop = asyncio.get_running_loop()
+        budget = deadline if deadline is not None else self.deadline_for(method)
+        end = loop.time() + budget
+
+        attempt = 0
+        while True:
+            started = loop.time()
+            remaining = end - started
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                result = await asyncio.wait_for(
+                    self._attempt(method, call, remaining, hedge, stats), remaining
+                )
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                delay = random.uniform(
+                    0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2**attempt)
+                )
+                if attempt > self.RETRIES or loop.time() + delay >= end:
+                    if loop.time() >= end:
+                        stats["deadline_exceeded"] += 1
+                    stats["errors"] += 1
+                    raise
+                stats["retries"] += 1
+                logger.warning(
+                    f"LLM {method} attempt {attempt} failed ({type(e).__name__}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                stats["errors"] += 1
+                raise
+
+            latency_metrics.observe(METRIC_PREFIX + method, loop.time() - started)
+            return result
+
+    async def _attempt(
+        self,
+        method: str,
+        call: Callable[[float], Awaitable[T]],
+        timeout: float,
+        hedge: bool,
+        stats: dict[str, int],
+    ) -> T:
+        """One attempt, hedged with a second request when it runs long."""
+        delay = self.hedge_delay(method) if hedge else None
+        if delay is None or delay >= timeout:
+            return await call(timeout)
+
+        primary = asyncio.ensure_future(call(timeout))
+        backup = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            stats["hedged"] += 1
+            backup = asyncio.ensure_future(call(timeout - delay))
+            pending = {primary, backup}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            stats["hedge_wins"] += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Per-method request statistics.
+
+        Returns:
+            {method: {requests, retries, hedged, hedge_wins, deadline_exceeded,
+            errors, deadline_s, p50_ms, p95_ms, p99_ms}}
+        """
+        result = {}
+        for method, stats in sorted(self._stats.items()):
+            entry: dict[str, Any] = {**stats, "deadline_s": self.deadline_for(method)}
+            for label, q in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+                value = latency_metrics.percentile(METRIC_PREFIX + method, q)
+                entry[label] = round(value * 1000, 1) if value is not None else None
+            result[method] = entry
+        return result
+
+
+# Global LLM request executor
+request_executor = RequestExecutor()
@@ -0,0 +1,111 @@
+"""Request coalescing (single-flight) for identical in-flight calls.
+
+When a burst issues the same LLM request several times at once (a /nudge
+fan-out, a retried Telegram update, many /joke calls), only the first one
+calls OpenAI; the others await its result. Nothing is cached: once the call
+finishes, the next identical request runs again (see llm_cache for that).
+
+The shared call runs as its own task, so a cancelled caller doesn't cancel
+it for the others. Every caller gets the same result object; callers must
+not mutate it.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def _normalize(value: Any) -> Any:
+    """Canonical form of request parameters (stripped text, no None)."""
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent identical requests."""
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    @staticmethod
+    def key(params: dict[str, Any]) -> str:
+        """
+        Key of a normalized request.
+
+        Args:
+            params: Request parameters (model, messages, temperature, ...)
+
+        Returns:
+            SHA-256 hex digest
+        """
+        payload = json.dumps(
+            _normalize(params), sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def do(self, name: str, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run call, or join the identical call already in flight.
+
+        Args:
+            name: Call site name (for statistics)
+            key: Request key from key()
+            call: Coroutine function making the request
+
+        Returns:
+            The call's result (shared by all coalesced callers)
+        """
+        stats = self._stats.setdefault(name, {"calls": 0, "coalesced": 0})
+        stats["calls"] += 1
+
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            stats["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def in_flight(self) -> int:
+        """Number of calls currently running."""
+        return len(self._inflight)
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Per call site statistics.
+
+        Returns:
+            {name: {calls, coalesced, coalesced_ratio}}
+        """
+        return {
+            name: {
+                **stats,
+                "coalesced_ratio": round(stats["coalesced"] / stats["calls"], 3)
+                if stats["calls"]
+                else 0.0,
+            }
+            for name, stats in sorted(self._stats.items())
+        }
+
+    def reset(self) -> None:
+        """Drop statistics."""
+        self._stats.clear()
+
+
+# Global single-flight group for LLM requests
+single_flight = SingleFlight()
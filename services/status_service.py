@@ -111,6 +111,7 @@ class StatusService:
                     "connected": True,
                     "status": "healthy",
                     "message": "Redis connected",
+                    "local_cache": redis_service.get_cache_stats(),
                 }
             else:
                 return {
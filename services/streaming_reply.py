@@ -0,0 +1,146 @@
+"""Progressive Telegram reply for streamed LLM answers.
+
+The first chunk is sent as a reply right away, then the message is edited
+as more text arrives, at most once per STREAM_EDIT_INTERVAL seconds
+(STREAM_EDIT_INTERVAL_GROUP in groups, where Telegram allows ~20 edits per
+minute). Previews are plain text with HTML tags stripped, since a partial
+answer may contain unclosed tags; finish() applies the HTML formatting.
+
+Time from message receipt to the first visible text is recorded as
+"reply.first_visible_token" in latency_metrics.
+"""
+
+import asyncio
+import html
+import os
+import re
+import time
+from typing import Any, Optional
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+from services.metrics import latency_metrics
+
+# Telegram message length limit
+MAX_MESSAGE_LENGTH = 4096
+
+_TAG_RE = re.compile(r"<[^>]*>?")
+
+
+def preview_text(text: str) -> str:
+    """Plain-text view of partial HTML (tags removed, entities decoded)."""
+    return html.unescape(_TAG_RE.sub("", text))[:MAX_MESSAGE_LENGTH]
+
+
+class StreamingReply:
+    """Reply to a message with text that grows while it is streamed."""
+
+    EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "1.0"))
+    EDIT_INTERVAL_GROUP = float(os.getenv("STREAM_EDIT_INTERVAL_GROUP", "3.0"))
+
+    def __init__(self, message: Any, started_at: Optional[float] = None):
+        """
+        Initialize reply.
+
+        Args:
+            message: Incoming aiogram Message to reply to
+            started_at: time.perf_counter() when the message was received
+                (default: now)
+        """
+        self.message = message
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.interval = (
+            self.EDIT_INTERVAL
+            if getattr(message.chat, "type", "private") == "private"
+            else self.EDIT_INTERVAL_GROUP
+        )
+        self.text = ""
+        self.sent: Any = None
+        self._shown = ""
+        self._next_edit = 0.0
+
+    async def feed(self, chunk: str, replace: bool = False) -> None:
+        """
+        Add streamed text, sending or editing the reply when due.
+
+        Args:
+            chunk: Next piece of the answer
+            replace: Replace the text so far instead of appending (discarded
+                or failed partial answers)
+        """
+        self.text = chunk if replace else self.text + chunk
+        preview = preview_text(self.text).strip()
+        if not preview:
+            return
+
+        now = time.perf_counter()
+        if self.sent is None:
+            self.sent = await self.message.reply(preview, parse_mode=None)
+            latency_metrics.observe(
+                "reply.first_visible_token", time.perf_counter() - self.started_at
+            )
+            self._shown = preview
+            self._next_edit = now + self.interval
+        elif now >= self._next_edit and preview != self._shown:
+            self._next_edit = now + self.interval
+            await self._edit(preview, parse_mode=None)
+            self._shown = preview
+
+    async def finish(
+        self, fallback: str = "Nya~ I couldn't generate a response! 💕"
+    ) -> str:
+        """
+        Show the complete answer with HTML formatting.
+
+        Args:
+            fallback: Text to send if nothing was streamed
+
+        Returns:
+            The complete answer text
+        """
+        text = self.text.strip() or fallback
+        parts = [
+            text[i : i + MAX_MESSAGE_LENGTH]
+            for i in range(0, len(text), MAX_MESSAGE_LENGTH)
+        ]
+
+        if self.sent is None:
+            self.sent = await self._send(parts[0])
+            latency_metrics.observe(
+                "reply.first_visible_token", time.perf_counter() - self.started_at
+            )
+        else:
+            await self._edit(parts[0], parse_mode="HTML")
+        for part in parts[1:]:
+            await self._send(part)
+
+        latency_metrics.observe("reply.complete", time.perf_counter() - self.started_at)
+        return text
+
+    async def _send(self, text: str) -> Any:
+        """Reply with HTML, falling back to plain text on parse errors."""
+        try:
+            return await self.message.reply(text, parse_mode="HTML")
+        except TelegramBadRequest as e:
+            if "can't parse entities" not in str(e).lower():
+                raise
+            return await self.message.reply(text, parse_mode=None)
+
+    async def _edit(self, text: str, parse_mode: Optional[str]) -> None:
+        """Edit the reply; tolerate no-op edits, rate limits and bad HTML."""
+        try:
+            await self.sent.edit_text(text, parse_mode=parse_mode)
+        except TelegramRetryAfter as e:
+            # Flood control: skip previews until allowed, wait for the final
+            self._next_edit = time.perf_counter() + e.retry_after
+            if parse_mode is not None:
+                await asyncio.sleep(e.retry_after)
+                await self._edit(text, parse_mode)
+        except TelegramBadRequest as e:
+            error = str(e).lower()
+            if "message is not modified" in error:
+                return
+            if parse_mode is not None and "can't parse entities" in error:
+                await self.sent.edit_text(text, parse_mode=None)
+                return
+            raise
@@ -0,0 +1,354 @@
+"""Telegram ID to internal user ID resolution.
+
+Storing a message needs users.id for the sender. MessageService used to run
+SELECT users.id WHERE telegram_id = ? for every message and create missing
+users with a select-then-insert that raced under concurrency (two handlers
+could both miss and the second INSERT failed on the unique telegram_id).
+
+UserResolver keeps the mapping in a bounded in-process LRU (USER_CACHE_SIZE
+entries) with Redis as a shared second tier (USER_CACHE_TTL seconds), so a
+known sender costs no query. Missing users are created with
+INSERT ... ON CONFLICT (telegram_id) DO NOTHING RETURNING id (PostgreSQL
+and SQLite); a row that lost the race is read back instead. Only committed
+rows are cached: IDs read from the database, or ones passed to remember()
+after the creating transaction committed.
+
+username/first_name/last_name from incoming updates are recorded with
+record_profile() (no I/O, unchanged profiles skipped) and written as one
+batched UPDATE every USER_PROFILE_FLUSH_INTERVAL seconds and on shutdown;
+profiles of users not created yet stay pending until their row exists.
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.user import User
+from services.redis_service import LocalCache, redis_service
+
+_users = User.__table__
+
+Profile = tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def _upsert(dialect: str) -> Any:
+    """INSERT users ... ON CONFLICT (telegram_id) DO NOTHING, if supported."""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(User).on_conflict_do_nothing(index_elements=["telegram_id"])
+
+
+class UserResolver:
+    """Cached telegram_id -> users.id mapping with race-free user creation."""
+
+    CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "86400"))
+    PROFILE_FLUSH_INTERVAL = float(os.getenv("USER_PROFILE_FLUSH_INTERVAL", "30"))
+
+    REDIS_PREFIX = "user:tg:"
+
+    # username = :username, first_name = :first_name, last_name = :last_name
+    _UPDATE_PROFILE = (
+        update(_users)
+        .where(_users.c.telegram_id == bindparam("tid"))
+        .values(
+            username=bindparam("username"),
+            first_name=bindparam("first_name"),
+            last_name=bindparam("last_name"),
+            updated_at=bindparam("now"),
+        )
+    )
+
+    def __init__(self):
+        """Initialize empty resolver."""
+        # "user:<telegram_id>" -> users.id, "profile:<telegram_id>" -> Profile
+        self.local = LocalCache(self.CACHE_SIZE, self.CACHE_TTL)
+        self._profiles: dict[int, Profile] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"redis_hits": 0, "db_lookups": 0, "created": 0, "conflicts": 0}
+
+    async def resolve(self, session: AsyncSession, telegram_id: int) -> int:
+        """
+        Get the internal user ID, creating the user if needed.
+
+        Args:
+            session: Session for lookups and inserts (caller commits)
+            telegram_id: Telegram user ID
+
+        Returns:
+            users.id
+        """
+        return (await self.resolve_many(session, [telegram_id]))[telegram_id]
+
+    async def resolve_many(
+        self, session: AsyncSession, telegram_ids: Iterable[int]
+    ) -> dict[int, int]:
+        """
+        Get internal user IDs for several Telegram IDs at once.
+
+        Cache misses are looked up in Redis, then with one SELECT; users
+        still missing are created in the caller's transaction. Their IDs are
+        not cached until remember() is called after the commit.
+
+        Args:
+            session: Session for lookups and inserts (caller commits)
+            telegram_ids: Telegram user IDs
+
+        Returns:
+            {telegram_id: users.id}
+        """
+        resolved: dict[int, int] = {}
+        unknown = []
+        for tid in set(telegram_ids):
+            found, user_id = self.local.get(f"user:{tid}")
+            if found:
+                resolved[tid] = user_id
+            else:
+                unknown.append(tid)
+
+        if unknown:
+            cached = await asyncio.gather(
+                *(redis_service.get(self.REDIS_PREFIX + str(tid)) for tid in unknown)
+            )
+            from_redis = {
+                tid: int(value)
+                for tid, value in zip(unknown, cached)
+                if value is not None
+            }
+            self._stats["redis_hits"] += len(from_redis)
+            for tid, user_id in from_redis.items():
+                self.local.set(f"user:{tid}", user_id)
+            resolved.update(from_redis)
+            unknown = [tid for tid in unknown if tid not in from_redis]
+
+        if unknown:
+            found = await self._select(session, unknown)
+            await self.remember(found)
+            resolved.update(found)
+            missing = [tid for tid in unknown if tid not in found]
+            if missing:
+                resolved.update(await self._create(session, missing))
+
+        return resolved
+
+    async def _select(
+        self, session: AsyncSession, telegram_ids: list[int]
+    ) -> dict[int, int]:
+        """Look up existing users with one query."""
+        self._stats["db_lookups"] += 1
+        result = await session.execute(
+            select(User.telegram_id, User.id).where(User.telegram_id.in_(telegram_ids))
+        )
+        return {tid: user_id for tid, user_id in result.all()}
+
+    async def _create(
+        self, session: AsyncSession, telegram_ids: list[int]
+    ) -> dict[int, int]:
+        """Insert missing users, reading back rows created concurrently."""
+        now = datetime.utcnow()
+        rows = []
+        for tid in telegram_ids:
+            username, first_name, last_name = self._profiles.get(
+                tid, (None, None, None)
+            )
+            rows.append(
+                {
+                    "telegram_id": tid,
+                    "username": username,
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "is_friend": False,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+
+        stmt = _upsert(session.get_bind().dialect.name)
+        if stmt is not None:
+            result = await session.execute(
+                stmt.values(rows).returning(User.telegram_id, User.id)
+            )
+            created = {tid: user_id for tid, user_id in result.all()}
+        else:
+            # No ON CONFLICT: plain insert, a lost race rolls back the savepoint
+            created = {}
+            try:
+                async with session.begin_nested():
+                    await session.execute(insert(User), rows)
+            except IntegrityError:
+                pass
+
+        self._stats["created"] += len(created)
+        lost = [tid for tid in telegram_ids if tid not in created]
+        if lost:
+            if stmt is not None:
+                self._stats["conflicts"] += len(lost)
+            created.update(await self._select(session, lost))
+        return created
+
+    async def remember(self, user_ids: dict[int, int]) -> None:
+        """
+        Cache committed telegram_id -> users.id mappings.
+
+        Args:
+            user_ids: {telegram_id: users.id} of committed user rows
+        """
+        new = {
+            tid: user_id
+            for tid, user_id in user_ids.items()
+            if f"user:{tid}" not in self.local
+        }
+        for tid, user_id in new.items():
+            self.local.set(f"user:{tid}", user_id)
+        await asyncio.gather(
+            *(
+                redis_service.setex(self.REDIS_PREFIX + str(tid), self.CACHE_TTL, uid)
+                for tid, uid in new.items()
+            )
+        )
+
+    def record_profile(
+        self,
+        telegram_id: int,
+        username: Optional[str],
+        first_name: Optional[str],
+        last_name: Optional[str] = None,
+    ) -> None:
+        """
+        Note a user's current names from an incoming update (no I/O).
+
+        Args:
+            telegram_id: Telegram user ID
+            username: Telegram username
+            first_name: First name
+            last_name: Last name (optional)
+        """
+        profile = (username, first_name, last_name)
+        found, known = self.local.get(f"profile:{telegram_id}")
+        if found and known == profile:
+            return
+        self._profiles[telegram_id] = profile
+
+    async def _write_profiles(
+        self, session: AsyncSession, batch: dict[int, Profile]
+    ) -> list[int]:
+        """Update the users that exist and commit; return their Telegram IDs."""
+        result = await session.execute(
+            select(User.telegram_id).where(User.telegram_id.in_(list(batch)))
+        )
+        existing = list(result.scalars())
+        if existing:
+            now = datetime.utcnow()
+            await session.execute(
+                self._UPDATE_PROFILE,
+                [
+                    {
+                        "tid": tid,
+                        "username": batch[tid][0],
+                        "first_name": batch[tid][1],
+                        "last_name": batch[tid][2],
+                        "now": now,
+                    }
+                    for tid in existing
+                ],
+            )
+            await session.commit()
+        return existing
+
+    async def flush_profiles(self, session: Optional[AsyncSession] = None) -> int:
+        """
+        Write recorded profile changes in one batched UPDATE.
+
+        Profiles of users whose row does not exist yet (the message that
+        creates it is still buffered) stay pending for the next flush. A
+        profile only counts as known once it has been written.
+
+        Args:
+            session: Session to use (default: a new AsyncSessionLocal session)
+
+        Returns:
+            Number of profiles written
+        """
+        async with self._lock:
+            if not self._profiles:
+                return 0
+            batch, self._profiles = self._profiles, {}
+
+            try:
+                if session is not None:
+                    written = await self._write_profiles(session, batch)
+                else:
+                    from database import AsyncSessionLocal
+
+                    async with AsyncSessionLocal() as own_session:
+                        written = await self._write_profiles(own_session, batch)
+            except asyncio.CancelledError:
+                self._profiles = {**batch, **self._profiles}
+                raise
+            except Exception as e:
+                print(f"⚠️  User profile flush failed: {e}")
+                self._profiles = {**batch, **self._profiles}
+                return 0
+
+            for tid in written:
+                self.local.set(f"profile:{tid}", batch.pop(tid))
+            # Not created yet: retry next time unless a newer profile arrived
+            self._profiles = {**batch, **self._profiles}
+            return len(written)
+
+    def clear(self) -> None:
+        """Drop cached mappings and pending profiles (e.g. between tests)."""
+        self.local.clear()
+        self._profiles.clear()
+
+    async def start(self) -> None:
+        """Start the periodic profile flush loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush loop and flush what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush_profiles()
+
+    async def _run(self) -> None:
+        """Flush profiles every PROFILE_FLUSH_INTERVAL seconds."""
+        while True:
+            await asyncio.sleep(self.PROFILE_FLUSH_INTERVAL)
+            await self.flush_profiles()
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Resolver statistics.
+
+        Returns:
+            Cached entries, local hit ratio, pending profiles and counts of
+            Redis hits, database lookups, created users and insert conflicts
+        """
+        local = self.local.get_stats().get("user", {})
+        return {
+            "cached": len(self.local),
+            "local_hit_ratio": local.get("hit_ratio"),
+            "pending_profiles": len(self._profiles),
+            **self._stats,
+        }
+
+
+# Global user resolver
+user_resolver = UserResolver()
@@ -0,0 +1,219 @@
+"""In-process NumPy vector index for memory embeddings (SQLite deployments).
+
+SQLite has no vector type, so embeddings are stored as float32 BLOBs and
+each user's vectors are loaded lazily into a contiguous matrix. Cosine top-k
+is then one matrix-vector product plus argpartition, which takes a few
+milliseconds even for 100k memories. PostgreSQL uses pgvector instead.
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.memory import Memory, MemoryEmbedding
+
+
+class UserVectorIndex:
+    """Dense matrix of one user's normalized memory vectors."""
+
+    INITIAL_CAPACITY = 256
+
+    def __init__(self, dim: int):
+        """
+        Initialize empty index.
+
+        Args:
+            dim: Vector dimension
+        """
+        self.dim = dim
+        self.size = 0
+        self._ids = np.zeros(self.INITIAL_CAPACITY, dtype=np.int64)
+        self._matrix = np.zeros((self.INITIAL_CAPACITY, dim), dtype=np.float32)
+        self._positions: dict[int, int] = {}
+
+    @classmethod
+    def from_arrays(cls, ids: np.ndarray, matrix: np.ndarray) -> "UserVectorIndex":
+        """Build index from preloaded id and vector arrays."""
+        index = cls(matrix.shape[1])
+        capacity = max(cls.INITIAL_CAPACITY, len(ids))
+        index._ids = np.zeros(capacity, dtype=np.int64)
+        index._matrix = np.zeros((capacity, index.dim), dtype=np.float32)
+        index._ids[: len(ids)] = ids
+        index._matrix[: len(ids)] = matrix
+        index.size = len(ids)
+        index._positions = {int(mid): pos for pos, mid in enumerate(ids)}
+        return index
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, memory_id: int) -> bool:
+        return memory_id in self._positions
+
+    def upsert(self, memory_id: int, vector: np.ndarray) -> None:
+        """Insert or replace a memory vector (amortized O(dim))."""
+        pos = self._positions.get(memory_id)
+        if pos is None:
+            if self.size == len(self._ids):
+                self._grow()
+            pos = self.size
+            self.size += 1
+            self._ids[pos] = memory_id
+            self._positions[memory_id] = pos
+        self._matrix[pos] = vector
+
+    def remove(self, memory_id: int) -> None:
+        """Remove a memory vector by swapping the last row into its slot."""
+        pos = self._positions.pop(memory_id, None)
+        if pos is None:
+            return
+        last = self.size - 1
+        if pos != last:
+            moved_id = int(self._ids[last])
+            self._ids[pos] = moved_id
+            self._matrix[pos] = self._matrix[last]
+            self._positions[moved_id] = pos
+        self.size = last
+
+    def top_k(
+        self, query: np.ndarray, k: int, min_score: float = -1.0
+    ) -> list[tuple[int, float]]:
+        """
+        Find the k most similar memories by cosine similarity.
+
+        Args:
+            query: L2-normalized query vector
+            k: Number of results
+            min_score: Drop results below this similarity
+
+        Returns:
+            List of (memory_id, score) sorted by score descending
+        """
+        if self.size == 0 or k <= 0:
+            return []
+
+        scores = self._matrix[: self.size] @ np.asarray(query, dtype=np.float32)
+        if k < self.size:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(self.size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [
+            (int(self._ids[i]), float(scores[i])) for i in top if scores[i] >= min_score
+        ]
+
+    def _grow(self) -> None:
+        """Double capacity."""
+        capacity = len(self._ids) * 2
+        ids = np.zeros(capacity, dtype=np.int64)
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        ids[: self.size] = self._ids[: self.size]
+        matrix[: self.size] = self._matrix[: self.size]
+        self._ids = ids
+        self._matrix = matrix
+
+
+class VectorIndexRegistry:
+    """Process-wide LRU of per-user vector indexes, loaded lazily."""
+
+    def __init__(self, max_users: int = 64):
+        """
+        Initialize registry.
+
+        Args:
+            max_users: Maximum number of user indexes kept in memory
+        """
+        self.max_users = max_users
+        self._indexes: OrderedDict[tuple[int, str], UserVectorIndex] = OrderedDict()
+        self._locks: dict[tuple[int, str], asyncio.Lock] = {}
+
+    async def get(
+        self, session: AsyncSession, user_id: int, model: str, dim: int
+    ) -> UserVectorIndex:
+        """
+        Get a user's index, loading it from the database on first use.
+
+        Args:
+            session: SQLAlchemy async session
+            user_id: Telegram user ID (memory owner)
+            model: Embedder name the vectors were produced with
+            dim: Vector dimension
+
+        Returns:
+            UserVectorIndex for the user
+        """
+        key = (user_id, model)
+        index = self._indexes.get(key)
+        if index is not None:
+            self._indexes.move_to_end(key)
+            return index
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = await self._load(session, user_id, model, dim)
+                self._indexes[key] = index
+                while len(self._indexes) > self.max_users:
+                    evicted, _ = self._indexes.popitem(last=False)
+                    self._locks.pop(evicted, None)
+        return index
+
+    def peek(self, user_id: int, model: str) -> Optional[UserVectorIndex]:
+        """Return a user's index only if it is already loaded."""
+        return self._indexes.get((user_id, model))
+
+    def upsert(
+        self, user_id: int, model: str, memory_id: int, vector: np.ndarray
+    ) -> None:
+        """Apply a committed embedding to the user's index if it is loaded.
+
+        Unloaded indexes pick the vector up from the database on first use.
+        """
+        index = self.peek(user_id, model)
+        if index is not None:
+            index.upsert(memory_id, vector)
+
+    def remove(self, user_id: int, memory_id: int) -> None:
+        """Remove a deleted memory from every loaded index of the user."""
+        for (owner, _), index in self._indexes.items():
+            if owner == user_id:
+                index.remove(memory_id)
+
+    def discard(self, user_id: int) -> None:
+        """Drop all loaded indexes for a user (forces reload on next use)."""
+        for key in [k for k in self._indexes if k[0] == user_id]:
+            del self._indexes[key]
+
+    def clear(self) -> None:
+        """Drop all loaded indexes."""
+        self._indexes.clear()
+        self._locks.clear()
+
+    async def _load(
+        self, session: AsyncSession, user_id: int, model: str, dim: int
+    ) -> UserVectorIndex:
+        """Load a user's vectors with a single query."""
+        result = await session.execute(
+            select(MemoryEmbedding.memory_id, MemoryEmbedding.vector)
+            .join(Memory, Memory.id == MemoryEmbedding.memory_id)
+            .where(Memory.created_by == user_id, MemoryEmbedding.model == model)
+        )
+        rows = result.all()
+        if not rows:
+            return UserVectorIndex(dim)
+
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        matrix = np.frombuffer(b"".join(row[1] for row in rows), dtype="<f4")
+        return UserVectorIndex.from_arrays(
+            ids, matrix.reshape(len(rows), dim).astype(np.float32)
+        )
+
+
+# Global vector index registry
+vector_index_registry = VectorIndexRegistry()
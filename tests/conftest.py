@@ -11,6 +11,9 @@ from sqlalchemy import text
 
 from database import Base
 from models.memory import Category
+from services.category_registry import category_registry
+from services.memory_graph import memory_graph_registry
+from services.user_resolver import user_resolver
 
 
 # Use actual PostgreSQL from environment (same as production)
@@ -127,6 +130,7 @@ async def cleanup_test_data(async_session):
         "memories",
         "users",
         "messages",
+        "message_counters",
         "facts",
         "stats",
         "lessons",
@@ -140,3 +144,8 @@ async def cleanup_test_data(async_session):
             pass
 
     await async_session.commit()
+
+    # In-process link graphs and category indexes mirror the rows above
+    memory_graph_registry.clear()
+    category_registry.invalidate()
+    user_resolver.clear()
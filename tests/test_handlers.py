@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, patch
 from aiogram.types import Message, User, Chat
@@ -83,3 +85,74 @@ async def test_handle_message_kawai_trigger(mock_message):
     await waifu.handle_message(mock_message)
     # Non-admin messages should be ignored
     mock_message.reply.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_handle_message_stores_before_queueing(mock_message):
+    """Test an admin message is stored even if the chat queue rejects it."""
+    mock_message.text = "remember this"
+    mock_message.message_id = 7
+    with (
+        patch.object(waifu, "ADMIN_IDS", [1]),
+        patch.object(waifu.message_writer, "write", AsyncMock()) as write,
+        patch.object(waifu.chat_scheduler, "submit", return_value=False),
+    ):
+        await waifu.handle_message(mock_message)
+
+    write.assert_awaited_once_with(
+        user_id=1,
+        chat_id=1,
+        message_text="remember this",
+        is_bot=False,
+        message_id=7,
+    )
+
+
+@pytest.mark.asyncio
+async def test_answer_messages_stores_reply_durably(mock_message):
+    """Test the reply is committed before the chat's next turn reads history."""
+    mock_message.text = "hi"
+    mock_message.message_id = 7
+    mock_message.bot = AsyncMock()
+    agent = AsyncMock()
+    agent.run.return_value = "hello!"
+    with (
+        patch.object(waifu, "STREAM_REPLIES", False),
+        patch.object(waifu, "get_llm_service"),
+        patch.object(waifu, "AgentLoop", return_value=agent),
+        patch.object(
+            waifu.context_assembler,
+            "assemble",
+            AsyncMock(
+                return_value={"lessons": [], "memories": [], "message_history": []}
+            ),
+        ) as assemble,
+        patch.object(waifu.message_writer, "write", AsyncMock()) as write,
+    ):
+        await waifu.answer_messages([(mock_message, 0.0)])
+
+    assert assemble.await_args.kwargs["exclude_message_ids"] == [7]
+    write.assert_awaited_once_with(
+        user_id=1, chat_id=1, message_text="hello!", is_bot=True, durable=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_answer_messages_cancels_assembly_on_error(mock_message):
+    """Test the context reads don't outlive a failed typing indicator."""
+    mock_message.text = "hi"
+    mock_message.message_id = 7
+    mock_message.bot = AsyncMock()
+    mock_message.bot.send_chat_action.side_effect = RuntimeError("telegram down")
+    reads = asyncio.Event()
+
+    async def assemble(*args, **kwargs):
+        await reads.wait()
+
+    with patch.object(waifu.context_assembler, "assemble", assemble):
+        with pytest.raises(RuntimeError):
+            await waifu.answer_messages([(mock_message, 0.0)])
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        await asyncio.sleep(0)
+
+    assert all(t.done() for t in tasks)
@@ -0,0 +1,106 @@
+"""Unit tests for the write-behind memory access tracker."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from models.memory import Memory
+from services.access_tracker import AccessTracker
+from services.memory_service import MemoryService
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    """Fresh tracker wired into MemoryService."""
+    tracker = AccessTracker()
+    monkeypatch.setattr("services.memory_service.access_tracker", tracker)
+    return tracker
+
+
+async def stored_stats(session, memory_id):
+    """Read access stats straight from the database."""
+    result = await session.execute(
+        select(Memory.access_count, Memory.last_accessed).where(Memory.id == memory_id)
+    )
+    return result.one()
+
+
+def test_record_coalesces_accesses():
+    """Test that repeated reads collapse into one (count, last_ts) entry."""
+    tracker = AccessTracker()
+    early = datetime(2026, 1, 1)
+    late = early + timedelta(minutes=5)
+
+    tracker.record(1, late)
+    tracker.record(1, early)
+    tracker.record(2, early)
+
+    assert tracker.pending(1) == (2, late)
+    assert tracker.pending(2) == (1, early)
+    assert len(tracker) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_memory_is_a_pure_read(async_session, test_categories, tracker):
+    """Test that reads are deferred until the tracker flushes."""
+    service = MemoryService(async_session)
+    memory = await service.create_memory(
+        simple_content="Test memory",
+        full_content="Content",
+        importance=1000,
+        created_by=123456789,
+    )
+
+    for _ in range(3):
+        retrieved = await service.get_memory(memory.id)
+
+    # Returned object reflects the reads, the row is untouched
+    assert retrieved.access_count == 3
+    assert not async_session.dirty
+    assert await stored_stats(async_session, memory.id) == (0, None)
+
+    assert await tracker.flush(async_session) == 1
+    assert len(tracker) == 0
+
+    access_count, last_accessed = await stored_stats(async_session, memory.id)
+    assert access_count == 3
+    assert last_accessed == retrieved.last_accessed
+
+
+@pytest.mark.asyncio
+async def test_flush_keeps_newer_last_accessed(async_session, test_categories):
+    """Test that a stale batch never moves last_accessed backwards."""
+    tracker = AccessTracker()
+    service = MemoryService(async_session)
+    memory = await service.create_memory(
+        simple_content="Test memory",
+        full_content="Content",
+        importance=1000,
+        created_by=123456789,
+    )
+    now = datetime(2026, 1, 1, 12, 0)
+
+    tracker.record(memory.id, now)
+    await tracker.flush(async_session)
+    tracker.record(memory.id, now - timedelta(hours=1))
+    await tracker.flush(async_session)
+
+    assert await stored_stats(async_session, memory.id) == (2, now)
+
+
+@pytest.mark.asyncio
+async def test_flush_failure_keeps_pending():
+    """Test that a failed flush is retried on the next one."""
+
+    class BrokenSession:
+        async def execute(self, *args, **kwargs):
+            raise RuntimeError("database is locked")
+
+    tracker = AccessTracker()
+    ts = datetime(2026, 1, 1)
+    tracker.record(7, ts)
+
+    assert await tracker.flush(BrokenSession()) == 0
+    tracker.record(7, ts)
+    assert tracker.pending(7) == (2, ts)
@@ -0,0 +1,235 @@
+"""Unit tests for the multi-round agent loop."""
+
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services.agent_loop import (
+    ERROR_ANSWER,
+    FALLBACK_ANSWER,
+    AgentLoop,
+    Replacement,
+    apply_chunk,
+)
+
+TOOLS = [{"type": "function", "function": {"name": "search_memories"}}]
+
+
+def _call(call_id, name="search_memories"):
+    return {
+        "id": call_id,
+        "type": "function",
+        "function": {"name": name, "arguments": "{}"},
+    }
+
+
+class FakeLLM:
+    """Scripted stream_completion: one (text, tool_calls, tokens) per round."""
+
+    default_model = "test-model"
+
+    def __init__(self, rounds):
+        self.rounds = list(rounds)
+        self.requests = []
+
+    async def stream_completion(
+        self, request_params, tool_calls=None, usage=None, method=None, deadline=None
+    ):
+        self.requests.append(
+            {
+                **request_params,
+                "messages": list(request_params["messages"]),
+                "deadline": deadline,
+            }
+        )
+        text, calls, tokens = self.rounds.pop(0)
+        if text:
+            yield text
+        tool_calls.extend(calls)
+        usage["total_tokens"] = tokens
+
+
+def _executor(result=None):
+    calls = []
+
+    async def execute(tool_calls, user_id, timeout=None):
+        calls.append((tool_calls, timeout))
+        return [
+            {"tool_call_id": call["id"], "result": result or {"success": True}}
+            for call in tool_calls
+        ]
+
+    return SimpleNamespace(calls=calls, execute=execute)
+
+
+def _messages():
+    return [
+        {"role": "system", "content": "prefix"},
+        {"role": "user", "content": "hi"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_multiple_tool_rounds_reuse_messages():
+    """Test tool rounds are appended to the same message list."""
+    llm = FakeLLM(
+        [("", [_call("a")], 100), ("", [_call("b")], 100), ("Done nya", [], 50)]
+    )
+    tools = _executor()
+    messages = _messages()
+    agent = AgentLoop(llm, 1, tools=TOOLS, execute=tools.execute)
+
+    answer = await agent.run(messages)
+
+    assert answer == "Done nya"
+    assert len(tools.calls) == 2
+    assert agent.stop_reason == "answer"
+    assert agent.tokens_used == 250
+    assert len(agent.rounds) == 3 and "tools_ms" in agent.rounds[0]
+    # The prefix is never rebuilt; later requests extend the first one
+    assert llm.requests[2]["messages"][:2] == _messages()
+    assert [m["role"] for m in messages[2:]] == ["assistant", "tool"] * 2
+    assert "tool_choice" not in llm.requests[2]
+
+
+@pytest.mark.asyncio
+async def test_max_rounds_forces_answer(monkeypatch):
+    """Test the last allowed round disables tools."""
+    monkeypatch.setattr(AgentLoop, "MAX_TOOL_ROUNDS", 1)
+    llm = FakeLLM([("", [_call("a")], 10), ("ok", [], 10)])
+    agent = AgentLoop(llm, 1, tools=TOOLS, execute=_executor().execute)
+
+    assert await agent.run(_messages()) == "ok"
+    assert llm.requests[1]["tool_choice"] == "none"
+    assert agent.stop_reason == "max_rounds"
+
+
+@pytest.mark.asyncio
+async def test_token_budget_forces_answer(monkeypatch):
+    """Test spending the token budget stops further tool rounds."""
+    monkeypatch.setattr(AgentLoop, "TOKEN_BUDGET", 500)
+    llm = FakeLLM([("", [_call("a")], 600), ("ok", [], 10)])
+    agent = AgentLoop(llm, 1, tools=TOOLS, execute=_executor().execute)
+
+    await agent.run(_messages())
+
+    assert llm.requests[1]["tool_choice"] == "none"
+    assert agent.stop_reason == "token_budget"
+
+
+@pytest.mark.asyncio
+async def test_deadline_answers_without_tools(monkeypatch):
+    """Test a turn near its deadline answers with what it has."""
+    monkeypatch.setattr(AgentLoop, "TIME_BUDGET", 10)
+    monkeypatch.setattr(AgentLoop, "ANSWER_RESERVE", 4)
+    llm = FakeLLM([("ok", [], 10)])
+    tools = _executor()
+    agent = AgentLoop(llm, 1, tools=TOOLS, execute=tools.execute)
+
+    # Started 7s ago: 3s left, less than the answer reserve
+    answer = await agent.run(_messages(), started_at=time.perf_counter() - 7)
+
+    assert answer == "ok"
+    assert llm.requests[0]["tool_choice"] == "none"
+    assert llm.requests[0]["deadline"] == 4
+    assert tools.calls == []
+    assert agent.stop_reason == "deadline"
+
+
+@pytest.mark.asyncio
+async def test_tool_timeout_leaves_answer_reserve(monkeypatch):
+    """Test tools get the time left minus the answer reserve."""
+    monkeypatch.setattr(AgentLoop, "TIME_BUDGET", 30)
+    monkeypatch.setattr(AgentLoop, "ANSWER_RESERVE", 8)
+    llm = FakeLLM([("", [_call("a")], 10), ("ok", [], 10)])
+    tools = _executor()
+
+    await AgentLoop(llm, 1, tools=TOOLS, execute=tools.execute).run(_messages())
+
+    assert 21 < tools.calls[0][1] <= 22
+
+
+@pytest.mark.asyncio
+async def test_tool_final_answer_ends_turn():
+    """Test a tool result with final_answer is the reply."""
+    llm = FakeLLM([("", [_call("a")], 10)])
+    tools = _executor({"success": True, "final_answer": "Saved! 💕"})
+    agent = AgentLoop(llm, 1, tools=TOOLS, execute=tools.execute)
+
+    assert await agent.run(_messages()) == "Saved! 💕"
+    assert len(llm.requests) == 1
+    assert agent.stop_reason == "tool_final_answer"
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_text_and_fallback():
+    """Test streamed chunks pass through and an empty answer falls back."""
+    llm = FakeLLM([("Hello", [], 5)])
+    agent = AgentLoop(llm, 1, execute=_executor().execute)
+    assert [chunk async for chunk in agent.stream(_messages())] == ["Hello"]
+    assert "tools" not in llm.requests[0]
+
+    empty = AgentLoop(FakeLLM([("", [], 5)]), 1, execute=_executor().execute)
+    assert await empty.run(_messages()) == FALLBACK_ANSWER
+
+
+@pytest.mark.asyncio
+async def test_tool_results_are_json_messages():
+    """Test tool results are sent back as JSON tool messages."""
+    llm = FakeLLM([("", [_call("a")], 10), ("ok", [], 10)])
+    messages = _messages()
+    agent = AgentLoop(llm, 1, tools=TOOLS, execute=_executor({"n": 1}).execute)
+
+    await agent.run(messages)
+
+    assert messages[3] == {
+        "role": "tool",
+        "tool_call_id": "a",
+        "content": json.dumps({"n": 1}),
+    }
+
+
+@pytest.mark.asyncio
+async def test_pre_tool_text_is_not_part_of_the_answer():
+    """Test text of a round that calls tools is discarded from the reply."""
+    llm = FakeLLM([("Let me check...", [_call("a")], 10), ("Found it!", [], 10)])
+    agent = AgentLoop(llm, 1, tools=TOOLS, execute=_executor().execute)
+    messages = _messages()
+
+    chunks = [chunk async for chunk in agent.stream(messages)]
+
+    assert chunks == ["Let me check...", "", "Found it!"]
+    assert isinstance(chunks[1], Replacement)
+    text = ""
+    for chunk in chunks:
+        text = apply_chunk(text, chunk)
+    assert text == "Found it!"
+    # The model still sees what it said before calling the tool
+    assert messages[2]["content"] == "Let me check..."
+
+    llm = FakeLLM([("Let me check...", [_call("a")], 10), ("Found it!", [], 10)])
+    agent = AgentLoop(llm, 1, tools=TOOLS, execute=_executor().execute)
+    assert await agent.run(_messages()) == "Found it!"
+
+
+@pytest.mark.asyncio
+async def test_error_replaces_partial_answer():
+    """Test a failing round replaces the streamed text with ERROR_ANSWER."""
+
+    class FailingLLM(FakeLLM):
+        async def stream_completion(self, request_params, *args, **kwargs):
+            yield "Half an ans"
+            raise RuntimeError("connection reset")
+
+    agent = AgentLoop(FailingLLM([]), 1, execute=_executor().execute)
+
+    chunks = [chunk async for chunk in agent.stream(_messages())]
+
+    assert isinstance(chunks[-1], Replacement)
+    assert (
+        await AgentLoop(FailingLLM([]), 1, execute=_executor().execute).run(_messages())
+        == ERROR_ANSWER
+    )
+    assert agent.stop_reason == "error"
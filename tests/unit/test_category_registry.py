@@ -0,0 +1,114 @@
+"""Unit tests for the in-memory category registry."""
+
+import pytest
+from sqlalchemy import insert
+
+from models.memory import Category
+from services.category_registry import CategoryRegistry, category_registry
+from services.memory_service import MemoryService
+
+
+@pytest.fixture
+def registry():
+    """Registry with a small two-level tree."""
+    registry = CategoryRegistry()
+    registry._build(
+        [
+            # (id, domain, full_path, parent_id)
+            (1, "social", "social.person", None),
+            (2, "social", "social.person.family", None),
+            (3, "knowledge", "knowledge.project", None),
+            (4, "knowledge", "knowledge.repo", 3),
+            (5, "interest", "interest.project", None),
+        ]
+    )
+    return registry
+
+
+def test_resolve_full_paths_only(registry):
+    """Test exact resolution by full path; bare names and unknowns skipped."""
+    assert registry.resolve(["social.person", "knowledge.project", "nope"]) == [1, 3]
+    assert registry.resolve(["project"]) == []
+    assert registry.resolve(["social"]) == []
+
+
+def test_resolve_with_subtree_and_domain(registry):
+    """Test subtree expansion via dotted paths and parent_id, and domains."""
+    assert registry.resolve(["social.person"], expand=True) == [1, 2]
+    assert registry.resolve(["knowledge.project"], expand=True) == [3, 4]
+    assert registry.resolve(["knowledge"], expand=True) == [3, 4]
+    assert registry.expand([1, 4, 99]) == [1, 2, 4, 99]
+    assert registry.children(3) == [4]
+    assert registry.path(2) == "social.person.family"
+
+
+@pytest.mark.asyncio
+async def test_ensure_loaded_refreshes_after_interval(
+    async_session, test_categories, monkeypatch
+):
+    """Test single-query loading and reload once the copy is stale."""
+    registry = CategoryRegistry()
+    await registry.ensure_loaded(async_session)
+    assert registry.resolve(["social.person"]) == [test_categories[0].id]
+
+    # Written by another process: no ORM event, seen after the interval
+    await async_session.execute(
+        insert(Category).values(
+            name="hobby", domain="interest", full_path="interest.hobby"
+        )
+    )
+    await async_session.commit()
+
+    await registry.ensure_loaded(async_session)  # still fresh
+    assert registry.resolve(["interest.hobby"]) == []
+
+    monkeypatch.setattr(registry, "REFRESH_INTERVAL", 0)
+    await registry.ensure_loaded(async_session)
+    assert len(registry.resolve(["interest.hobby"])) == 1
+
+
+@pytest.mark.asyncio
+async def test_category_commit_invalidates(async_session, test_categories):
+    """Test committing a Category change reloads the global registry."""
+    await category_registry.ensure_loaded(async_session)
+    assert category_registry.loaded
+
+    category = Category(name="hobby", domain="interest", full_path="interest.hobby")
+    async_session.add(category)
+    await async_session.flush()
+    assert category_registry.loaded  # not committed yet
+
+    await async_session.commit()
+    assert not category_registry.loaded
+    await category_registry.ensure_loaded(async_session)
+    assert category_registry.resolve(["interest.hobby"]) == [category.id]
+
+
+@pytest.mark.asyncio
+async def test_search_memories_category_filter(async_session, test_categories):
+    """Test that search_memories filters by category through the association."""
+    service = MemoryService(async_session)
+    user_id = 123456789
+    person, tech, project = test_categories
+    about_person = await service.create_memory(
+        simple_content="Vasilisa likes cats",
+        full_content="Content",
+        importance=1000,
+        created_by=user_id,
+        category_ids=[person.id],
+    )
+    about_project = await service.create_memory(
+        simple_content="dcmaidbot uses aiogram",
+        full_content="Content",
+        importance=900,
+        created_by=user_id,
+        category_ids=[project.id, tech.id],
+    )
+
+    async def ids(category_ids):
+        memories = await service.search_memories(user_id, category_ids=category_ids)
+        return [m.id for m in memories]
+
+    assert await ids([person.id]) == [about_person.id]
+    assert await ids([tech.id]) == [about_project.id]
+    assert await ids([person.id, project.id]) == [about_person.id, about_project.id]
@@ -0,0 +1,171 @@
+"""Unit tests for the per-chat scheduler."""
+
+import asyncio
+
+import pytest
+
+from services.chat_scheduler import ChatScheduler
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    """Scheduler with short debounce windows."""
+    monkeypatch.setattr(ChatScheduler, "DEBOUNCE", 0.05)
+    monkeypatch.setattr(ChatScheduler, "MAX_DEBOUNCE", 0.5)
+    return ChatScheduler()
+
+
+def _recorder(delay=0.0):
+    batches = []
+
+    async def handler(batch):
+        batches.append(list(batch))
+        await asyncio.sleep(delay)
+
+    return batches, handler
+
+
+@pytest.mark.asyncio
+async def test_burst_is_merged_into_one_turn(scheduler):
+    """Test messages within the debounce window form one batch."""
+    batches, handler = _recorder()
+    for text in ("hi", "how are", "you?"):
+        assert scheduler.submit(1, text, handler, merge_key=7)
+        await asyncio.sleep(0.01)
+
+    await scheduler.drain()
+
+    assert batches == [["hi", "how are", "you?"]]
+    stats = scheduler.get_stats()
+    assert stats["turns"] == 1
+    assert stats["merged"] == 2
+    assert stats["active_chats"] == 0
+    assert stats["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_no_debounce_starts_at_once_and_merges_during_turn(monkeypatch):
+    """Test without a debounce only messages queued behind a turn merge."""
+    monkeypatch.setattr(ChatScheduler, "DEBOUNCE", 0.0)
+    scheduler = ChatScheduler()
+    batches, handler = _recorder(delay=0.1)
+    loop = asyncio.get_running_loop()
+
+    started = loop.time()
+    scheduler.submit(1, "a", handler, merge_key=7)
+    await asyncio.sleep(0.01)
+    assert batches == [["a"]]  # no waiting for more
+    assert loop.time() - started < 0.05
+
+    scheduler.submit(1, "b", handler, merge_key=7)
+    scheduler.submit(1, "c", handler, merge_key=7)
+    await scheduler.drain()
+
+    assert batches == [["a"], ["b", "c"]]
+
+
+@pytest.mark.asyncio
+async def test_chat_is_processed_in_order(scheduler):
+    """Test messages arriving during a turn wait for it, in order."""
+    batches, handler = _recorder(delay=0.1)
+    scheduler.submit(1, "a", handler)
+    await asyncio.sleep(0.08)  # "a" is being handled
+    scheduler.submit(1, "b", handler)
+    scheduler.submit(1, "c", handler)
+
+    await scheduler.drain()
+
+    assert batches == [["a"], ["b", "c"]]
+
+
+@pytest.mark.asyncio
+async def test_different_senders_are_not_merged(scheduler):
+    """Test only consecutive items with one merge key are merged."""
+    batches, handler = _recorder()
+    scheduler.submit(1, "x1", handler, merge_key="x")
+    scheduler.submit(1, "y1", handler, merge_key="y")
+    scheduler.submit(1, "y2", handler, merge_key="y")
+
+    await scheduler.drain()
+
+    assert batches == [["x1"], ["y1", "y2"]]
+
+
+@pytest.mark.asyncio
+async def test_chats_run_independently(scheduler):
+    """Test separate chats are handled concurrently."""
+    batches, handler = _recorder(delay=0.2)
+    scheduler.submit(1, "a", handler)
+    scheduler.submit(2, "b", handler)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await scheduler.drain()
+
+    assert loop.time() - started < 0.35
+    assert sorted(batches) == [["a"], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_full_chat_queue_sheds_oldest(scheduler, monkeypatch):
+    """Test the oldest waiting message is dropped when a chat queue is full."""
+    monkeypatch.setattr(ChatScheduler, "QUEUE_SIZE", 2)
+    monkeypatch.setattr(ChatScheduler, "MAX_BATCH", 10)
+    batches, handler = _recorder()
+    for text in ("1", "2", "3"):
+        scheduler.submit(1, text, handler)
+
+    await scheduler.drain()
+
+    assert batches == [["2", "3"]]
+    assert scheduler.get_stats()["shed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_backpressure_rejects(scheduler, monkeypatch):
+    """Test drop_newest and the global bound reject new items."""
+    monkeypatch.setattr(ChatScheduler, "QUEUE_SIZE", 1)
+    monkeypatch.setattr(ChatScheduler, "SHED_POLICY", "drop_newest")
+    monkeypatch.setattr(ChatScheduler, "MAX_QUEUED", 2)
+    _, handler = _recorder()
+
+    assert scheduler.submit(1, "a", handler)
+    assert not scheduler.submit(1, "b", handler)
+    assert scheduler.submit(2, "c", handler)
+    assert not scheduler.submit(3, "d", handler)
+    assert scheduler.get_stats()["rejected"] == 2
+
+    await scheduler.stop()
+    assert scheduler.get_stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_do_not_stop_the_chat(scheduler):
+    """Test a failing turn doesn't block later messages."""
+    batches = []
+
+    async def handler(batch):
+        batches.append(batch)
+        if batch == ["boom"]:
+            raise RuntimeError("boom")
+        await asyncio.sleep(0)
+
+    scheduler.submit(1, "boom", handler)
+    await asyncio.sleep(0.1)
+    scheduler.submit(1, "ok", handler)
+    await scheduler.drain()
+
+    assert batches == [["boom"], ["ok"]]
+
+
+@pytest.mark.asyncio
+async def test_drain_timeout_leaves_workers_running(scheduler):
+    """Test a drain that times out doesn't cancel the turn in progress."""
+    batches, handler = _recorder(delay=0.3)
+    scheduler.submit(1, "slow", handler)
+
+    assert not await scheduler.drain(timeout=0.1)
+    assert scheduler.get_stats()["active_chats"] == 1
+
+    assert await scheduler.drain(timeout=1.0)
+    assert batches == [["slow"]]
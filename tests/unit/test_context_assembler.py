@@ -0,0 +1,125 @@
+"""Unit tests for concurrent context assembly."""
+
+import asyncio
+import contextlib
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from services.context_assembler import ContextAssembler
+from services.message_service import MessageService
+from services.message_writer import MessageWriter
+
+
+@contextlib.asynccontextmanager
+async def _session():
+    yield None
+
+
+@pytest.mark.asyncio
+async def test_stages_run_concurrently():
+    """Test independent stages overlap instead of adding up."""
+
+    async def slow(*args, **kwargs):
+        await asyncio.sleep(0.1)
+        return ["x"]
+
+    with (
+        patch("services.context_assembler.LessonService.get_all_lessons", slow),
+        patch("services.context_assembler.MemoryService.search_memories", slow),
+        patch("services.context_assembler.MessageService.get_recent_messages", slow),
+    ):
+        started = time.perf_counter()
+        context = await ContextAssembler(_session).assemble(1, 2, "hi")
+        elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.25
+    assert context["lessons"] == context["memories"] == ["x"]
+    assert context["message_history"] == ["x"]
+    assert set(context["timings"]) == {"lessons", "memories", "history", "total"}
+
+
+@pytest.mark.asyncio
+async def test_failing_stage_degrades_to_empty():
+    """Test a failed read doesn't fail the whole context."""
+    with (
+        patch(
+            "services.context_assembler.LessonService.get_all_lessons",
+            AsyncMock(return_value=["Be kind"]),
+        ),
+        patch(
+            "services.context_assembler.MemoryService.search_memories",
+            AsyncMock(side_effect=RuntimeError("db down")),
+        ),
+        patch(
+            "services.context_assembler.MessageService.get_recent_messages",
+            AsyncMock(return_value=[]),
+        ),
+    ):
+        context = await ContextAssembler(_session).assemble(1, 2, "hi")
+
+    assert context["lessons"] == ["Be kind"]
+    assert context["memories"] == []
+
+
+@pytest.mark.asyncio
+async def test_stored_message_not_in_its_own_history(test_engine):
+    """Test a turn's own messages are excluded; replies stored later are not."""
+    factory = async_sessionmaker(
+        test_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with factory() as session:
+        await MessageService(session).store_message(777, 888, "earlier")
+
+    # Stored when they arrive, while the previous turn is still answering
+    writer = MessageWriter(factory)
+    await writer.write(777, 888, "now", message_id=41)
+    await writer.write(777, 888, "and this", message_id=42)
+    await writer.write(777, 888, "previous reply", is_bot=True)
+    await writer.stop()
+
+    with patch(
+        "services.context_assembler.MemoryService.search_memories",
+        AsyncMock(return_value=[]),
+    ):
+        context = await ContextAssembler(factory).assemble(
+            777, 888, "now\nand this", exclude_message_ids=[41, 42]
+        )
+
+    assert [m.text for m in context["message_history"]] == [
+        "earlier",
+        "previous reply",
+    ]
+    async with factory() as session:
+        history = await MessageService(session).get_recent_messages(777, 888)
+    assert [m.text for m in history] == [
+        "earlier",
+        "now",
+        "and this",
+        "previous reply",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_memory_search_gets_message_emotion():
+    """Test the message's estimated VAD is passed to the memory search."""
+    search = AsyncMock(return_value=[])
+    with (
+        patch(
+            "services.context_assembler.LessonService.get_all_lessons",
+            AsyncMock(return_value=[]),
+        ),
+        patch("services.context_assembler.MemoryService.search_memories", search),
+        patch(
+            "services.context_assembler.MessageService.get_recent_messages",
+            AsyncMock(return_value=[]),
+        ),
+    ):
+        await ContextAssembler(_session).assemble(1, 2, "I'm so sad today")
+        await ContextAssembler(_session).assemble(1, 2, "what's the weather")
+
+    sad, neutral = [call.kwargs["emotion"] for call in search.await_args_list]
+    assert sad["valence"] < 0
+    assert neutral is None
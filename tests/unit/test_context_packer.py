@@ -0,0 +1,56 @@
+"""Unit tests for the token-budgeted context packer."""
+
+from services.context_packer import ContextPacker, count_tokens, truncate_to_tokens
+
+
+def test_count_tokens_estimate():
+    """Test the estimator on Latin, Cyrillic, digits and symbols."""
+    assert count_tokens("") == 0
+    assert count_tokens("Hello, how are you doing today?") == 8
+    assert count_tokens("Привет") == 2
+    assert count_tokens("2024") == 2
+    assert count_tokens("🎉!") == 2
+
+
+def test_truncate_to_tokens_word_boundary():
+    """Test truncation keeps whole words and marks the cut."""
+    text = "one two three four five six seven eight nine ten"
+    assert truncate_to_tokens(text, 5) == "one two three four…"
+    assert count_tokens(truncate_to_tokens(text, 5)) <= 5
+    assert truncate_to_tokens(text, 100) == text
+    assert truncate_to_tokens(text, 0) == ""
+
+
+def test_pack_priority_order():
+    """Test recent messages, then memories, then older messages."""
+    packer = ContextPacker()
+    packer.RECENT_MESSAGES = 2
+    history = [f"user: message number {i}" for i in range(6)]
+    memories = ["- likes cats", "- works on dcmaidbot"]
+    per_message = count_tokens(history[0])
+
+    # Everything fits
+    kept_memories, kept_history = packer.pack(memories, history, 1000)
+    assert kept_memories == memories
+    assert kept_history == history
+
+    # Room for the two recent messages, both memories and one older message
+    budget = 3 * per_message + sum(count_tokens(m) for m in memories)
+    kept_memories, kept_history = packer.pack(memories, history, budget)
+    assert kept_memories == memories
+    assert kept_history == history[3:]
+
+
+def test_pack_truncates_long_items():
+    """Test long items are truncated rather than dropped."""
+    packer = ContextPacker()
+    packer.ITEM_MAX_TOKENS = 50
+    long_memory = "- " + " ".join(["word"] * 500)
+    kept_memories, kept_history = packer.pack([long_memory, "- short"], [], 60)
+
+    assert kept_memories[0].endswith("…")
+    assert count_tokens(kept_memories[0]) <= 50
+    # 10 tokens left are below MIN_ITEM_TOKENS for a truncated item, but the
+    # short memory fits whole
+    assert kept_memories[1] == "- short"
+    assert kept_history == []
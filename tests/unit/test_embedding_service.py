@@ -0,0 +1,85 @@
+"""Unit tests for embedding backends and the in-process vector index."""
+
+import numpy as np
+
+from services.embedding_service import HashingEmbedder, pack_vector, unpack_vector
+from services.vector_index import UserVectorIndex
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    """Test that hashing embeddings are stable and unit length."""
+    embedder = HashingEmbedder(dim=64)
+
+    first = embedder.embed_batch(["I love Python and asyncio"])
+    second = embedder.embed_batch(["I love Python and asyncio"])
+
+    assert first.shape == (1, 64)
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert np.isclose(np.linalg.norm(first[0]), 1.0)
+
+
+def test_hashing_embedder_similarity():
+    """Test that texts sharing words are closer than unrelated texts."""
+    embedder = HashingEmbedder()
+    query, related, unrelated = embedder.embed_batch(
+        [
+            "what do you remember about my python projects?",
+            "User builds python projects with asyncio",
+            "Grandma bakes cherry pies on Sunday",
+        ]
+    )
+
+    assert float(query @ related) > float(query @ unrelated)
+
+
+def test_hashing_embedder_empty_text():
+    """Test that empty text produces a zero vector instead of NaNs."""
+    vector = HashingEmbedder(dim=32).embed_batch([""])[0]
+
+    assert not np.isnan(vector).any()
+    assert float(np.abs(vector).sum()) == 0.0
+
+
+def test_pack_unpack_roundtrip():
+    """Test float32 BLOB packing used for SQLite storage."""
+    vector = np.array([0.5, -0.25, 1.0], dtype=np.float32)
+
+    blob = pack_vector(vector)
+
+    assert len(blob) == 12
+    assert np.array_equal(unpack_vector(blob), vector)
+
+
+def test_vector_index_top_k():
+    """Test cosine top-k ordering and min_score cutoff."""
+    index = UserVectorIndex(dim=2)
+    index.upsert(1, np.array([1.0, 0.0], dtype=np.float32))
+    index.upsert(2, np.array([0.0, 1.0], dtype=np.float32))
+    index.upsert(3, np.array([0.8, 0.6], dtype=np.float32))
+
+    query = np.array([1.0, 0.0], dtype=np.float32)
+
+    assert [mid for mid, _ in index.top_k(query, 2)] == [1, 3]
+    assert [mid for mid, _ in index.top_k(query, 10, min_score=0.5)] == [1, 3]
+
+
+def test_vector_index_upsert_remove_and_grow():
+    """Test incremental updates keep ids and rows aligned."""
+    index = UserVectorIndex(dim=4)
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(300, 4)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    for memory_id, vector in enumerate(vectors):
+        index.upsert(memory_id, vector)
+    index.remove(0)
+    index.remove(150)
+    index.upsert(299, vectors[5])  # Replace existing vector
+
+    assert len(index) == 298
+    assert 0 not in index
+    top_id, top_score = index.top_k(vectors[42], 1)[0]
+    assert top_id == 42
+    assert np.isclose(top_score, 1.0)
+    assert {mid for mid, _ in index.top_k(vectors[5], 2)} == {5, 299}
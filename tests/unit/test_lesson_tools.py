@@ -73,7 +73,7 @@ async def test_admin_can_get_all_lessons(async_session):
     """Test that admin can successfully call get_all_lessons."""
     with (
         patch.dict("os.environ", {"ADMIN_IDS": "123"}),
-        patch("tools.tool_executor.LLMService"),
+        patch("tools.tool_executor.get_llm_service"),
     ):
         executor = ToolExecutor(async_session)
 
@@ -97,7 +97,7 @@ async def test_non_admin_cannot_get_all_lessons(async_session):
     """Test that non-admin gets access denied for get_all_lessons."""
     with (
         patch.dict("os.environ", {"ADMIN_IDS": "123"}),
-        patch("tools.tool_executor.LLMService"),
+        patch("tools.tool_executor.get_llm_service"),
     ):
         executor = ToolExecutor(async_session)
 
@@ -117,7 +117,7 @@ async def test_admin_can_create_lesson(async_session):
     """Test that admin can successfully create a lesson."""
     with (
         patch.dict("os.environ", {"ADMIN_IDS": "123"}),
-        patch("tools.tool_executor.LLMService"),
+        patch("tools.tool_executor.get_llm_service"),
     ):
         executor = ToolExecutor(async_session)
 
@@ -137,7 +137,7 @@ async def test_non_admin_cannot_create_lesson(async_session):
     """Test that non-admin gets access denied for create_lesson."""
     with (
         patch.dict("os.environ", {"ADMIN_IDS": "123"}),
-        patch("tools.tool_executor.LLMService"),
+        patch("tools.tool_executor.get_llm_service"),
     ):
         executor = ToolExecutor(async_session)
 
@@ -157,7 +157,7 @@ async def test_admin_can_edit_lesson(async_session):
     """Test that admin can successfully edit a lesson."""
     with (
         patch.dict("os.environ", {"ADMIN_IDS": "123"}),
-        patch("tools.tool_executor.LLMService"),
+        patch("tools.tool_executor.get_llm_service"),
     ):
         # Create a lesson first
         from services.lesson_service import LessonService
@@ -181,7 +181,7 @@ async def test_non_admin_cannot_edit_lesson(async_session):
     """Test that non-admin gets access denied for edit_lesson."""
     with (
         patch.dict("os.environ", {"ADMIN_IDS": "123"}),
-        patch("tools.tool_executor.LLMService"),
+        patch("tools.tool_executor.get_llm_service"),
     ):
         executor = ToolExecutor(async_session)
 
@@ -200,7 +200,7 @@ async def test_admin_can_delete_lesson(async_session):
     """Test that admin can successfully delete a lesson."""
     with (
         patch.dict("os.environ", {"ADMIN_IDS": "123"}),
-        patch("tools.tool_executor.LLMService"),
+        patch("tools.tool_executor.get_llm_service"),
     ):
         # Create a lesson first
         from services.lesson_service import LessonService
@@ -224,7 +224,7 @@ async def test_non_admin_cannot_delete_lesson(async_session):
     """Test that non-admin gets access denied for delete_lesson."""
     with (
         patch.dict("os.environ", {"ADMIN_IDS": "123"}),
-        patch("tools.tool_executor.LLMService"),
+        patch("tools.tool_executor.get_llm_service"),
     ):
         executor = ToolExecutor(async_session)
 
@@ -243,7 +243,7 @@ async def test_create_lesson_missing_content(async_session):
     """Test that create_lesson fails without content."""
     with (
         patch.dict("os.environ", {"ADMIN_IDS": "123"}),
-        patch("tools.tool_executor.LLMService"),
+        patch("tools.tool_executor.get_llm_service"),
     ):
         executor = ToolExecutor(async_session)
 
@@ -262,7 +262,7 @@ async def test_edit_lesson_not_found(async_session):
     """Test that editing non-existent lesson returns error."""
     with (
         patch.dict("os.environ", {"ADMIN_IDS": "123"}),
-        patch("tools.tool_executor.LLMService"),
+        patch("tools.tool_executor.get_llm_service"),
     ):
         executor = ToolExecutor(async_session)
 
@@ -281,7 +281,7 @@ async def test_delete_lesson_not_found(async_session):
     """Test that deleting non-existent lesson returns error."""
     with (
         patch.dict("os.environ", {"ADMIN_IDS": "123"}),
-        patch("tools.tool_executor.LLMService"),
+        patch("tools.tool_executor.get_llm_service"),
     ):
         executor = ToolExecutor(async_session)
 
@@ -0,0 +1,96 @@
+"""Unit tests for the content-addressed LLM result cache."""
+
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.llm_cache import LLMCache
+from services.llm_service import LLMService
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path, monkeypatch):
+    """LLMCache on a temporary SQLite file."""
+    monkeypatch.setattr(LLMCache, "PATH", str(tmp_path / "llm_cache.db"))
+    return LLMCache(backend="sqlite")
+
+
+def _completion(content, tokens=120):
+    """Chat completion mock with content and token usage."""
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = content
+    mock_response.usage.total_tokens = tokens
+    return mock_response
+
+
+def test_key_is_content_addressed():
+    """Test that the key covers model, messages and params, not dict order."""
+    messages = [{"role": "user", "content": "hi"}]
+    key = LLMCache.key("gpt-4o-mini", messages, {"temperature": 0, "max_tokens": 5})
+    assert key == LLMCache.key(
+        "gpt-4o-mini", messages, {"max_tokens": 5, "temperature": 0}
+    )
+    assert key != LLMCache.key("gpt-4o", messages, {"temperature": 0, "max_tokens": 5})
+    assert key != LLMCache.key("gpt-4o-mini", messages, {"temperature": 0.3})
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_ttl_and_size_bound(sqlite_cache, monkeypatch):
+    """Test hits, expiry after TTL and eviction of the oldest entries."""
+    monkeypatch.setattr(sqlite_cache.backend, "max_entries", 2)
+    for i in range(3):
+        await sqlite_cache.set(f"k{i}", f"v{i}", tokens=10)
+
+    assert await sqlite_cache.get("vad", "k0") is None  # evicted
+    assert await sqlite_cache.get("vad", "k2") == "v2"
+
+    later = time.time() + sqlite_cache.backend.ttl + 1
+    monkeypatch.setattr("services.llm_cache.time.time", lambda: later)
+    assert await sqlite_cache.get("vad", "k2") is None
+
+    stats = sqlite_cache.get_stats()
+    assert stats["backend"] == "sqlite"
+    assert stats["methods"]["vad"] == {
+        "hits": 1,
+        "misses": 2,
+        "tokens_saved": 10,
+        "hit_ratio": 0.333,
+    }
+
+
+@pytest.mark.asyncio
+async def test_llm_service_repeated_call_uses_cache(sqlite_cache):
+    """Test that a repeated enrichment call makes no API request."""
+    mock_openai = MagicMock()
+    mock_openai.chat.completions.create = AsyncMock(
+        side_effect=[_completion("0.8"), _completion("not a number")]
+    )
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        service = LLMService()
+    service.client = mock_openai
+
+    with patch("services.llm_service.llm_cache", sqlite_cache):
+        first = await service.calculate_relation_strength("cats", "dogs")
+        second = await service.calculate_relation_strength("cats", "dogs")
+        # Unparsable answers are not cached
+        third = await service.calculate_relation_strength("cats", "birds")
+
+    assert first == second == 0.8
+    assert third == 0.5
+    assert mock_openai.chat.completions.create.await_count == 2
+    stats = sqlite_cache.get_stats()["methods"]["calculate_relation_strength"]
+    assert stats["hits"] == 1
+    assert stats["tokens_saved"] == 120
+
+
+@pytest.mark.asyncio
+async def test_methods_opt_in(tmp_path, monkeypatch):
+    """Test that only configured methods are cached."""
+    monkeypatch.setattr(LLMCache, "PATH", str(tmp_path / "llm_cache.db"))
+    cache = LLMCache(backend="sqlite", methods=["compact_memory"])
+    assert cache.enabled_for("compact_memory")
+    assert not cache.enabled_for("calculate_relation_strength")
+    assert not LLMCache(backend="none").enabled_for("compact_memory")
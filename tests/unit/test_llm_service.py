@@ -1,16 +1,21 @@
 """Unit tests for LLM service."""
 
+import asyncio
+import json
 import os
+import time
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from services import openai_client
 from services.llm_service import LLMService
 
 
 @pytest.fixture
 def mock_openai():
     """Mock OpenAI client."""
-    with patch("services.llm_service.AsyncOpenAI") as mock_client:
+    with patch("services.llm_service.get_openai_client") as mock_client:
         mock_instance = MagicMock()
         mock_client.return_value = mock_instance
         yield mock_instance
@@ -32,7 +37,10 @@ def test_openai_base_url_override():
         os.environ,
         {"OPENAI_API_KEY": "test-key", "OPENAI_BASE_URL": base_url},
     ):
-        with patch("services.llm_service.AsyncOpenAI") as mock_client:
+        with (
+            patch("services.openai_client.AsyncOpenAI") as mock_client,
+            patch.dict(openai_client._clients, clear=True),
+        ):
             LLMService()
 
     mock_client.assert_called_once()
@@ -50,7 +58,7 @@ def test_model_overrides_from_env():
     }
 
     with patch.dict(os.environ, overrides):
-        with patch("services.llm_service.AsyncOpenAI"):
+        with patch("services.llm_service.get_openai_client"):
             service = LLMService()
 
     assert service.test_model == overrides["TEST_MODEL"]
@@ -190,3 +198,304 @@ def test_reload_base_prompt():
         service.reload_base_prompt()
 
         assert service.base_prompt == original_prompt
+
+
+def _completion(content):
+    """Chat completion mock with the given message content."""
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = content
+    return mock_response
+
+
+@pytest.mark.asyncio
+async def test_enrich_memory_single_call(mock_openai):
+    """Test that enrichment is one structured call with per-field validation."""
+    enrichment = {
+        "simple_content": "Vasilisa likes cats",
+        "importance": "1200",
+        "valence": 3.5,
+        "arousal": None,
+        "dominance": -0.2,
+        "emotion_label": " Joy ",
+        "keywords": ["cats", "", 7],
+        "tags": "social/friend",
+        "context_temporal": "",
+        "context_situational": "chat",
+    }
+    mock_openai.chat.completions.create = AsyncMock(
+        return_value=_completion(json.dumps(enrichment))
+    )
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        service = LLMService()
+        service.client = mock_openai
+
+    result = await service.enrich_memory("Vasilisa told me she likes cats")
+
+    assert mock_openai.chat.completions.create.await_count == 1
+    call_args = mock_openai.chat.completions.create.call_args
+    assert call_args.kwargs["response_format"]["type"] == "json_schema"
+    assert result == {
+        "simple_content": "Vasilisa likes cats",
+        "importance": 1200,
+        "valence": 1.0,
+        "arousal": 0.0,
+        "dominance": -0.2,
+        "emotion_label": "joy",
+        "keywords": ["cats"],
+        "tags": [],
+        "context_temporal": None,
+        "context_situational": "chat",
+    }
+
+
+@pytest.mark.asyncio
+async def test_enrich_memory_known_importance_not_asked(mock_openai):
+    """Test a known importance is left out of the prompt and schema."""
+    enrichment = {
+        "simple_content": "Vasilisa likes cats",
+        "valence": 0.5,
+        "arousal": 0.1,
+        "dominance": 0.0,
+        "emotion_label": "joy",
+        "keywords": ["cats"],
+        "tags": ["social/friend"],
+        "context_temporal": None,
+        "context_situational": None,
+    }
+    mock_openai.chat.completions.create = AsyncMock(
+        return_value=_completion(json.dumps(enrichment))
+    )
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        service = LLMService()
+        service.client = mock_openai
+
+    result = await service.enrich_memory("Vasilisa likes cats", importance=42)
+
+    call_args = mock_openai.chat.completions.create.call_args
+    schema = call_args.kwargs["response_format"]["json_schema"]["schema"]
+    assert "importance" not in schema["properties"]
+    assert "importance" not in schema["required"]
+    assert "importance" not in call_args.kwargs["messages"][-1]["content"]
+    assert result["importance"] == 42
+    assert result["simple_content"] == "Vasilisa likes cats"
+
+
+@pytest.mark.asyncio
+async def test_enrich_memory_falls_back_to_parallel_calls(mock_openai):
+    """Test per-field fallback when the structured call returns bad JSON."""
+    mock_openai.chat.completions.create = AsyncMock(
+        side_effect=[
+            _completion("not json"),
+            _completion("Summary"),
+            _completion('{"valence": 0.5, "emotion_label": "joy"}'),
+            _completion('{"keywords": ["cats"], "tags": ["social/friend"]}'),
+        ]
+    )
+
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        service = LLMService()
+        service.client = mock_openai
+
+    # Known importance skips the importance call
+    result = await service.enrich_memory("Vasilisa likes cats", importance=42)
+
+    assert mock_openai.chat.completions.create.await_count == 4
+    assert result["simple_content"] == "Summary"
+    assert result["importance"] == 42
+    assert result["valence"] == 0.5
+    assert result["emotion_label"] == "joy"
+    assert result["keywords"] == ["cats"]
+    assert result["tags"] == ["social/friend"]
+
+
+def test_build_messages_stable_prefix():
+    """Test that per-user data stays out of the cached system prefix."""
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        service = LLMService()
+
+    lessons = ["Always be polite"]
+    alice = service.build_messages(
+        "Hello!", {"username": "alice", "telegram_id": 1}, {"chat_id": 1}, lessons
+    )
+    bob = service.build_messages(
+        "Hi!", {"username": "bob", "telegram_id": 2}, {"chat_id": 2}, list(lessons)
+    )
+
+    assert [m["role"] for m in alice] == ["system", "system", "user"]
+    assert alice[0]["content"] is bob[0]["content"]  # built once per version
+    assert "Always be polite" in alice[0]["content"]
+    assert "alice" not in alice[0]["content"]
+    assert "alice" in alice[1]["content"]
+    assert alice[2]["content"] == "Hello!"
+
+    changed = service.build_messages(
+        "Hello!", {"username": "alice"}, {}, lessons + ["Use emojis"]
+    )
+    assert changed[0]["content"] != alice[0]["content"]
+
+
+def _chunk(content=None, tool_calls=None, usage=None):
+    """Streamed chat completion chunk."""
+    if usage is not None:
+        return SimpleNamespace(choices=[], usage=usage)
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+
+
+def _tool_delta(index, id=None, name=None, arguments=None):
+    """Streamed tool call fragment."""
+    return SimpleNamespace(
+        index=index,
+        id=id,
+        function=SimpleNamespace(name=name, arguments=arguments),
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_completion_collects_tool_calls(mock_openai):
+    """Test streamed tool call fragments are assembled instead of yielded."""
+
+    async def stream():
+        for chunk in [
+            _chunk(tool_calls=[_tool_delta(0, id="call_1", name="create_memory")]),
+            _chunk(tool_calls=[_tool_delta(0, arguments='{"content": ')]),
+            _chunk(tool_calls=[_tool_delta(0, arguments='"cats"}')]),
+            _chunk(usage=SimpleNamespace(prompt_tokens=10)),
+        ]:
+            yield chunk
+
+    mock_openai.chat.completions.create = AsyncMock(return_value=stream())
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        service = LLMService()
+        service.client = mock_openai
+
+    tool_calls = []
+    chunks = [
+        text
+        async for text in service.stream_completion(
+            {
+                "model": "test-model",
+                "messages": [{"role": "user", "content": "Remember cats"}],
+                "tools": [{"type": "function", "function": {"name": "create_memory"}}],
+            },
+            tool_calls,
+        )
+    ]
+
+    assert chunks == []
+    assert tool_calls == [
+        {
+            "id": "call_1",
+            "type": "function",
+            "function": {"name": "create_memory", "arguments": '{"content": "cats"}'},
+        }
+    ]
+    assert mock_openai.chat.completions.create.call_args.kwargs["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_stream_completion_deadline_covers_reading(mock_openai):
+    """Test a stream that stalls after create() is cut off at the deadline."""
+
+    class StalledStream:
+        closed = False
+
+        async def __aiter__(self):
+            yield _chunk(content="Nya")
+            await asyncio.sleep(10)
+
+        async def close(self):
+            self.closed = True
+
+    stream = StalledStream()
+    mock_openai.chat.completions.create = AsyncMock(return_value=stream)
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        service = LLMService()
+        service.client = mock_openai
+
+    chunks = []
+    started = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        async for text in service.stream_completion(
+            {"model": "test-model", "messages": []}, deadline=0.2
+        ):
+            chunks.append(text)
+
+    assert chunks == ["Nya"]
+    assert time.perf_counter() - started < 1
+    assert stream.closed
+
+
+def test_llm_services_share_pooled_client():
+    """Test that every LLMService reuses one OpenAI client per endpoint."""
+    with (
+        patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}),
+        patch.dict(openai_client._clients, clear=True),
+    ):
+        first = LLMService()
+        second = LLMService()
+
+    assert first.client is second.client
+
+
+@pytest.mark.asyncio
+async def test_stream_completion_reports_usage(mock_openai):
+    """Test streamed usage is handed to the caller."""
+
+    async def stream():
+        yield _chunk(content="Hi")
+        yield _chunk(
+            usage=SimpleNamespace(
+                prompt_tokens=10, completion_tokens=2, total_tokens=12
+            )
+        )
+
+    mock_openai.chat.completions.create = AsyncMock(return_value=stream())
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        service = LLMService()
+        service.client = mock_openai
+
+    usage = {}
+    chunks = [
+        text
+        async for text in service.stream_completion(
+            {"model": "m", "messages": []}, usage=usage
+        )
+    ]
+
+    assert chunks == ["Hi"]
+    assert usage == {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}
+
+
+@pytest.mark.asyncio
+async def test_get_response_coalesces_identical_requests(mock_openai):
+    """Test coalesce=True shares one API call among identical requests."""
+
+    async def create(**kwargs):
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content="A joke!", tool_calls=None)
+                )
+            ],
+            usage=None,
+        )
+
+    mock_openai.chat.completions.create = AsyncMock(side_effect=create)
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        service = LLMService()
+        service.client = mock_openai
+
+    results = await asyncio.gather(
+        *(
+            service.get_response("joke", {"username": "u"}, {}, coalesce=True)
+            for _ in range(3)
+        )
+    )
+
+    assert results == ["A joke!"] * 3
+    assert mock_openai.chat.completions.create.await_count == 1
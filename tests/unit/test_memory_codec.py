@@ -0,0 +1,113 @@
+"""Unit tests for the binary memory cache format."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from models.memory import Memory
+from services import memory_codec
+from services.memory_codec import (
+    decode_memory,
+    decode_summary,
+    encode_memory,
+    summary_length,
+)
+
+
+def make_memory(**overrides) -> Memory:
+    """Detached memory with every field populated."""
+    fields = {
+        "id": 42,
+        "simple_content": "Любит чай 🍵",
+        "full_content": "Detailed story about tea. " * 300,
+        "importance": 7000,
+        "emotion_valence": 0.8,
+        "emotion_arousal": -0.25,
+        "emotion_dominance": None,
+        "emotion_label": "joy",
+        "keywords": ["tea", "чай"],
+        "tags": [],
+        "context_temporal": "morning",
+        "context_situational": None,
+        "version": 3,
+        "parent_id": None,
+        "evolution_triggers": [7, 9],
+        "created_by": 123456789,
+        "created_at": datetime(2026, 1, 2, 3, 4, 5, 678901),
+        "updated_at": None,
+        "last_accessed": datetime(2026, 2, 1),
+        "access_count": 11,
+    }
+    fields.update(overrides)
+    return Memory(**fields)
+
+
+FIELDS = [
+    "id",
+    "simple_content",
+    "full_content",
+    "importance",
+    "emotion_valence",
+    "emotion_arousal",
+    "emotion_dominance",
+    "emotion_label",
+    "keywords",
+    "tags",
+    "context_temporal",
+    "context_situational",
+    "version",
+    "parent_id",
+    "evolution_triggers",
+    "created_by",
+    "created_at",
+    "updated_at",
+    "last_accessed",
+    "access_count",
+]
+
+
+@pytest.mark.parametrize("compression", ["auto", "zlib", "none"])
+@pytest.mark.parametrize("full_content", ["short", "Detailed story. " * 300])
+def test_round_trip(full_content, compression, monkeypatch):
+    """Test that every field survives encode/decode exactly."""
+    monkeypatch.setattr(memory_codec, "COMPRESSION", compression)
+    memory = make_memory(full_content=full_content)
+    decoded = decode_memory(encode_memory(memory))
+
+    for field in FIELDS:
+        assert getattr(decoded, field) == getattr(memory, field), field
+
+
+def test_large_content_is_compressed(monkeypatch):
+    """Test that only bodies above COMPRESS_MIN are compressed."""
+    monkeypatch.setattr(memory_codec, "COMPRESSION", "zlib")
+    memory = make_memory()
+    encoded = encode_memory(memory)
+
+    assert encoded[1] == memory_codec.FLAG_ZLIB
+    assert len(encoded) < len(memory.full_content) / 4
+    assert encode_memory(make_memory(full_content="short"))[1] == 0
+
+
+def test_summary_from_prefix():
+    """Test that the projection decodes without the body."""
+    encoded = encode_memory(make_memory())
+    prefix = encoded[: summary_length(encoded[:6])]
+
+    summary = decode_summary(prefix)
+    assert summary["simple_content"] == "Любит чай 🍵"
+    assert summary["keywords"] == ["tea", "чай"]
+    assert summary["category_ids"] == []
+    assert "full_content" not in summary
+
+    with pytest.raises(ValueError):
+        decode_summary(prefix[:-1])
+
+
+def test_unknown_format_rejected():
+    """Test that JSON written by older releases is treated as a miss."""
+    with pytest.raises(ValueError):
+        decode_memory(json.dumps({"id": 1}).encode())
+    with pytest.raises(ValueError):
+        decode_memory(b"")
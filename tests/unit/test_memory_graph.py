@@ -0,0 +1,297 @@
+"""Unit tests for the in-memory memory link graph."""
+
+import pytest
+
+from services.memory_graph import UserLinkGraph, memory_graph_registry
+from services.memory_service import MemoryService
+
+
+@pytest.fixture
+def chain_graph():
+    """1 -> 2 -> 3 -> 4 with a weak 1 -> 5 side branch."""
+    return UserLinkGraph.from_links(
+        [
+            (1, 2, "related", 1.0),
+            (2, 3, "causes", 1.0),
+            (3, 4, "elaborates", 1.0),
+            (1, 5, "related", 0.1),
+        ]
+    )
+
+
+def test_neighbors_by_direction(chain_graph):
+    """Test outgoing/incoming/both adjacency from the CSR arrays."""
+    assert chain_graph.neighbors(2, "outgoing") == [(3, "causes", 1.0)]
+    assert chain_graph.neighbors(2, "incoming") == [(1, "related", 1.0)]
+    assert {n for n, _, _ in chain_graph.neighbors(2)} == {1, 3}
+    assert chain_graph.neighbors(99) == []
+
+
+def test_k_hop(chain_graph):
+    """Test breadth-first expansion honours the hop limit."""
+    assert chain_graph.k_hop([1], k=1, direction="outgoing") == [(2, 1), (5, 1)]
+    assert chain_graph.k_hop([1], k=2, direction="outgoing") == [
+        (2, 1),
+        (5, 1),
+        (3, 2),
+    ]
+    assert chain_graph.k_hop([4], k=3, direction="incoming") == [
+        (3, 1),
+        (2, 2),
+        (1, 3),
+    ]
+
+
+def test_personalized_pagerank_prefers_strong_close_links(chain_graph):
+    """Test that activation decays with distance and weak links."""
+    ranked = chain_graph.personalized_pagerank([1], top_n=10)
+    ids = [memory_id for memory_id, _ in ranked]
+
+    assert 1 not in ids
+    assert ids[0] == 2
+    assert ids.index(3) < ids.index(4)
+    assert ids.index(2) < ids.index(5)
+    assert len(chain_graph.personalized_pagerank([1], top_n=2)) == 2
+
+
+def test_incremental_add_and_remove(chain_graph):
+    """Test that new links are visible without a rebuild from the database."""
+    chain_graph.add_link(4, 6, "related", 1.0)
+    assert (6, 4) in chain_graph.k_hop([1], k=5, direction="outgoing")
+
+    chain_graph.remove_memory(3)
+    assert chain_graph.k_hop([1], k=5, direction="outgoing") == [(2, 1), (5, 1)]
+    assert 3 not in {m for m, _ in chain_graph.personalized_pagerank([1])}
+
+
+@pytest.mark.asyncio
+async def test_get_related_memories(async_session, test_categories):
+    """Test multi-hop retrieval through MemoryService."""
+    service = MemoryService(async_session)
+    user_id = 123456789
+    memories = [
+        await service.create_memory(
+            simple_content=f"Memory {i}",
+            full_content="Content",
+            importance=1000,
+            created_by=user_id,
+        )
+        for i in range(4)
+    ]
+    ids = [m.id for m in memories]
+    await service.create_memory_link(ids[0], ids[1], "related")
+
+    # First traversal loads the graph; later links are applied incrementally
+    assert [m.id for m in await service.get_related_memories(user_id, [ids[0]])] == [
+        ids[1]
+    ]
+    assert memory_graph_registry.peek(user_id) is not None
+
+    await service.create_memory_link(ids[2], ids[1], "causes")
+    related = await service.get_related_memories(user_id, [ids[0]], hops=2)
+    assert [m.id for m in related] == [ids[1], ids[2]]
+
+    await service.delete_memory(ids[2])
+    related = await service.get_related_memories(user_id, [ids[0]], hops=2)
+    assert [m.id for m in related] == [ids[1]]
+
+
+def test_add_link_does_not_rebuild(chain_graph, monkeypatch):
+    """Test links stay in the delta until it passes the compaction threshold."""
+    builds = []
+    original = chain_graph._build
+    monkeypatch.setattr(chain_graph, "_build", lambda: builds.append(1) or original())
+
+    chain_graph.add_link(4, 6, "related", 1.0)
+    chain_graph.add_link(6, 2, "causes", 0.5)
+    assert chain_graph.neighbors(6) == [(2, "causes", 0.5), (4, "related", 1.0)]
+    assert {m for m, _ in chain_graph.personalized_pagerank([4])} >= {6, 2}
+    assert builds == []
+
+    rebuilt = UserLinkGraph.from_links(
+        [(1, 2, "related", 1.0), (2, 3, "causes", 1.0), (3, 4, "elaborates", 1.0)]
+        + [(1, 5, "related", 0.1), (4, 6, "related", 1.0), (6, 2, "causes", 0.5)]
+    )
+    assert chain_graph.personalized_pagerank([4]) == pytest.approx(
+        rebuilt.personalized_pagerank([4])
+    )
+
+    for i in range(UserLinkGraph.COMPACT_MIN):
+        chain_graph.add_link(100 + i, 1, "related", 1.0)
+    assert builds == [1]
+    assert len(chain_graph._delta) < UserLinkGraph.COMPACT_MIN
+    assert (6, 4) in chain_graph.k_hop([1], k=4, direction="outgoing")
+
+
+class FakeRedis:
+    """Link generation counters shared by "processes" (registries)."""
+
+    redis = True
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+@pytest.mark.asyncio
+async def test_registry_reloads_on_generation_change(
+    async_session, test_categories, monkeypatch
+):
+    """Test a link created by another process invalidates the cached graph."""
+    from services import memory_graph
+
+    monkeypatch.setattr(memory_graph, "redis_service", FakeRedis())
+    other_process = memory_graph.MemoryGraphRegistry()
+
+    service = MemoryService(async_session)
+    user_id = 123456789
+    ids = [
+        (
+            await service.create_memory(
+                simple_content=f"Memory {i}",
+                full_content="Content",
+                importance=1000,
+                created_by=user_id,
+            )
+        ).id
+        for i in range(3)
+    ]
+    await service.create_memory_link(ids[0], ids[1], "related")
+    stale = await other_process.get(async_session, user_id)
+    assert stale.k_hop([ids[0]], k=2) == [(ids[1], 1)]
+
+    # This process applies its own link in place, the other one reloads
+    await service.get_related_memories(user_id, [ids[0]])
+    local = memory_graph_registry.peek(user_id)
+    await service.create_memory_link(ids[1], ids[2], "causes")
+    assert memory_graph_registry.peek(user_id) is local
+
+    fresh = await other_process.get(async_session, user_id)
+    assert fresh is not stale
+    assert fresh.k_hop([ids[0]], k=2) == [(ids[1], 1), (ids[2], 2)]
+    assert await other_process.get(async_session, user_id) is fresh
+
+
+@pytest.mark.asyncio
+async def test_registry_ttl_without_redis(async_session, monkeypatch):
+    """Test graphs expire after MEMORY_GRAPH_TTL when Redis is unavailable."""
+    from services.memory_graph import MemoryGraphRegistry
+
+    registry = MemoryGraphRegistry()
+    graph = await registry.get(async_session, 1)
+    assert await registry.get(async_session, 1) is graph
+
+    graph.loaded_at -= MemoryGraphRegistry.TTL + 1
+    assert await registry.get(async_session, 1) is not graph
+
+
+@pytest.mark.asyncio
+async def test_get_linked_memories_reads_database(async_session, test_categories):
+    """Test links written without the registry are still returned."""
+    from models.memory import MemoryLink
+
+    service = MemoryService(async_session)
+    user_id = 123456789
+    ids = [
+        (
+            await service.create_memory(
+                simple_content=f"Memory {i}",
+                full_content="Content",
+                importance=1000,
+                created_by=user_id,
+            )
+        ).id
+        for i in range(3)
+    ]
+    await service.get_related_memories(user_id, [ids[0]])
+
+    async_session.add(
+        MemoryLink(from_memory_id=ids[0], to_memory_id=ids[1], link_type="related")
+    )
+    async_session.add(
+        MemoryLink(from_memory_id=ids[2], to_memory_id=ids[0], link_type="causes")
+    )
+    await async_session.commit()
+
+    outgoing = await service.get_linked_memories(ids[0], "outgoing")
+    assert [m.id for m in outgoing] == [ids[1]]
+    linked = await service.get_linked_memories(ids[0])
+    assert sorted(m.id for m in linked) == [ids[1], ids[2]]
+
+
+@pytest.mark.asyncio
+async def test_get_related_memories_tool(async_session, test_categories):
+    """Test the tool returns only the caller's linked memories."""
+    from unittest.mock import MagicMock
+
+    from tools.tool_executor import ToolExecutor
+
+    service = MemoryService(async_session)
+    mine, theirs, also_mine = [
+        await service.create_memory(
+            simple_content=f"Memory {i}",
+            full_content="Content",
+            importance=1000,
+            created_by=owner,
+        )
+        for i, owner in enumerate([111, 222, 111])
+    ]
+    await service.create_memory_link(mine.id, theirs.id, "related")
+    await service.create_memory_link(theirs.id, also_mine.id, "related")
+
+    executor = ToolExecutor(async_session, llm_service=MagicMock())
+    result = await executor.execute(
+        "get_related_memories", {"memory_ids": [mine.id]}, user_id=111
+    )
+
+    assert result["success"] is True
+    assert [m["id"] for m in result["memories"]] == [also_mine.id]
+
+
+@pytest.mark.asyncio
+async def test_get_related_memories_tool_coerces_arguments(async_session):
+    """Test malformed tool arguments are coerced or rejected, never raised."""
+    from unittest.mock import MagicMock
+
+    from tools.tool_executor import ToolExecutor
+
+    service = MemoryService(async_session)
+    first, second = [
+        await service.create_memory(
+            simple_content=f"Memory {i}",
+            full_content="Content",
+            importance=1000,
+            created_by=111,
+        )
+        for i in range(2)
+    ]
+    await service.create_memory_link(first.id, second.id, "related")
+    executor = ToolExecutor(async_session, llm_service=MagicMock())
+
+    result = await executor.execute(
+        "get_related_memories",
+        {"memory_ids": [str(first.id)], "hops": "1", "limit": None},
+        user_id=111,
+    )
+    assert [m["id"] for m in result["memories"]] == [second.id]
+
+    result = await executor.execute(
+        "get_related_memories", {"memory_ids": [first.id], "limit": "0"}, user_id=111
+    )
+    assert [m["id"] for m in result["memories"]] == [second.id]
+
+    for arguments in (
+        {"memory_ids": first.id},
+        {"memory_ids": ["first"]},
+        {"memory_ids": [first.id], "limit": "five"},
+        {"memory_ids": [first.id], "hops": [2]},
+    ):
+        result = await executor.execute("get_related_memories", arguments, 111)
+        assert result["success"] is False
+        assert "must be" in result["error"]
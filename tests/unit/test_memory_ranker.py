@@ -0,0 +1,159 @@
+"""Unit tests for MemoryRanker hybrid scoring."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.memory_ranker import MemoryRanker, estimate_vad
+from services.memory_service import MemoryService
+
+NOW = datetime(2026, 1, 1)
+
+
+def row(
+    memory_id,
+    relevance=1.0,
+    importance=5000,
+    age_days=0,
+    accessed_days=None,
+    access_count=0,
+    vad=(None, None, None),
+):
+    """Build a candidate row."""
+    accessed = None if accessed_days is None else NOW - timedelta(days=accessed_days)
+    return (
+        memory_id,
+        relevance,
+        importance,
+        NOW - timedelta(days=age_days),
+        accessed,
+        access_count,
+        *vad,
+    )
+
+
+def test_rank_empty():
+    """Test ranking an empty candidate set."""
+    assert MemoryRanker().rank([]) == []
+
+
+def test_rank_blends_relevance_importance_and_recency():
+    """Test that each factor moves otherwise equal candidates."""
+    ranker = MemoryRanker()
+
+    ranked = ranker.rank([row(1, relevance=2.0), row(2, relevance=8.0)], now=NOW)
+    assert [mid for mid, _ in ranked] == [2, 1]
+
+    ranked = ranker.rank([row(1, importance=100), row(2, importance=9000)], now=NOW)
+    assert [mid for mid, _ in ranked] == [2, 1]
+
+    ranked = ranker.rank([row(1, age_days=365), row(2, age_days=1)], now=NOW)
+    assert [mid for mid, _ in ranked] == [2, 1]
+
+    # A recent access refreshes an old memory
+    ranked = ranker.rank(
+        [row(1, age_days=30), row(2, age_days=365, accessed_days=0)], now=NOW
+    )
+    assert [mid for mid, _ in ranked] == [2, 1]
+
+    ranked = ranker.rank([row(1, access_count=0), row(2, access_count=20)], now=NOW)
+    assert [mid for mid, _ in ranked] == [2, 1]
+
+
+def test_rank_emotional_affinity():
+    """Test that memories closer in VAD space to the message rank higher."""
+    ranker = MemoryRanker()
+    candidates = [
+        row(1, vad=(-0.8, 0.6, -0.4)),
+        row(2, vad=(0.9, 0.5, 0.3)),
+        row(3),
+    ]
+
+    joyful = {"valence": 0.8, "arousal": 0.5, "dominance": 0.2}
+    assert [mid for mid, _ in ranker.rank(candidates, joyful, NOW)] == [2, 3, 1]
+
+    # Without a message emotion the factor is neutral: candidate order is kept
+    assert [mid for mid, _ in ranker.rank(candidates, None, NOW)] == [1, 2, 3]
+
+
+def test_rank_zero_weight_disables_factor():
+    """Test that a zero weight removes a factor from the score."""
+    ranker = MemoryRanker(importance_weight=0.0, recency_weight=0.0)
+    ranked = ranker.rank(
+        [row(1, importance=9999, age_days=0), row(2, importance=0, age_days=900)],
+        now=NOW,
+    )
+    assert ranked[0][1] == pytest.approx(ranked[1][1])
+
+
+def test_rank_scores_are_bounded():
+    """Test that scores stay in (0, 1] even for extreme inputs."""
+    scores = MemoryRanker().score(
+        [row(1, relevance=0.0, importance=0, age_days=10_000), row(2)], now=NOW
+    )
+    assert all(0.0 < s <= 1.0 for s in scores)
+
+
+@pytest.mark.asyncio
+async def test_search_memories_reranks_by_importance(async_session, test_categories):
+    """Test that equally relevant memories are ordered by importance."""
+    service = MemoryService(async_session)
+    user_id = 123456789
+
+    low = await service.create_memory(
+        simple_content="User's cat is called Mochi",
+        full_content="Content",
+        importance=100,
+        created_by=user_id,
+    )
+    high = await service.create_memory(
+        simple_content="User's cat Mochi is sick",
+        full_content="Content",
+        importance=9000,
+        created_by=user_id,
+    )
+
+    results = await service.search_memories(user_id, query="how is Mochi?")
+
+    assert [m.id for m in results] == [high.id, low.id]
+
+
+def test_estimate_vad_from_emotion_words():
+    """Test the lexicon estimate and that messages without cues give None."""
+    sad = estimate_vad("I feel so sad and lonely today 😢")
+    assert sad["valence"] < -0.5 and sad["dominance"] < 0
+    assert estimate_vad("Я так рада!")["valence"] > 0.5
+    assert estimate_vad("Where did I put the radio saddle?") is None
+
+
+@pytest.mark.asyncio
+async def test_search_memories_ranks_by_message_emotion(async_session, test_categories):
+    """Test the current message's mood reorders equally relevant memories."""
+    service = MemoryService(async_session)
+    user_id = 123456789
+
+    happy = await service.create_memory(
+        simple_content="Concert with Mochi",
+        full_content="Content",
+        importance=1000,
+        created_by=user_id,
+        emotion_valence=0.9,
+        emotion_arousal=0.5,
+        emotion_dominance=0.4,
+    )
+    sad = await service.create_memory(
+        simple_content="Concert without Mochi",
+        full_content="Content",
+        importance=1000,
+        created_by=user_id,
+        emotion_valence=-0.8,
+        emotion_arousal=-0.2,
+        emotion_dominance=-0.5,
+    )
+
+    query = "the Mochi concert"
+    for message, first in [("so sad and lonely", sad), ("so happy!", happy)]:
+        results = await service.search_memories(
+            user_id, query=query, emotion=estimate_vad(message)
+        )
+        assert results[0].id == first.id
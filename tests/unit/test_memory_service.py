@@ -1,8 +1,17 @@
 """Unit tests for MemoryService (PRP-005)."""
 
+from unittest.mock import MagicMock, patch
+
 import pytest
+from sqlalchemy import select
 
-from services.memory_service import MemoryService
+from models.memory import MemoryTerm
+from services import memory_service as service_module
+from services.embedding_service import HashingEmbedder
+from services.memory_service import MemoryService, tokenize_query
+from services.redis_service import LocalCache, redis_service
+from services.vector_index import vector_index_registry
+from tools.tool_executor import ToolExecutor
 
 
 @pytest.mark.asyncio
@@ -388,3 +397,401 @@ async def test_memory_with_multiple_categories(async_session, test_categories):
     # test_categories[0] = person, test_categories[1] = tech_domain
     assert "person" in category_names
     assert "tech_domain" in category_names
+
+
+def test_tokenize_query():
+    """Test that user messages are split into distinct search terms."""
+    assert tokenize_query("Hey, how is my Python bot? Python!") == ["python", "bot"]
+    assert tokenize_query("Как там мой котёнок Мочи?") == ["котёнок", "мочи"]
+    assert tokenize_query("hi, how are you?") == []
+
+
+@pytest.mark.asyncio
+async def test_search_memories_fulltext_ranking(async_session, test_categories):
+    """Test that full-text search matches terms and blends in importance."""
+    service = MemoryService(async_session)
+    user_id = 123456789
+
+    kitten = await service.create_memory(
+        simple_content="User adopted a kitten named Mochi",
+        full_content="Mochi is a grey kitten who loves boxes",
+        importance=2000,
+        created_by=user_id,
+    )
+    tagged = await service.create_memory(
+        simple_content="User's favourite drink",
+        full_content="Prefers green tea in the evening",
+        importance=500,
+        created_by=user_id,
+        keywords=["tea", "drinks"],
+        tags=["interest/food"],
+    )
+    await service.create_memory(
+        simple_content="Kittens are mentioned once",
+        full_content="Content",
+        importance=0,
+        created_by=user_id,
+    )
+
+    # Whole message is tokenized, not used as one substring pattern
+    results = await service.search_memories(
+        user_id, query="hey, how is my kitten Mochi doing?"
+    )
+    assert results[0].id == kitten.id
+    assert len(results) == 2  # prefix match also finds "Kittens"
+
+    # Keywords and tags are indexed too
+    results = await service.search_memories(user_id, query="any drinks?")
+    assert [m.id for m in results] == [tagged.id]
+    results = await service.search_memories(user_id, query="food")
+    assert [m.id for m in results] == [tagged.id]
+
+
+@pytest.mark.asyncio
+async def test_fulltext_index_tracks_updates_and_deletes(
+    async_session, test_categories
+):
+    """Test that the full-text index follows update and delete."""
+    service = MemoryService(async_session)
+    user_id = 123456789
+
+    memory = await service.create_memory(
+        simple_content="User likes jazz concerts",
+        full_content="Content",
+        importance=1000,
+        created_by=user_id,
+    )
+    await service.update_memory(memory.id, {"simple_content": "User plays chess"})
+
+    assert await service.search_memories(user_id, query="jazz") == []
+    results = await service.search_memories(user_id, query="chess")
+    assert [m.id for m in results] == [memory.id]
+
+    await service.delete_memory(memory.id)
+    assert await service.search_memories(user_id, query="chess") == []
+
+
+@pytest.fixture
+def hashing_embedder():
+    """Deterministic offline embedder with a fresh in-process vector index."""
+    vector_index_registry.clear()
+    yield HashingEmbedder()
+    vector_index_registry.clear()
+
+
+@pytest.mark.asyncio
+async def test_search_memories_vector_mode(
+    async_session, test_categories, hashing_embedder
+):
+    """Test that vector mode matches natural-language messages."""
+    service = MemoryService(async_session, embedder=hashing_embedder)
+    user_id = 123456789
+
+    python_memory = await service.create_memory(
+        simple_content="User is building a Python asyncio bot",
+        full_content="Content",
+        importance=1000,
+        created_by=user_id,
+    )
+    await service.create_memory(
+        simple_content="User's grandma bakes cherry pies",
+        full_content="Content",
+        importance=9000,
+        created_by=user_id,
+    )
+
+    results = await service.search_memories(
+        user_id,
+        query="hey, how is my python bot going?",
+        limit=1,
+        mode="vector",
+    )
+
+    assert [m.id for m in results] == [python_memory.id]
+
+
+@pytest.mark.asyncio
+async def test_vector_index_tracks_updates_and_deletes(
+    async_session, test_categories, hashing_embedder
+):
+    """Test that the loaded vector index follows update and delete."""
+    service = MemoryService(async_session, embedder=hashing_embedder)
+    user_id = 123456789
+
+    memory = await service.create_memory(
+        simple_content="User likes jazz concerts",
+        full_content="Content",
+        importance=1000,
+        created_by=user_id,
+    )
+    # Load the index, then mutate
+    await service.search_memories(user_id, query="jazz", mode="vector")
+    await service.update_memory(
+        memory.id, {"simple_content": "User adopted a kitten named Mochi"}
+    )
+
+    results = await service.search_memories(
+        user_id, query="how is my kitten Mochi?", mode="vector"
+    )
+    assert [m.id for m in results] == [memory.id]
+
+    await service.delete_memory(memory.id)
+    results = await service.search_memories(
+        user_id, query="how is my kitten Mochi?", mode="vector"
+    )
+    assert results == []
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for redis.asyncio (text and binary clients)."""
+
+    def __init__(self):
+        self.data: dict[str, str] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value if isinstance(value, bytes) else str(value)
+
+    async def getrange(self, key, start, end):
+        return self.data.get(key, b"")[start : end + 1]
+
+    async def pttl(self, key):
+        return -1 if key in self.data else -2
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def publish(self, channel, message):
+        pass
+
+
+class FakePipeline:
+    """Queues commands and runs them on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append(getattr(self.redis, name)(*args))
+
+        return queue
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Route redis_service through an in-memory fake with a fresh local tier."""
+    fake = FakeRedis()
+    monkeypatch.setattr(redis_service, "redis", fake)
+    monkeypatch.setattr(redis_service, "binary", fake)
+    monkeypatch.setattr(redis_service, "local", LocalCache(max_entries=64, ttl=30))
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_search_results_cached_per_generation(
+    async_session, test_categories, fake_redis, monkeypatch
+):
+    """Test that search results are cached until the user's memories change."""
+    service = MemoryService(async_session)
+    user_id = 123456789
+    memory = await service.create_memory(
+        simple_content="User likes jazz concerts",
+        full_content="Content",
+        importance=1000,
+        created_by=user_id,
+    )
+
+    calls = []
+    search_ranked = service._search_ranked
+
+    async def spy(*args, **kwargs):
+        calls.append(kwargs)
+        return await search_ranked(*args, **kwargs)
+
+    monkeypatch.setattr(service, "_search_ranked", spy)
+
+    first = await service.search_memories(user_id, query="jazz")
+    second = await service.search_memories(user_id, query="jazz")
+    assert [m.id for m in first] == [m.id for m in second] == [memory.id]
+    assert len(calls) == 1
+
+    # Edit bumps the generation: fresh search, fresh content
+    await service.update_memory(memory.id, {"simple_content": "User likes jazz bars"})
+    results = await service.search_memories(user_id, query="jazz")
+    assert len(calls) == 2
+    assert results[0].simple_content == "User likes jazz bars"
+
+    await service.delete_memory(memory.id)
+    assert await service.search_memories(user_id, query="jazz") == []
+    assert fake_redis.data[f"memory:gen:{user_id}"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_update_memory_invalidates_cached_memory(
+    async_session, test_categories, fake_redis
+):
+    """Test that updates persist and evict the cached memory entry."""
+    service = MemoryService(async_session)
+    memory = await service.create_memory(
+        simple_content="Old content",
+        full_content="Content",
+        importance=1000,
+        created_by=123456789,
+    )
+
+    await service.get_memory(memory.id)  # populates memory:{id}
+    assert f"memory:{memory.id}" in fake_redis.data
+
+    await service.update_memory(memory.id, {"simple_content": "New content"})
+    assert f"memory:{memory.id}" not in fake_redis.data
+
+    retrieved = await service.get_memory(memory.id)
+    assert retrieved.simple_content == "New content"
+
+
+@pytest.mark.asyncio
+async def test_get_memory_summary_skips_full_content(
+    async_session, test_categories, fake_redis
+):
+    """Test the lightweight projection on cache miss and hit."""
+    service = MemoryService(async_session)
+    memory = await service.create_memory(
+        simple_content="Likes tea",
+        full_content="Long story about tea. " * 200,
+        importance=1000,
+        created_by=123456789,
+    )
+
+    summary = await service.get_memory_summary(memory.id)  # miss: caches value
+    assert summary["simple_content"] == "Likes tea"
+    assert "full_content" not in summary
+
+    summary = await service.get_memory_summary(memory.id)  # hit: prefix only
+    assert summary["id"] == memory.id
+    assert summary["last_accessed"] is not None
+
+    cached = await service.get_memory(memory.id)
+    assert cached.full_content == memory.full_content
+    assert await service.get_memory_summary(10**9) is None
+
+
+@pytest.mark.asyncio
+async def test_get_memory_tool_uses_summary(async_session, test_categories, fake_redis):
+    """Test get_memory without full reads the summary and keeps category paths."""
+    service = MemoryService(async_session)
+    memory = await service.create_memory(
+        simple_content="Likes tea",
+        full_content="Long story about tea. " * 200,
+        importance=1000,
+        created_by=123456789,
+        category_ids=[test_categories[0].id],
+    )
+    executor = ToolExecutor(async_session, llm_service=MagicMock())
+
+    for _ in range(2):  # miss, then cached prefix
+        result = await executor._execute_get_memory({"memory_id": memory.id}, 123456789)
+        assert result["memory"]["content"] == "Likes tea"
+        assert result["memory"]["categories"] == ["social.person"]
+
+    with patch.object(service_module, "decode_memory") as decode:
+        await executor._execute_get_memory({"memory_id": memory.id}, 123456789)
+    decode.assert_not_called()
+
+    full = await executor._execute_get_memory(
+        {"memory_id": memory.id, "full": True}, 123456789
+    )
+    assert full["memory"]["content"] == memory.full_content
+
+    denied = await executor._execute_get_memory({"memory_id": memory.id}, 1)
+    assert denied["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_search_memories_tag_and_keyword_filters(async_session, test_categories):
+    """Test indexed tag/keyword filters with any/all semantics."""
+    service = MemoryService(async_session)
+    user_id = 123456789
+    both = await service.create_memory(
+        simple_content="Cat and tea",
+        full_content="Content",
+        importance=1000,
+        created_by=user_id,
+        keywords=["Earl Grey"],
+        tags=["pets", "Drinks"],
+    )
+    pets = await service.create_memory(
+        simple_content="Cat only",
+        full_content="Content",
+        importance=900,
+        created_by=user_id,
+        tags=["pets"],
+    )
+    await service.create_memory(
+        simple_content="Untagged",
+        full_content="Content",
+        importance=800,
+        created_by=user_id,
+    )
+
+    async def ids(**filters):
+        return [m.id for m in await service.search_memories(user_id, **filters)]
+
+    assert await ids(tags=["pets", "drinks"]) == [both.id, pets.id]
+    assert await ids(tags=["PETS", "drinks"], term_match="all") == [both.id]
+    assert await ids(keywords=["earl  grey"]) == [both.id]
+    assert await ids(tags=["pets"], keywords=["earl grey"]) == [both.id]
+    assert await ids(tags=["music"]) == []
+
+    # Updates replace the indexed terms
+    await service.update_memory(pets.id, {"tags": ["music"]})
+    assert await ids(tags=["pets"]) == [both.id]
+    assert await ids(tags=["music"]) == [pets.id]
+
+    await service.delete_memory(both.id)
+    result = await async_session.execute(
+        select(MemoryTerm.memory_id).where(MemoryTerm.memory_id == both.id)
+    )
+    assert result.all() == []
+
+
+@pytest.mark.asyncio
+async def test_memory_version_keeps_tag_and_keyword_terms(
+    async_session, test_categories
+):
+    """Test a new version is found by the original's tags and keywords."""
+    service = MemoryService(async_session)
+    user_id = 123456789
+    original = await service.create_memory(
+        simple_content="Likes tea",
+        full_content="Content",
+        importance=1000,
+        created_by=user_id,
+        keywords=["Earl Grey"],
+        tags=["drinks"],
+    )
+
+    version = await service.create_memory_version(
+        memory_id=original.id,
+        new_full_content="Loves tea",
+        created_by=user_id,
+        llm_service=MagicMock(),
+    )
+
+    by_tag = await service.search_memories(user_id, tags=["drinks"])
+    by_keyword = await service.search_memories(user_id, keywords=["earl grey"])
+    assert {m.id for m in by_tag} == {original.id, version.id}
+    assert {m.id for m in by_keyword} == {original.id, version.id}
@@ -0,0 +1,90 @@
+"""Unit tests for maintained message counters."""
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models.message import Message, MessageCounter
+from models.user import User
+from services.message_counters import MessageCounters
+from services.message_service import MessageService
+from services.message_writer import MessageWriter
+
+
+@pytest.fixture
+def factory(test_engine):
+    """Session factory on the test database."""
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def user_ids(factory):
+    """{telegram_id: users.id}"""
+    async with factory() as session:
+        result = await session.execute(select(User.telegram_id, User.id))
+        return dict(result.all())
+
+
+@pytest.mark.asyncio
+async def test_store_message_maintains_counts(factory):
+    """Test per-user, per-chat and total counts follow stored messages."""
+    for tid, chat_id in [(111, 1), (111, 1), (111, 2), (222, 2)]:
+        async with factory() as session:
+            await MessageService(session).store_message(tid, chat_id, "hi")
+
+    ids = await user_ids(factory)
+    async with factory() as session:
+        service = MessageService(session)
+        assert await service.get_message_count() == 4
+        assert await service.get_message_count(user_id=ids[111]) == 3
+        assert await service.get_message_count(user_id=ids[222]) == 1
+        assert await service.get_message_count(chat_id=2) == 2
+        assert await service.get_message_count(user_id=ids[111], chat_id=2) == 1
+        assert await service.get_message_count(chat_id=404) == 0
+
+
+@pytest.mark.asyncio
+async def test_batched_writes_are_counted(factory):
+    """Test the message writer bumps counters in its flush transaction."""
+    writer = MessageWriter(factory)
+    for i in range(10):
+        await writer.write(111 + i % 2, 5, f"message {i}")
+    await writer.stop()
+
+    ids = await user_ids(factory)
+    async with factory() as session:
+        service = MessageService(session)
+        assert await service.get_message_count() == 10
+        assert await service.get_message_count(chat_id=5) == 10
+        assert await service.get_message_count(user_id=ids[111]) == 5
+
+
+@pytest.mark.asyncio
+async def test_reconcile_corrects_drift(factory):
+    """Test reconcile recomputes counters from COUNT(*)."""
+    for tid, chat_id in [(111, 1), (111, 1), (222, 2)]:
+        async with factory() as session:
+            await MessageService(session).store_message(tid, chat_id, "hi")
+    ids = await user_ids(factory)
+
+    # Drift: messages deleted behind the counters' back, a bogus counter
+    async with factory() as session:
+        await session.execute(delete(Message).where(Message.chat_id == 2))
+        session.add(MessageCounter(scope="chat", key=999, count=7))
+        await session.commit()
+
+    counters = MessageCounters()
+    async with factory() as session:
+        corrected = await counters.reconcile(session)
+
+    # chat 2, user 222 and chat 999 dropped, total fixed
+    assert corrected == 4
+    async with factory() as session:
+        service = MessageService(session)
+        assert await service.get_message_count() == 2
+        assert await service.get_message_count(chat_id=2) == 0
+        assert await service.get_message_count(chat_id=999) == 0
+        assert await service.get_message_count(user_id=ids[111]) == 2
+
+    async with factory() as session:
+        assert await counters.reconcile(session) == 0
+    assert counters.get_stats()["reconciles"] == 2
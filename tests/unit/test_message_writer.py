@@ -0,0 +1,146 @@
+"""Unit tests for the buffered message writer."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models.message import Message
+from models.user import User
+from services.message_service import MessageService
+from services.message_writer import MessageWriter
+
+
+@pytest.fixture
+def factory(test_engine):
+    """Session factory on the test database."""
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def count(factory, model):
+    """Count rows of a table."""
+    async with factory() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+@pytest.mark.asyncio
+async def test_rows_are_buffered_until_flush(factory):
+    """Test writes stay in memory and flush as one batch."""
+    writer = MessageWriter(factory)
+    writer.FLUSH_INTERVAL = 60
+
+    for i in range(5):
+        await writer.write(100 + i % 2, 200, f"message {i}")
+
+    assert len(writer) == 5
+    assert await count(factory, Message) == 0
+
+    assert await writer.flush() == 5
+    assert await count(factory, Message) == 5
+    assert await count(factory, User) == 2
+    assert writer.get_stats()["flushes"] == 1
+
+    async with factory() as session:
+        history = await MessageService(session).get_recent_messages(100, 200)
+    assert sorted(m.text for m in history) == [f"message {i}" for i in range(5)]
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_interval(factory):
+    """Test the timer flushes shortly after the first buffered row."""
+    writer = MessageWriter(factory)
+    writer.FLUSH_INTERVAL = 0.01
+
+    await writer.write(100, 200, "hi")
+    await writer.write(100, 200, "bot reply", is_bot=True)
+    await asyncio.sleep(0.2)
+
+    assert len(writer) == 0
+    assert await count(factory, Message) == 2
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_is_full(factory):
+    """Test reaching FLUSH_ROWS flushes without waiting for the timer."""
+    writer = MessageWriter(factory)
+    writer.FLUSH_INTERVAL = 60
+    writer.FLUSH_ROWS = 3
+
+    for i in range(3):
+        await writer.write(100, 200, f"message {i}")
+    await asyncio.sleep(0.1)
+
+    assert await count(factory, Message) == 3
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_durable_write_waits_for_commit(factory):
+    """Test durable writes return only once their row is committed."""
+    writer = MessageWriter(factory)
+    writer.FLUSH_INTERVAL = 60
+
+    await asyncio.gather(
+        *(writer.write(100, 200, f"m{i}", durable=True) for i in range(10))
+    )
+
+    # Group commit: no waiting for the interval, concurrent rows share flushes
+    assert await count(factory, Message) == 10
+    assert writer.get_stats()["flushes"] < 10
+
+
+@pytest.mark.asyncio
+async def test_existing_user_is_reused(factory):
+    """Test rows map to the user created by store_message."""
+    async with factory() as session:
+        await MessageService(session).store_message(100, 200, "earlier")
+
+    writer = MessageWriter(factory)
+    await writer.write(100, 200, "later")
+    await writer.stop()
+
+    assert await count(factory, User) == 1
+    assert await count(factory, Message) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_flush(factory, monkeypatch):
+    """Test durable writers see the error and buffered rows are retried."""
+    writer = MessageWriter(factory)
+    writer.FLUSH_INTERVAL = 60
+    real_write = writer._write
+
+    async def broken(rows):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(writer, "_write", broken)
+    await writer.write(100, 200, "buffered")
+    durable = asyncio.create_task(writer.write(100, 200, "durable", durable=True))
+    await asyncio.sleep(0)
+
+    assert await writer.flush() == 0
+    with pytest.raises(RuntimeError):
+        await durable
+    assert len(writer) == 1
+
+    monkeypatch.setattr(writer, "_write", real_write)
+    await writer.stop()
+    async with factory() as session:
+        texts = await session.scalars(select(Message.text))
+        assert list(texts) == ["buffered"]
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_buffer(factory):
+    """Test shutdown writes everything still buffered."""
+    writer = MessageWriter(factory)
+    writer.FLUSH_INTERVAL = 60
+
+    for i in range(20):
+        await writer.write(i, 200, "bye")
+    await writer.stop()
+
+    assert len(writer) == 0
+    assert await count(factory, Message) == 20
@@ -0,0 +1,77 @@
+"""Unit tests for in-process latency metrics."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from services.metrics import LatencyMetrics, TokenUsage
+
+
+def test_summary_percentiles():
+    """Test count, mean and percentiles in milliseconds."""
+    metrics = LatencyMetrics()
+    for ms in range(1, 101):
+        metrics.observe("tool.create_memory", ms / 1000)
+
+    summary = metrics.summary()["tool.create_memory"]
+    assert summary == {
+        "count": 100,
+        "mean_ms": 50.5,
+        "p50_ms": 50.0,
+        "p95_ms": 96.0,
+        "p99_ms": 100.0,
+        "max_ms": 100.0,
+    }
+    assert metrics.percentile("tool.create_memory", 0.5) == 0.051
+    assert metrics.percentile("missing", 0.5) is None
+    assert metrics.window_size("tool.create_memory") == 100
+
+
+def test_window_and_timer(monkeypatch):
+    """Test bounded window and that failing blocks are timed too."""
+    metrics = LatencyMetrics()
+    monkeypatch.setattr(metrics, "WINDOW", 2)
+    for seconds in (1.0, 0.002, 0.004):
+        metrics.observe("llm", seconds)
+
+    with pytest.raises(RuntimeError):
+        with metrics.timer("failing"):
+            raise RuntimeError("boom")
+
+    summary = metrics.summary()
+    assert summary["llm"]["count"] == 3
+    assert summary["llm"]["max_ms"] == 4.0
+    assert summary["failing"]["count"] == 1
+
+    metrics.reset()
+    assert metrics.summary() == {}
+
+
+def test_token_usage_cached_ratio():
+    """Test per-model totals including provider-cached prompt tokens."""
+    usage = TokenUsage()
+    usage.record(
+        "gpt-4o-mini",
+        SimpleNamespace(
+            prompt_tokens=2000,
+            completion_tokens=50,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+        ),
+    )
+    usage.record(
+        "gpt-4o-mini",
+        SimpleNamespace(
+            prompt_tokens=2000, completion_tokens=30, prompt_tokens_details=None
+        ),
+    )
+    usage.record("gpt-4o-mini", None)
+
+    assert usage.summary() == {
+        "gpt-4o-mini": {
+            "requests": 2,
+            "prompt_tokens": 4000,
+            "cached_tokens": 1536,
+            "completion_tokens": 80,
+            "cached_ratio": 0.384,
+        }
+    }
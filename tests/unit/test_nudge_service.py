@@ -24,18 +24,18 @@ def nudge_service(mock_env_bot_token, mock_env_admin_ids):
     """Create a NudgeService instance for testing."""
     with (
         patch("services.nudge_service.Bot") as mock_bot_class,
-        patch("services.nudge_service.LLMService") as mock_llm_class,
+        patch("services.nudge_service.get_llm_service") as mock_llm_class,
     ):
         # Mock Bot class to return a mock instance
         mock_bot_instance = AsyncMock()
         mock_bot_class.return_value = mock_bot_instance
 
-        # Mock LLMService class to return a mock instance
+        # Mock get_llm_service to return a mock instance
         mock_llm_instance = AsyncMock()
         mock_llm_class.return_value = mock_llm_instance
 
         service = NudgeService()
-        # Bot and LLMService are already mocked by the patches above
+        # Bot and the LLM service are already mocked by the patches above
         yield service
 
 
@@ -272,7 +272,7 @@ def test_get_admin_ids_single_id(mock_env_bot_token, monkeypatch):
 
     with (
         patch("services.nudge_service.Bot"),
-        patch("services.nudge_service.LLMService"),
+        patch("services.nudge_service.get_llm_service"),
     ):
         service = NudgeService()
         admin_ids = service._get_admin_ids()
@@ -286,7 +286,7 @@ def test_get_admin_ids_multiple_ids(mock_env_bot_token, monkeypatch):
 
     with (
         patch("services.nudge_service.Bot"),
-        patch("services.nudge_service.LLMService"),
+        patch("services.nudge_service.get_llm_service"),
     ):
         service = NudgeService()
         admin_ids = service._get_admin_ids()
@@ -300,7 +300,7 @@ def test_get_admin_ids_with_spaces(mock_env_bot_token, monkeypatch):
 
     with (
         patch("services.nudge_service.Bot"),
-        patch("services.nudge_service.LLMService"),
+        patch("services.nudge_service.get_llm_service"),
     ):
         service = NudgeService()
         admin_ids = service._get_admin_ids()
@@ -314,7 +314,7 @@ def test_get_admin_ids_missing_env_var(mock_env_bot_token, monkeypatch):
 
     with (
         patch("services.nudge_service.Bot"),
-        patch("services.nudge_service.LLMService"),
+        patch("services.nudge_service.get_llm_service"),
     ):
         service = NudgeService()
 
@@ -328,7 +328,7 @@ def test_get_admin_ids_invalid_format(mock_env_bot_token, monkeypatch):
 
     with (
         patch("services.nudge_service.Bot"),
-        patch("services.nudge_service.LLMService"),
+        patch("services.nudge_service.get_llm_service"),
     ):
         service = NudgeService()
 
@@ -348,7 +348,7 @@ def test_nudge_service_init_success(mock_env_bot_token):
     """Test NudgeService initializes successfully with BOT_TOKEN."""
     with (
         patch("services.nudge_service.Bot"),
-        patch("services.nudge_service.LLMService"),
+        patch("services.nudge_service.get_llm_service"),
     ):
         service = NudgeService()
         assert service.bot_token == "test_bot_token"
@@ -0,0 +1,86 @@
+"""Tests for the shared pooled OpenAI client."""
+
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from services import openai_client
+from services.openai_client import (
+    close_openai_clients,
+    create_openai_client,
+    get_openai_client,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_clients():
+    """Isolate the process-wide client registry."""
+    with patch.dict(openai_client._clients, clear=True):
+        yield
+
+
+def test_client_is_shared_per_key_and_base_url():
+    """Test that one client is reused for the same key and endpoint."""
+    with patch.dict(os.environ, {}, clear=False):
+        os.environ.pop("OPENAI_BASE_URL", None)
+        first = get_openai_client("key-a")
+        assert get_openai_client("key-a") is first
+        assert get_openai_client("key-b") is not first
+        assert get_openai_client("key-a", "http://localhost:1/v1") is not first
+
+
+def test_client_uses_env_defaults():
+    """Test that the key and base URL fall back to the environment."""
+    with patch.dict(
+        os.environ,
+        {"OPENAI_API_KEY": "env-key", "OPENAI_BASE_URL": "http://localhost:2/v1"},
+    ):
+        client = get_openai_client()
+
+    assert client.api_key == "env-key"
+    assert str(client.base_url).startswith("http://localhost:2/v1")
+
+
+def test_client_requires_api_key():
+    """Test that a missing key raises ValueError."""
+    with patch.dict(os.environ, {}, clear=True):
+        with pytest.raises(ValueError):
+            get_openai_client()
+
+
+def test_client_applies_pool_settings():
+    """Test that the configured limits and retries reach the client."""
+    httpx = pytest.importorskip("httpx")
+    with (
+        patch.object(openai_client, "MAX_RETRIES", 5),
+        patch.object(openai_client, "CONNECT_TIMEOUT", 3.0),
+        patch("services.openai_client.DefaultAsyncHttpxClient") as http_client,
+        patch("services.openai_client.AsyncOpenAI") as async_openai,
+    ):
+        create_openai_client("key")
+
+    kwargs = http_client.call_args.kwargs
+    assert isinstance(kwargs["limits"], httpx.Limits)
+    assert kwargs["limits"].max_connections == openai_client.MAX_CONNECTIONS
+    assert kwargs["timeout"].connect == 3.0
+    assert async_openai.call_args.kwargs["max_retries"] == 5
+
+
+def test_http2_setting():
+    """Test explicit HTTP/2 on/off overrides auto-detection."""
+    with patch.object(openai_client, "HTTP2", "true"):
+        assert openai_client.http2_enabled() is True
+    with patch.object(openai_client, "HTTP2", "false"):
+        assert openai_client.http2_enabled() is False
+
+
+@pytest.mark.asyncio
+async def test_close_clears_registry():
+    """Test that closing shuts every client down and forgets it."""
+    client = get_openai_client("key-a")
+    with patch.object(client, "close", new=AsyncMock()) as close:
+        await close_openai_clients()
+
+    close.assert_awaited_once()
+    assert get_openai_client("key-a") is not client
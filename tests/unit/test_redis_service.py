@@ -0,0 +1,212 @@
+"""Unit tests for RedisService local cache tier."""
+
+import time
+
+import pytest
+
+from services.redis_service import LocalCache, RedisService
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for redis.asyncio (text and binary clients)."""
+
+    def __init__(self):
+        self.data: dict[str, str] = {}
+        self.expires: dict[str, int] = {}
+        self.gets = 0
+        self.published: list[tuple[str, str]] = []
+
+    async def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value if isinstance(value, bytes) else str(value)
+        if ex is not None:
+            self.expires[key] = ex
+
+    async def getrange(self, key, start, end):
+        return self.data.get(key, b"")[start : end + 1]
+
+    async def pttl(self, key):
+        if key not in self.data:
+            return -2
+        return self.expires[key] * 1000 if key in self.expires else -1
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+class FakePipeline:
+    """Queues commands and runs them on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append(getattr(self.redis, name)(*args))
+
+        return queue
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+
+@pytest.fixture
+def service():
+    """RedisService with a fake connection and a small local tier."""
+    service = RedisService()
+    service.redis = FakeRedis()
+    service.binary = service.redis
+    service.local = LocalCache(max_entries=2, ttl=30)
+    return service
+
+
+def test_local_tier_is_opt_in(monkeypatch):
+    """Test the local tier is off unless REDIS_LOCAL_CACHE_SIZE is set."""
+    monkeypatch.delenv("REDIS_LOCAL_CACHE_SIZE", raising=False)
+    assert RedisService().local is None
+
+    monkeypatch.setenv("REDIS_LOCAL_CACHE_SIZE", "16")
+    assert RedisService().local is not None
+
+
+def test_local_cache_lru_and_ttl(monkeypatch):
+    """Test LRU eviction and TTL expiry."""
+    cache = LocalCache(max_entries=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # a is now most recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+
+    now = time.monotonic()
+    monkeypatch.setattr("services.redis_service.time.monotonic", lambda: now + 11)
+    assert cache.get("a") == (False, None)
+
+
+def test_local_cache_stats_per_prefix():
+    """Test hit/miss counters are grouped by key family."""
+    cache = LocalCache(max_entries=10, ttl=10)
+    cache.set("memory:1", {})
+    cache.get("memory:1")
+    cache.get("memory:2")
+    cache.get("memory:search:1:0:abc")
+    cache.get("lessons:all")
+
+    stats = cache.get_stats()
+    assert stats["memory"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+    assert stats["memory:search"]["misses"] == 1
+    assert stats["lessons:all"]["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_json_served_from_local_tier(service):
+    """Test that repeated reads skip the network round-trip."""
+    await service.set_json("lessons:all", ["be kind"])
+
+    assert await service.get_json("lessons:all") == ["be kind"]
+    assert await service.get_json("lessons:all") == ["be kind"]
+    assert service.redis.gets == 1
+    assert service.get_cache_stats()["prefixes"]["lessons:all"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_local_tier_and_publish(service):
+    """Test that set and delete drop the local copy and notify other processes."""
+    await service.set_json("memory:1", {"v": 1})
+    await service.get_json("memory:1")
+
+    await service.set_json("memory:1", {"v": 2})
+    assert await service.get_json("memory:1") == {"v": 2}
+
+    await service.delete("memory:1")
+    assert await service.get_json("memory:1") is None
+
+    channels = {channel for channel, _ in service.redis.published}
+    assert channels == {RedisService.INVALIDATION_CHANNEL}
+    assert service.redis.published[-1][1] == f"{service.instance_id}:memory:1"
+
+
+@pytest.mark.asyncio
+async def test_invalidation_from_other_process(service):
+    """Test that invalidations from other replicas drop the local copy."""
+    await service.set_json("memory:search:1:0:abc", [[1, 0.5]])
+    await service.get_json("memory:search:1:0:abc")
+
+    # Own messages are ignored
+    service.handle_invalidation(f"{service.instance_id}:memory:search:1:0:abc")
+    assert len(service.local) == 1
+
+    service.handle_invalidation("other-pod:memory:search:1:0:abc")
+    assert len(service.local) == 0
+
+
+@pytest.mark.asyncio
+async def test_read_racing_invalidation_is_not_cached(service):
+    """Test that a value invalidated during the GET is not stored locally."""
+    await service.set_json("memory:1", {"v": 1})
+    original_get = service.redis.get
+
+    async def racing_get(key):
+        value = await original_get(key)
+        service.handle_invalidation("other-pod:memory:1")
+        return value
+
+    service.redis.get = racing_get
+    assert await service.get_json("memory:1") == {"v": 1}
+    assert len(service.local) == 0
+
+
+@pytest.mark.asyncio
+async def test_binary_values(service):
+    """Test bytes round-trip, local tier and GETRANGE slices."""
+    await service.set_bytes("memory:1", b"\x01\x00payload")
+
+    assert await service.get_range("memory:1", 0, 1) == b"\x01\x00"
+    assert await service.get_bytes("memory:1") == b"\x01\x00payload"
+    assert await service.get_bytes("memory:1") == b"\x01\x00payload"
+    assert service.redis.gets == 1
+    # Served from the local copy once it is there
+    assert await service.get_range("memory:1", 2, 4) == b"pay"
+    # Only the full reads are counted in the hit ratio
+    stats = service.get_cache_stats()["prefixes"]["memory"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_immutable_keys_are_not_invalidated(service):
+    """Test writes of generation-keyed or content-addressed keys publish nothing."""
+    await service.set_json("memory:search:1:0:abc", [[1, 0.5]])
+    await service.set_bytes("memory:search:1:0:def", b"\x01")
+    await service.set_json("llm:cache:0123abcd", {"content": "ok"})
+    assert service.redis.published == []
+
+    await service.set_json("memory:1", {"v": 1})
+    assert [message for _, message in service.redis.published] == [
+        f"{service.instance_id}:memory:1"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_local_ttl_capped_at_key_expiry(service, monkeypatch):
+    """Test a local copy doesn't outlive its Redis key."""
+    await service.set_json("memory:search:1:0:abc", [[1, 0.5]], expire=5)
+    await service.set_json("lessons:all", ["be kind"])
+    await service.get_json("memory:search:1:0:abc")
+    await service.get_json("lessons:all")
+
+    now = time.monotonic()
+    monkeypatch.setattr("services.redis_service.time.monotonic", lambda: now + 6)
+    assert "memory:search:1:0:abc" not in service.local
+    assert "lessons:all" in service.local
@@ -0,0 +1,157 @@
+"""Unit tests for LLM request deadlines, retries and hedging."""
+
+import asyncio
+
+import openai
+import pytest
+
+from services.metrics import latency_metrics
+from services.request_executor import RequestExecutor, _parse_deadlines
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    """No real backoff sleeps and clean latency samples."""
+    monkeypatch.setattr(RequestExecutor, "BACKOFF_BASE", 0.001)
+    latency_metrics.reset()
+    yield
+    latency_metrics.reset()
+
+
+def _rate_limit_error():
+    return openai.RateLimitError.__new__(openai.RateLimitError)
+
+
+@pytest.mark.asyncio
+async def test_retries_retryable_errors():
+    """Test a retryable error is retried and the result returned."""
+    executor = RequestExecutor(deadlines={}, hedge_methods=[])
+    attempts = []
+
+    async def call(timeout):
+        attempts.append(timeout)
+        if len(attempts) < 3:
+            raise _rate_limit_error()
+        return "ok"
+
+    assert await executor.run("get_response", call) == "ok"
+    assert len(attempts) == 3
+    stats = executor.get_stats()["get_response"]
+    assert stats["retries"] == 2
+    assert stats["errors"] == 0
+    assert stats["p50_ms"] is not None
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_retries(monkeypatch):
+    """Test the last error is raised once retries run out."""
+    monkeypatch.setattr(RequestExecutor, "RETRIES", 1)
+    executor = RequestExecutor(deadlines={}, hedge_methods=[])
+    attempts = 0
+
+    async def call(timeout):
+        nonlocal attempts
+        attempts += 1
+        raise _rate_limit_error()
+
+    with pytest.raises(openai.RateLimitError):
+        await executor.run("get_response", call)
+    assert attempts == 2
+    assert executor.get_stats()["get_response"]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_raise_immediately():
+    """Test other errors are not retried."""
+    executor = RequestExecutor(deadlines={}, hedge_methods=[])
+    attempts = 0
+
+    async def call(timeout):
+        nonlocal attempts
+        attempts += 1
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await executor.run("get_response", call)
+    assert attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_total_time():
+    """Test slow attempts are cut off at the method's deadline."""
+    executor = RequestExecutor(deadlines={"slow": 0.1}, hedge_methods=[])
+    timeouts = []
+
+    async def call(timeout):
+        timeouts.append(timeout)
+        await asyncio.sleep(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.run("slow", call)
+    assert timeouts[0] <= 0.1
+    assert executor.get_stats()["slow"]["deadline_exceeded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_wins_when_primary_is_slow(monkeypatch):
+    """Test a second request after the p95 delay can finish first."""
+    monkeypatch.setattr(RequestExecutor, "HEDGE_MIN_DELAY", 0.01)
+    monkeypatch.setattr(RequestExecutor, "HEDGE_MIN_SAMPLES", 5)
+    executor = RequestExecutor(deadlines={}, hedge_methods=["get_response"])
+    for _ in range(10):
+        latency_metrics.observe("llm.request.get_response", 0.02)
+
+    calls = 0
+    cancelled = []
+
+    async def call(timeout):
+        nonlocal calls
+        calls += 1
+        delay = 1.0 if calls == 1 else 0.01
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(calls)
+            raise
+        return f"attempt {calls}"
+
+    assert await executor.run("get_response", call) == "attempt 2"
+    await asyncio.sleep(0)
+    stats = executor.get_stats()["get_response"]
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+    assert cancelled == [2]
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_enough_samples_or_for_streams(monkeypatch):
+    """Test hedging needs latency history and is skipped for streams."""
+    monkeypatch.setattr(RequestExecutor, "HEDGE_MIN_SAMPLES", 5)
+    executor = RequestExecutor(deadlines={}, hedge_methods=["get_response"])
+    assert executor.hedge_delay("get_response") is None
+
+    for _ in range(10):
+        latency_metrics.observe("llm.request.get_response", 2.0)
+    assert executor.hedge_delay("get_response") == 2.0
+    assert executor.hedge_delay("enrich_memory") is None
+
+    calls = 0
+
+    async def call(timeout):
+        nonlocal calls
+        calls += 1
+        return "stream"
+
+    await executor.run("get_response", call, hedge=False)
+    assert calls == 1
+
+
+def test_parse_deadlines():
+    """Test per-method deadline overrides parsing."""
+    assert _parse_deadlines("get_response=25, enrich_memory=15,bad=x,") == {
+        "get_response": 25.0,
+        "enrich_memory": 15.0,
+    }
+    executor = RequestExecutor(deadlines={"get_response": 25.0}, hedge_methods=[])
+    assert executor.deadline_for("get_response") == 25.0
+    assert executor.deadline_for("other") == RequestExecutor.DEADLINE
@@ -0,0 +1,95 @@
+"""Unit tests for request coalescing."""
+
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_identical_calls_share_one_request():
+    """Test concurrent calls with one key run the request once."""
+    group = SingleFlight()
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "joke"
+
+    results = await asyncio.gather(*(group.do("joke", "k", request) for _ in range(5)))
+
+    assert results == ["joke"] * 5
+    assert calls == 1
+    assert group.get_stats()["joke"] == {
+        "calls": 5,
+        "coalesced": 4,
+        "coalesced_ratio": 0.8,
+    }
+    assert group.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_finished_call_is_not_reused():
+    """Test sequential calls are not coalesced (no caching)."""
+    group = SingleFlight()
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await group.do("x", "k", request) == 1
+    assert await group.do("x", "k", request) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    """Test a failed call raises in all coalesced callers."""
+    group = SingleFlight()
+
+    async def request():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        group.do("x", "k", request),
+        group.do("x", "k", request),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    """Test the shared call survives its first caller being cancelled."""
+    group = SingleFlight()
+
+    async def request():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    first = asyncio.ensure_future(group.do("x", "k", request))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(group.do("x", "k", request))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "ok"
+
+
+def test_key_normalizes_request():
+    """Test key ignores key order, None values and surrounding whitespace."""
+    a = {
+        "model": "m",
+        "messages": [{"role": "user", "content": "Tell a joke "}],
+        "tools": None,
+    }
+    b = {"messages": [{"content": "Tell a joke", "role": "user"}], "model": "m"}
+
+    assert SingleFlight.key(a) == SingleFlight.key(b)
+    assert SingleFlight.key(a) != SingleFlight.key({**b, "model": "other"})
@@ -0,0 +1,98 @@
+"""Unit tests for progressive Telegram replies."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+
+from services.metrics import latency_metrics
+from services.streaming_reply import StreamingReply, preview_text
+
+
+@pytest.fixture
+def message():
+    """Incoming private-chat message whose reply can be edited."""
+    message = MagicMock()
+    message.chat.type = "private"
+    message.sent = MagicMock()
+    message.sent.edit_text = AsyncMock()
+    message.reply = AsyncMock(return_value=message.sent)
+    return message
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.perf_counter."""
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr("services.streaming_reply.time.perf_counter", lambda: clock.now)
+    return clock
+
+
+def test_preview_text_strips_partial_html():
+    """Test previews drop complete and unfinished tags."""
+    assert preview_text("<b>Nya</b> &amp; hi <i") == "Nya & hi "
+
+
+@pytest.mark.asyncio
+async def test_feed_sends_first_chunk_then_throttles_edits(message, clock):
+    """Test first chunk is replied at once and edits respect the interval."""
+    latency_metrics.reset()
+    reply = StreamingReply(message, started_at=99.5)
+
+    await reply.feed("<b>Nya")
+    message.reply.assert_awaited_once_with("Nya", parse_mode=None)
+    assert latency_metrics.summary()["reply.first_visible_token"]["max_ms"] == 500.0
+
+    clock.now += 0.5
+    await reply.feed("~ hello")
+    message.sent.edit_text.assert_not_awaited()  # within interval
+
+    clock.now += 0.6
+    await reply.feed(" there")
+    message.sent.edit_text.assert_awaited_once_with("Nya~ hello there", parse_mode=None)
+
+    text = await reply.finish()
+    assert text == "<b>Nya~ hello there"
+    message.sent.edit_text.assert_awaited_with("<b>Nya~ hello there", parse_mode="HTML")
+    assert message.reply.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_finish_falls_back_to_plain_text(message, clock):
+    """Test bad HTML in the final edit is shown as plain text."""
+    reply = StreamingReply(message)
+    await reply.feed("a < b")
+    message.sent.edit_text = AsyncMock(
+        side_effect=[
+            TelegramBadRequest(MagicMock(), "Bad Request: can't parse entities"),
+            None,
+        ]
+    )
+
+    await reply.finish()
+
+    assert message.sent.edit_text.await_args.kwargs["parse_mode"] is None
+
+
+@pytest.mark.asyncio
+async def test_finish_without_stream_sends_fallback(message, clock):
+    """Test an empty stream still produces one HTML reply."""
+    reply = StreamingReply(message)
+    text = await reply.finish(fallback="Nya~")
+
+    assert text == "Nya~"
+    message.reply.assert_awaited_once_with("Nya~", parse_mode="HTML")
+
+
+@pytest.mark.asyncio
+async def test_replaced_text_is_not_kept(message, clock):
+    """Test replace=True drops the text streamed so far."""
+    reply = StreamingReply(message)
+    await reply.feed("Let me check... ")
+    await reply.feed("", replace=True)
+    clock.now += 2
+    await reply.feed("Found it!")
+
+    message.sent.edit_text.assert_awaited_once_with("Found it!", parse_mode=None)
+    assert await reply.finish() == "Found it!"
@@ -0,0 +1,192 @@
+"""Unit tests for concurrent tool call execution."""
+
+import asyncio
+import contextlib
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from tools import tool_executor
+from tools.tool_executor import execute_tool_calls
+
+
+def _call(call_id, name, **arguments):
+    """Tool call in OpenAI request format."""
+    return {
+        "id": call_id,
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(arguments)},
+    }
+
+
+@contextlib.asynccontextmanager
+async def _session():
+    yield None
+
+
+@pytest.fixture
+def fake_execute():
+    """Replace ToolExecutor.execute with a sleep of arguments["delay"]."""
+    log = []
+
+    async def execute(self, tool_name, arguments, user_id):
+        log.append(("start", tool_name, arguments.get("n")))
+        await asyncio.sleep(arguments.get("delay", 0))
+        log.append(("end", tool_name, arguments.get("n")))
+        return {"success": True, "tool": tool_name, "n": arguments.get("n")}
+
+    with (
+        patch("tools.tool_executor.get_llm_service"),
+        patch.object(tool_executor.ToolExecutor, "execute", execute),
+    ):
+        yield log
+
+
+@pytest.mark.asyncio
+async def test_reads_run_concurrently_in_order(fake_execute):
+    """Test independent calls overlap and results keep call order."""
+    calls = [
+        _call("a", "web_search", n=1, delay=0.2),
+        _call("b", "search_memories", n=2, delay=0.2),
+        _call("c", "get_memory", n=3, delay=0.1),
+    ]
+
+    started = time.perf_counter()
+    results = await execute_tool_calls(calls, 1, session_factory=_session)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.35
+    assert [r["tool_call_id"] for r in results] == ["a", "b", "c"]
+    assert [r["result"]["n"] for r in results] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_writes_keep_order(fake_execute):
+    """Test state-changing calls run one at a time in call order."""
+    calls = [
+        _call("a", "create_memory", n=1, delay=0.1),
+        _call("b", "create_memory", n=2, delay=0),
+    ]
+
+    await execute_tool_calls(calls, 1, session_factory=_session)
+
+    assert fake_execute == [
+        ("start", "create_memory", 1),
+        ("end", "create_memory", 1),
+        ("start", "create_memory", 2),
+        ("end", "create_memory", 2),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_reads_wait_for_writes(fake_execute):
+    """Test state reads start after the round's writes; web search doesn't wait."""
+    calls = [
+        _call("a", "search_memories", n=1),
+        _call("b", "create_memory", n=2, delay=0.1),
+        _call("c", "web_search", n=3, delay=0.05),
+    ]
+
+    results = await execute_tool_calls(calls, 1, session_factory=_session)
+
+    assert fake_execute.index(("end", "create_memory", 2)) < fake_execute.index(
+        ("start", "search_memories", 1)
+    )
+    assert fake_execute.index(("start", "web_search", 3)) < fake_execute.index(
+        ("end", "create_memory", 2)
+    )
+    assert [r["tool_call_id"] for r in results] == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_writes_are_not_timed_out(fake_execute, monkeypatch):
+    """Test a slow write finishes instead of being cancelled mid-transaction."""
+    monkeypatch.setattr(tool_executor, "TOOL_TIMEOUT", 0.05)
+
+    results = await execute_tool_calls(
+        [_call("a", "create_memory", n=1, delay=0.1)], 1, session_factory=_session
+    )
+
+    assert results[0]["result"]["success"] is True
+    assert ("end", "create_memory", 1) in fake_execute
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_bad_arguments(fake_execute, monkeypatch):
+    """Test a slow call times out without affecting the others."""
+    monkeypatch.setattr(tool_executor, "TOOL_TIMEOUT", 0.05)
+    slow = _call("slow", "web_search", delay=1)
+    broken = {
+        "id": "broken",
+        "type": "function",
+        "function": {"name": "get_memory", "arguments": "{not json"},
+    }
+
+    results = await execute_tool_calls([slow, broken], 1, session_factory=_session)
+
+    assert results[0]["result"] == {
+        "success": False,
+        "error": "Tool web_search timed out after 0.05s",
+    }
+    assert results[1]["result"]["success"] is True
+
+
+@pytest.mark.asyncio
+async def test_timeout_argument_is_capped(fake_execute):
+    """Test a caller's shorter limit (time left in the turn) applies."""
+    slow = _call("slow", "web_search", delay=1)
+
+    results = await execute_tool_calls(
+        [slow], 1, session_factory=_session, timeout=0.05
+    )
+
+    assert results[0]["result"]["error"] == "Tool web_search timed out after 0.05s"
+
+
+class _BlockingDDGS:
+    """DDGS stand-in whose search blocks the calling thread like the real one."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def text(self, query, max_results):
+        time.sleep(0.3)
+        return [{"title": query, "link": "https://example.com", "body": ""}]
+
+
+@pytest.mark.asyncio
+async def test_blocking_web_search_does_not_stall_the_round(fake_execute, monkeypatch):
+    """Test a blocking web search overlaps other calls and can time out."""
+    fake = tool_executor.ToolExecutor.execute
+
+    async def execute(self, tool_name, arguments, user_id):
+        if tool_name == "web_search":
+            return await self._execute_web_search(arguments)
+        return await fake(self, tool_name, arguments, user_id)
+
+    monkeypatch.setattr(tool_executor.ToolExecutor, "execute", execute)
+    monkeypatch.setattr("duckduckgo_search.DDGS", _BlockingDDGS)
+    calls = [
+        _call("a", "web_search", query="tea"),
+        _call("b", "search_memories", n=2, delay=0.2),
+    ]
+
+    started = time.perf_counter()
+    results = await execute_tool_calls(calls, 1, session_factory=_session)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.45
+    assert results[0]["result"]["results"][0]["title"] == "tea"
+    assert results[1]["result"]["n"] == 2
+
+    monkeypatch.setattr(tool_executor, "TOOL_TIMEOUT", 0.05)
+    started = time.perf_counter()
+    results = await execute_tool_calls(calls[:1], 1, session_factory=_session)
+
+    assert time.perf_counter() - started < 0.2
+    assert results[0]["result"]["error"] == "Tool web_search timed out after 0.05s"
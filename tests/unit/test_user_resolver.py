@@ -0,0 +1,181 @@
+"""Unit tests for telegram_id -> user id resolution."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models.user import User
+from services.message_service import MessageService
+from services.user_resolver import UserResolver
+
+
+@pytest.fixture
+def factory(test_engine):
+    """Session factory on the test database."""
+    return async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def users(factory):
+    """All users as {telegram_id: User}."""
+    async with factory() as session:
+        result = await session.scalars(select(User))
+        return {user.telegram_id: user for user in result}
+
+
+@pytest.mark.asyncio
+async def test_creates_missing_user(factory):
+    """Test an unknown Telegram ID gets a user row."""
+    resolver = UserResolver()
+    async with factory() as session:
+        user_id = await resolver.resolve(session, 111)
+        await session.commit()
+
+    stored = await users(factory)
+    assert stored[111].id == user_id
+    assert resolver.get_stats()["created"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_after_commit(factory):
+    """Test a remembered or looked-up mapping needs no query."""
+    resolver = UserResolver()
+    async with factory() as session:
+        created = await resolver.resolve_many(session, [111, 222])
+        await session.commit()
+    await resolver.remember(created)
+
+    async with factory() as session:
+        assert await resolver.resolve_many(session, [111, 222]) == created
+    assert resolver.get_stats()["db_lookups"] == 1
+
+    # A fresh resolver looks the users up once, then caches them
+    other = UserResolver()
+    async with factory() as session:
+        assert await other.resolve(session, 111) == created[111]
+        assert await other.resolve(session, 111) == created[111]
+    assert other.get_stats()["db_lookups"] == 1
+    assert other.get_stats()["created"] == 0
+
+
+@pytest.mark.asyncio
+async def test_uncommitted_user_is_not_cached(factory):
+    """Test a rolled back creation doesn't leave a stale mapping."""
+    resolver = UserResolver()
+    async with factory() as session:
+        await resolver.resolve(session, 111)
+        await session.rollback()
+
+    async with factory() as session:
+        await resolver.resolve(session, 111)
+        await session.commit()
+
+    assert len(await users(factory)) == 1
+    assert resolver.get_stats()["created"] == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_creation_yields_one_user(factory):
+    """Test racing resolvers converge on a single row."""
+    resolvers = [UserResolver() for _ in range(5)]
+
+    async def resolve(resolver):
+        async with factory() as session:
+            user_id = await resolver.resolve(session, 111)
+            await session.commit()
+            return user_id
+
+    ids = await asyncio.gather(*(resolve(r) for r in resolvers))
+    # A resolver that lost the insert race reads the winner's row
+    async with factory() as session:
+        ids.append(await UserResolver().resolve(session, 111))
+
+    assert len(set(ids)) == 1
+    assert len(await users(factory)) == 1
+
+
+@pytest.mark.asyncio
+async def test_conflicting_insert_reads_existing_row(factory):
+    """Test ON CONFLICT DO NOTHING falls back to the existing row."""
+    resolver = UserResolver()
+    async with factory() as session:
+        session.add(User(telegram_id=111))
+        await session.commit()
+
+    async with factory() as session:
+        # Pretend the SELECT missed (row inserted by someone else meanwhile)
+        created = await resolver._create(session, [111, 222])
+        await session.commit()
+
+    stored = await users(factory)
+    assert created == {111: stored[111].id, 222: stored[222].id}
+    assert resolver.get_stats()["conflicts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_profiles_are_written_in_batches(factory):
+    """Test recorded names reach the users table on flush, once."""
+    resolver = UserResolver()
+    async with factory() as session:
+        await resolver.resolve_many(session, [111, 222])
+        await session.commit()
+
+    resolver.record_profile(111, "kawaii", "Kawa", "Ii")
+    resolver.record_profile(222, None, "Nya")
+    async with factory() as session:
+        assert await resolver.flush_profiles(session) == 2
+
+    stored = await users(factory)
+    assert (stored[111].username, stored[111].first_name) == ("kawaii", "Kawa")
+    assert stored[222].first_name == "Nya"
+
+    # Unchanged names are not written again
+    resolver.record_profile(111, "kawaii", "Kawa", "Ii")
+    assert resolver.get_stats()["pending_profiles"] == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_before_user_exists_keeps_profile(factory):
+    """Test a profile flushed before its user row is written on a later flush."""
+    resolver = UserResolver()
+    resolver.record_profile(111, "kawaii", "Kawa")
+    async with factory() as session:
+        assert await resolver.flush_profiles(session) == 0
+    assert resolver.get_stats()["pending_profiles"] == 1
+
+    # Not written yet, so recording the same names again is not skipped
+    resolver.record_profile(111, "kawaii", "Kawa")
+    assert resolver.get_stats()["pending_profiles"] == 1
+
+    async with factory() as session:
+        session.add(User(telegram_id=111))
+        await session.commit()
+    async with factory() as session:
+        assert await resolver.flush_profiles(session) == 1
+
+    assert (await users(factory))[111].username == "kawaii"
+    assert resolver.get_stats()["pending_profiles"] == 0
+
+
+@pytest.mark.asyncio
+async def test_new_user_gets_recorded_profile(factory):
+    """Test a user created after its first update has its names."""
+    resolver = UserResolver()
+    resolver.record_profile(111, "kawaii", "Kawa")
+    async with factory() as session:
+        await resolver.resolve(session, 111)
+        await session.commit()
+
+    assert (await users(factory))[111].username == "kawaii"
+
+
+@pytest.mark.asyncio
+async def test_store_message_uses_resolver(factory):
+    """Test repeated stores don't duplicate users."""
+    for text in ("one", "two"):
+        async with factory() as session:
+            await MessageService(session).store_message(111, 222, text)
+
+    async with factory() as session:
+        assert await session.scalar(select(func.count()).select_from(User)) == 1
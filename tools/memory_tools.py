@@ -73,6 +73,13 @@ MEMORY_TOOLS = [
                         "items": {"type": "string"},
                         "description": "Filter by categories (optional)",
                     },
+                    "tags": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": (
+                            "Only memories with at least one of these tags (optional)"
+                        ),
+                    },
                     "limit": {
                         "type": "integer",
                         "description": "Maximum memories to return (default 10)",
@@ -109,4 +116,37 @@ MEMORY_TOOLS = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_related_memories",
+            "description": (
+                "Get memories connected to known memories through memory "
+                "links, most related first. Use this after search_memories or "
+                "get_memory to recall associated context."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "memory_ids": {
+                        "type": "array",
+                        "items": {"type": "integer"},
+                        "description": "IDs of the memories to start from",
+                    },
+                    "hops": {
+                        "type": "integer",
+                        "description": (
+                            "Only follow links up to this many steps (optional; "
+                            "by default memories are ranked by link strength)"
+                        ),
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum memories to return (default 10)",
+                    },
+                },
+                "required": ["memory_ids"],
+            },
+        },
+    },
 ]
@@ -4,19 +4,35 @@ This executor processes tool calls from the LLM and returns results.
 Includes role-based access control for admin-only tools.
 """
 
+import asyncio
+import json
 import logging
+import os
 import random
-from typing import Any
+from typing import Any, Callable, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from services.category_registry import category_registry
 from services.memory_service import MemoryService
-from services.llm_service import LLMService
+from services.llm_service import LLMService, get_llm_service
 from services.lesson_service import LessonService
 from services.auth_service import AuthService
+from services.metrics import latency_metrics
 
 logger = logging.getLogger(__name__)
 
+# Parallel tool calls per turn, and seconds before a tool call is abandoned
+TOOL_CONCURRENCY = int(os.getenv("TOOL_CONCURRENCY", "4"))
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "20"))
+
+# Tools that change state run one at a time, in the order the LLM called them
+WRITE_TOOLS = frozenset(
+    {"create_memory", "create_lesson", "edit_lesson", "delete_lesson"}
+)
+# Reads that don't see bot state, so they need not wait for a round's writes
+INDEPENDENT_TOOLS = frozenset({"web_search"})
+
 # Variety of vague deflection messages to prevent pattern recognition
 VAGUE_DEFLECTIONS = [
     (
@@ -33,18 +49,19 @@ VAGUE_DEFLECTIONS = [
 class ToolExecutor:
     """Execute tools requested by LLM agent."""
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, llm_service: Optional[LLMService] = None):
         """
         Initialize tool executor.
 
         Args:
             session: SQLAlchemy async session for database operations
+            llm_service: LLM service (default: the shared get_llm_service())
         """
         self.session = session
         self.memory_service = MemoryService(session)
         self.lesson_service = LessonService(session)
         self.auth_service = AuthService()
-        self.llm_service = LLMService()
+        self.llm_service = llm_service or get_llm_service()
 
     async def execute(
         self, tool_name: str, arguments: dict[str, Any], user_id: int
@@ -83,11 +100,14 @@ class ToolExecutor:
         try:
             # Memory tools
             if tool_name == "create_memory":
-                return await self._execute_create_memory(arguments, user_id)
+                with latency_metrics.timer("tool.create_memory"):
+                    return await self._execute_create_memory(arguments, user_id)
             elif tool_name == "search_memories":
                 return await self._execute_search_memories(arguments, user_id)
             elif tool_name == "get_memory":
                 return await self._execute_get_memory(arguments, user_id)
+            elif tool_name == "get_related_memories":
+                return await self._execute_get_related_memories(arguments, user_id)
 
             # Web search tool
             elif tool_name == "web_search":
@@ -126,32 +146,17 @@ class ToolExecutor:
         if not content:
             return {"success": False, "error": "Content is required"}
 
-        # Generate simple content using LLM
-        simple_content = await self.llm_service.extract_simple_content(content)
-
-        # Calculate importance if not provided
-        if importance is None:
-            importance = await self.llm_service.calculate_importance(content)
-
-        # Extract VAD emotions
-        vad_scores = await self.llm_service.extract_vad_emotions(content)
-
-        # Generate Zettelkasten attributes
-        zettel_attrs = await self.llm_service.generate_zettelkasten_attributes(content)
+        # Simple content, importance, VAD emotions and Zettelkasten attributes
+        # in one LLM round trip (concurrent per-field calls as fallback)
+        enrichment = await self.llm_service.enrich_memory(content, importance)
+        simple_content = enrichment["simple_content"]
+        importance = enrichment["importance"]
 
         # Get category IDs from category names
-        from models.memory import Category
-        from sqlalchemy import select
-
         category_ids = []
         if categories:
-            for cat_name in categories:
-                result = await self.session.execute(
-                    select(Category).where(Category.full_path == cat_name)
-                )
-                category = result.scalar_one_or_none()
-                if category:
-                    category_ids.append(category.id)
+            await category_registry.ensure_loaded(self.session)
+            category_ids = category_registry.resolve(categories)
 
         # Create memory
         memory = await self.memory_service.create_memory(
@@ -160,14 +165,14 @@ class ToolExecutor:
             importance=importance,
             created_by=user_id,
             category_ids=category_ids if category_ids else None,
-            emotion_valence=vad_scores.get("valence"),
-            emotion_arousal=vad_scores.get("arousal"),
-            emotion_dominance=vad_scores.get("dominance"),
-            emotion_label=vad_scores.get("emotion_label"),
-            keywords=zettel_attrs.get("keywords"),
-            tags=zettel_attrs.get("tags"),
-            context_temporal=zettel_attrs.get("temporal_context"),
-            context_situational=zettel_attrs.get("situational_context"),
+            emotion_valence=enrichment["valence"],
+            emotion_arousal=enrichment["arousal"],
+            emotion_dominance=enrichment["dominance"],
+            emotion_label=enrichment["emotion_label"],
+            keywords=enrichment["keywords"],
+            tags=enrichment["tags"],
+            context_temporal=enrichment["context_temporal"],
+            context_situational=enrichment["context_situational"],
         )
 
         return {
@@ -186,31 +191,25 @@ class ToolExecutor:
         """Execute search_memories tool."""
         query = arguments.get("query")
         categories = arguments.get("categories")
+        tags = arguments.get("tags")
         limit = arguments.get("limit", 10)
 
         if not query:
             return {"success": False, "error": "Query is required"}
 
-        # Get category IDs if categories specified
-        from models.memory import Category
-        from sqlalchemy import select
-
+        # Get category IDs if categories specified (domains match all of theirs,
+        # unknown names are ignored)
         category_ids = None
         if categories:
-            category_ids = []
-            for cat_name in categories:
-                result = await self.session.execute(
-                    select(Category).where(Category.full_path == cat_name)
-                )
-                category = result.scalar_one_or_none()
-                if category:
-                    category_ids.append(category.id)
+            await category_registry.ensure_loaded(self.session)
+            category_ids = category_registry.resolve(categories, expand=True) or None
 
         # Search memories
         memories = await self.memory_service.search_memories(
             user_id=user_id,
             query=query,
             category_ids=category_ids,
+            tags=tags,
             limit=limit,
         )
 
@@ -239,16 +238,37 @@ class ToolExecutor:
         if memory_id is None:
             return {"success": False, "error": "memory_id is required"}
 
-        memory = await self.memory_service.get_memory(memory_id)
-
-        if not memory:
+        if full:
+            memory = await self.memory_service.get_memory(memory_id)
+            fields = memory and {
+                "created_by": memory.created_by,
+                "content": memory.full_content,
+                "categories": [c.full_path for c in memory.categories],
+                "keywords": memory.keywords,
+                "importance": memory.importance,
+                "emotion_label": memory.emotion_label,
+                "created_at": memory.created_at,
+            }
+        else:
+            # Summary projection: full_content is never fetched or decoded
+            fields = await self.memory_service.get_memory_summary(memory_id)
+            if fields:
+                await category_registry.ensure_loaded(self.session)
+                fields["content"] = fields["simple_content"]
+                fields["categories"] = [
+                    path
+                    for path in map(category_registry.path, fields["category_ids"])
+                    if path is not None
+                ]
+
+        if not fields:
             return {
                 "success": False,
                 "error": f"Memory {memory_id} not found",
             }
 
         # Verify user owns this memory
-        if memory.created_by != user_id:
+        if fields["created_by"] != user_id:
             return {
                 "success": False,
                 "error": "Access denied - memory belongs to another user",
@@ -257,16 +277,62 @@ class ToolExecutor:
         return {
             "success": True,
             "memory": {
-                "id": memory.id,
-                "content": memory.full_content if full else memory.simple_content,
-                "importance": memory.importance,
-                "categories": [c.full_path for c in memory.categories],
-                "keywords": memory.keywords,
-                "emotion_label": memory.emotion_label,
-                "created_at": memory.created_at.isoformat(),
+                "id": memory_id,
+                "content": fields["content"],
+                "importance": fields["importance"],
+                "categories": fields["categories"],
+                "keywords": fields["keywords"],
+                "emotion_label": fields["emotion_label"],
+                "created_at": fields["created_at"].isoformat(),
             },
         }
 
+    async def _execute_get_related_memories(
+        self, arguments: dict[str, Any], user_id: int
+    ) -> dict[str, Any]:
+        """Execute get_related_memories tool."""
+        memory_ids = arguments.get("memory_ids")
+        hops = arguments.get("hops")
+        limit = arguments.get("limit")
+
+        if not memory_ids:
+            return {"success": False, "error": "memory_ids is required"}
+        if not isinstance(memory_ids, list):
+            return {"success": False, "error": "memory_ids must be a list of IDs"}
+
+        # Models send numbers as strings or null now and then
+        try:
+            memory_ids = [int(memory_id) for memory_id in memory_ids]
+            hops = None if hops is None else max(int(hops), 1)
+            limit = 10 if limit is None else min(max(int(limit), 1), 50)
+        except (TypeError, ValueError):
+            return {
+                "success": False,
+                "error": "memory_ids, hops and limit must be integers",
+            }
+
+        memories = await self.memory_service.get_related_memories(
+            user_id=user_id,
+            memory_ids=memory_ids,
+            limit=limit,
+            hops=hops,
+        )
+
+        return {
+            "success": True,
+            "count": len(memories),
+            "memories": [
+                {
+                    "id": m.id,
+                    "content": m.simple_content,
+                    "importance": m.importance,
+                    "categories": [c.full_path for c in m.categories],
+                    "keywords": m.keywords,
+                }
+                for m in memories
+            ],
+        }
+
     async def _execute_web_search(self, arguments: dict[str, Any]) -> dict[str, Any]:
         """Execute web_search tool."""
         query = arguments.get("query")
@@ -282,8 +348,13 @@ class ToolExecutor:
             # Use duckduckgo-search library
             from duckduckgo_search import DDGS
 
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=num_results))
+            def search() -> list[dict[str, Any]]:
+                with DDGS() as ddgs:
+                    return list(ddgs.text(query, max_results=num_results))
+
+            # DDGS does blocking network I/O; a worker thread keeps the event
+            # loop, the round's other tool calls and TOOL_TIMEOUT running
+            results = await asyncio.to_thread(search)
 
             return {
                 "success": True,
@@ -467,3 +538,82 @@ class ToolExecutor:
                 "success": False,
                 "error": f"Failed to delete lesson: {str(e)}",
             }
+
+
+async def execute_tool_calls(
+    tool_calls: list[dict[str, Any]],
+    user_id: int,
+    session_factory: Optional[Callable[[], Any]] = None,
+    timeout: Optional[float] = None,
+) -> list[dict[str, Any]]:
+    """
+    Execute the tool calls of one LLM turn concurrently.
+
+    Each call gets its own session and ToolExecutor. At most TOOL_CONCURRENCY
+    calls run at once. Writes (WRITE_TOOLS) keep their relative order and
+    reads of bot state start after them, so they see what the same round
+    wrote. A read running longer than TOOL_TIMEOUT returns an error result
+    instead of stalling the turn; writes are never timed out, since
+    cancelling one could abort it mid-transaction.
+
+    Args:
+        tool_calls: Tool calls in OpenAI request format
+            ({"id", "type", "function": {"name", "arguments"}})
+        user_id: Telegram user ID for context
+        session_factory: Async session factory (default: AsyncSessionLocal)
+        timeout: Per-read limit in seconds, capped at TOOL_TIMEOUT (e.g. the
+            time left in the turn)
+
+    Returns:
+        [{"tool_call_id": str, "result": dict}] in the order of tool_calls
+    """
+    if session_factory is None:
+        from database import AsyncSessionLocal
+
+        session_factory = AsyncSessionLocal
+
+    timeout = TOOL_TIMEOUT if timeout is None else min(timeout, TOOL_TIMEOUT)
+    semaphore = asyncio.Semaphore(TOOL_CONCURRENCY)
+    write_lock = asyncio.Lock()
+    pending_writes = sum(call["function"]["name"] in WRITE_TOOLS for call in tool_calls)
+    writes_done = asyncio.Event()
+    if not pending_writes:
+        writes_done.set()
+
+    async def run(tool_name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+        async with session_factory() as session:
+            executor = ToolExecutor(session)
+            return await executor.execute(tool_name, arguments, user_id)
+
+    async def run_call(tool_call: dict[str, Any]) -> dict[str, Any]:
+        nonlocal pending_writes
+        tool_name = tool_call["function"]["name"]
+        try:
+            arguments = json.loads(tool_call["function"]["arguments"] or "{}")
+        except json.JSONDecodeError:
+            arguments = {}
+
+        if tool_name in WRITE_TOOLS:
+            try:
+                async with write_lock, semaphore:
+                    result = await run(tool_name, arguments)
+            finally:
+                pending_writes -= 1
+                if not pending_writes:
+                    writes_done.set()
+        else:
+            if tool_name not in INDEPENDENT_TOOLS:
+                await writes_done.wait()
+            async with semaphore:
+                try:
+                    result = await asyncio.wait_for(run(tool_name, arguments), timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Tool {tool_name} timed out after {timeout:g}s")
+                    result = {
+                        "success": False,
+                        "error": f"Tool {tool_name} timed out after {timeout:g}s",
+                    }
+
+        return {"tool_call_id": tool_call["id"], "result": result}
+
+    return list(await asyncio.gather(*(run_call(call) for call in tool_calls)))